@@ -36,13 +36,17 @@ from cogent3.evolve.fast_distance import (
     get_distance_calculator,
 )
 from cogent3.evolve.models import available_models, get_model
-from cogent3.parse.newick import parse_string as newick_parse_string
+from cogent3.parse.newick import parse_tree as newick_parse_tree
 from cogent3.parse.sequence import FromFilenameParser
-from cogent3.parse.table import autogen_reader, load_delimited
+from cogent3.parse.table import (
+    DelimitedChunkReader,
+    autogen_reader,
+    load_delimited_columns,
+    load_npz_columns,
+)
 from cogent3.parse.tree_xml import parse_string as tree_xml_parse_string
 from cogent3.util.misc import get_format_suffixes, open_
 from cogent3.util.table import Table as _Table
-from cogent3.util.table import cast_str_to_array
 
 
 __author__ = ""
@@ -393,6 +397,8 @@ def load_table(
     limit=None,
     format="simple",
     skip_inconsistent=False,
+    columns=None,
+    memory_map=False,
     **kwargs,
 ):
     """
@@ -438,7 +444,9 @@ def load_table(
         dict of column headings
         or a function that will handle the formatting.
     dtype
-        optional numpy array typecode.
+        optional numpy array typecode, or a dict of {column name: typecode}.
+        For delimited files, the named columns are cast to these types on
+        reading instead of having their types inferred.
     limit
         exits after this many lines. Only applied for non pickled data
         file types.
@@ -448,6 +456,17 @@ def load_table(
         output format when using str(Table)
     skip_inconsistent
         skips rows that have different length to header row
+    columns
+        series of column names to load from a delimited or npz file, other
+        columns are not converted
+    memory_map
+        for uncompressed npz files, numeric columns are memory mapped
+        rather than read into memory
+
+    Notes
+    -----
+    Files with a .npz suffix are binary columnar files written by
+    Table.write(). For these, the saved Table attributes are restored.
     """
     sep = sep or kwargs.pop("delimiter", None)
     file_format, compress_format = get_format_suffixes(filename)
@@ -460,31 +479,33 @@ def load_table(
         r.__setstate__(loaded_table)
         return r
 
+    if file_format == "npz":
+        header, data, attrs = load_npz_columns(
+            filename, columns=columns, limit=limit, memory_map=memory_map
+        )
+        if attrs.get("index", None) not in header:
+            attrs["index"] = None
+        return _Table(header=header, data=data, **attrs)
+
     if not reader:
         if file_format == "csv":
             sep = sep or ","
         elif file_format == "tsv":
             sep = sep or "\t"
 
-        header, rows, loaded_title, legend = load_delimited(
-            filename, delimiter=sep, limit=limit, **kwargs
+        header, rows, loaded_title, legend = load_delimited_columns(
+            filename,
+            delimiter=sep,
+            limit=limit,
+            columns=columns,
+            dtype=dtype,
+            static_column_types=static_column_types,
+            skip_inconsistent=skip_inconsistent,
+            **kwargs,
         )
-        if skip_inconsistent:
-            num_fields = len(header)
-            rows = [r for r in rows if len(r) == num_fields]
-        else:
-            lengths = set(map(len, [header] + rows))
-            if len(lengths) != 1:
-                msg = f"inconsistent number of fields {lengths}"
-                raise ValueError(msg)
-
         title = title or loaded_title
-        data = {}
-        for column in zip(header, *rows):
-            data[column[0]] = cast_str_to_array(
-                column[1:], static_type=static_column_types
-            )
-        rows = data
+        if isinstance(dtype, dict):
+            dtype = None
     else:
         f = open_(filename, newline=None)
         rows = [row for row in reader(f)]
@@ -509,6 +530,71 @@ def load_table(
     return table
 
 
+def load_table_chunks(
+    filename,
+    chunk_size=100000,
+    sep=None,
+    columns=None,
+    dtype=None,
+    limit=None,
+    skip_inconsistent=False,
+    **kwargs,
+):
+    """yields Tables of successive rows from a delimited file
+
+    Parameters
+    ----------
+    filename
+        path to a delimited file
+    chunk_size
+        maximum number of rows per Table
+    sep
+        the delimiting character between columns
+    columns
+        series of column names to load, other columns are not converted
+    dtype
+        a numpy typecode applied to all columns, or a dict of
+        {column name: typecode}. Types of other columns are inferred from
+        the first chunk.
+    limit
+        exits after this many rows
+    skip_inconsistent
+        skips rows that have different length to header row
+    kwargs
+        passed to make_table(), or header, with_title and with_legend which
+        are passed to the file reader
+
+    Notes
+    -----
+    Use this for files that are too large to load into memory. Column types
+    are determined per chunk, if a column has mixed types it will be str.
+    """
+    file_format, _ = get_format_suffixes(filename)
+    if file_format == "csv":
+        sep = sep or ","
+    elif file_format == "tsv":
+        sep = sep or "\t"
+
+    reader_args = {
+        k: kwargs.pop(k) for k in ("header", "with_title", "with_legend") if k in kwargs
+    }
+    reader = DelimitedChunkReader(
+        filename,
+        delimiter=sep or kwargs.pop("delimiter", None),
+        limit=limit,
+        columns=columns,
+        dtype=dtype,
+        chunk_size=chunk_size,
+        skip_inconsistent=skip_inconsistent,
+        **reader_args,
+    )
+    title = kwargs.pop("title", "")
+    for data in reader:
+        yield make_table(
+            header=reader.header, data=data, title=title or reader.title, **kwargs
+        )
+
+
 def make_tree(treestring=None, tip_names=None, format=None, underscore_unmunge=False):
     """Initialises a tree.
 
@@ -535,15 +621,9 @@ def make_tree(treestring=None, tip_names=None, format=None, underscore_unmunge=F
     if format is None and treestring.startswith("<"):
         format = "xml"
     if format == "xml":
-        parser = tree_xml_parse_string
-    else:
-        parser = newick_parse_string
-    tree_builder = TreeBuilder().create_edge
-    # FIXME: More general strategy for underscore_unmunge
-    if parser is newick_parse_string:
-        tree = parser(treestring, tree_builder, underscore_unmunge=underscore_unmunge)
+        tree = tree_xml_parse_string(treestring, TreeBuilder().create_edge)
     else:
-        tree = parser(treestring, tree_builder)
+        tree = newick_parse_tree(treestring, underscore_unmunge=underscore_unmunge)
     if not tree.name_loaded:
         tree.name = "root"
 
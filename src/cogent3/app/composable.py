@@ -5,6 +5,9 @@ import pathlib
 import re
 import time
 import traceback
+import tracemalloc
+
+from collections import OrderedDict
 
 import scitrack
 
@@ -12,6 +15,7 @@ from cogent3 import make_aligned_seqs, make_unaligned_seqs
 from cogent3.core.alignment import SequenceCollection
 from cogent3.util import progress_display as UI
 from cogent3.util.misc import get_object_provenance, open_
+from cogent3.util.table import Table
 
 from .data_store import (
     IGNORE,
@@ -19,6 +23,7 @@ from .data_store import (
     RAISE,
     SKIP,
     DataStoreMember,
+    PrefetchedMembers,
     SingleReadDataStore,
     WritableDirectoryDataStore,
     WritableZippedDataStore,
@@ -61,6 +66,64 @@ def _get_source(source):
     return result
 
 
+def _get_size(data):
+    """returns size of data, bytes for a file path, otherwise len(data).
+    None if not defined."""
+    if isinstance(data, (str, pathlib.PurePath)):
+        try:
+            return os.path.getsize(data)
+        except (OSError, ValueError):
+            return None
+    try:
+        return len(data)
+    except TypeError:
+        return None
+
+
+_profile_header = ["step", "pid", "wall", "cpu", "size", "peak_memory"]
+
+
+class _profiled_call:
+    """calls a composable function, returning the result and the resource
+    usage of each step"""
+
+    def __init__(self, app, trace_memory=False):
+        """
+        Parameters
+        ----------
+        app
+            the composable function
+        trace_memory : bool
+            record the peak memory allocated by each step using tracemalloc
+        """
+        self.app = app
+        self.trace_memory = trace_memory
+
+    def __call__(self, val):
+        started_tracing = self.trace_memory and not tracemalloc.is_tracing()
+        if started_tracing:
+            # will be a worker process when run in parallel
+            tracemalloc.start()
+
+        apps = []
+        app = self.app
+        while app is not None:
+            app._profile_records = []
+            apps.append(app)
+            app = app.input
+
+        try:
+            result = self.app(val)
+        finally:
+            records = []
+            for app in reversed(apps):
+                records.extend(app._profile_records)
+                app._profile_records = None
+            if started_tracing:
+                tracemalloc.stop()
+        return result, records
+
+
 def _get_origin(origin):
     if type(origin) == str:
         result = origin
@@ -208,6 +271,9 @@ class Composable(ComposableType):
         self._checkpointable = False
         self._load_checkpoint = None
         self._formatted = ["type='%s'" % self._type]
+        # per call resource usage, a list when being profiled
+        self._profile_records = None
+        self._profile_data = []
 
     def __str__(self):
         txt = "" if not self.input else str(self.input)
@@ -302,10 +368,28 @@ class Composable(ComposableType):
         valid = self._validate_data_type(val)
         if not valid:
             return valid
+
+        profiling = getattr(self, "_profile_records", None) is not None
+        if profiling:
+            size = _get_size(val)
+            tracing = tracemalloc.is_tracing()
+            if tracing:
+                # resets the peak
+                tracemalloc.clear_traces()
+            wall, cpu = time.perf_counter(), time.process_time()
+
         try:
             val = func(val, *args, **kwargs)
         except Exception:
             val = NotCompleted("ERROR", self, traceback.format_exc(), source=val)
+
+        if profiling:
+            wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+            peak = tracemalloc.get_traced_memory()[1] if tracing else None
+            name = self.__class__.__name__
+            record = [name, os.getpid(), wall, cpu, size, peak]
+            self._profile_records.append(record)
+
         return val
 
     def __call__(self, val, *args, **kwargs):
@@ -381,6 +465,8 @@ class Composable(ComposableType):
         par_kw=None,
         logger=True,
         cleanup=False,
+        prefetch=0,
+        profile=False,
         ui=None,
     ):
         """invokes self composable function on the provided data store
@@ -407,6 +493,18 @@ class Composable(ComposableType):
         cleanup : bool
             after copying of log files into the data store, they are deleted
             from their original location
+        prefetch : int
+            number of data store members whose contents are read (and
+            decompressed) in background threads ahead of the member being
+            processed. Applies to serial execution only, as parallel workers
+            already perform their reads concurrently. Defaults to 0, no
+            prefetching.
+        profile : bool or str
+            if True, the wall time, CPU time and input size of every call to
+            each step is recorded (see summary_profile). If 'memory', the peak
+            memory allocated by each step is also recorded using tracemalloc,
+            which slows execution. For writers, the summary is also recorded
+            in the log.
 
         Returns
         -------
@@ -444,6 +542,15 @@ class Composable(ComposableType):
         if LOGGER:
             LOGGER.log_message(str(self), label="composable function")
             LOGGER.log_versions(["cogent3"])
+
+        if profile:
+            trace_memory = profile == "memory"
+            started_tracing = trace_memory and not tracemalloc.is_tracing()
+            if started_tracing:
+                # so tracing is not restarted for each member when serial
+                tracemalloc.start()
+            self._profile_data = []
+
         results = []
         i = 0
         process = self.input if self.input else self
@@ -457,11 +564,29 @@ class Composable(ComposableType):
 
         # with a tinydb dstore, this also excludes data that failed to complete
         todo = [m for m in dstore if not self.job_done(m)]
+        if prefetch and not parallel:
+            todo = PrefetchedMembers(todo, prefetch)
+
+        func, master = process, self
+        if profile:
+            func = _profiled_call(process, trace_memory=trace_memory)
+            master = _profiled_call(self, trace_memory=trace_memory)
 
         for result in ui.imap(
-            process, todo, parallel=parallel, par_kw=par_kw, mininterval=mininterval
+            func, todo, parallel=parallel, par_kw=par_kw, mininterval=mininterval
         ):
-            outcome = result if process is self else self(result)
+            if profile:
+                result, records = result
+                self._profile_data.extend(records)
+
+            if process is self:
+                outcome = result
+            elif profile:
+                outcome, records = master(result)
+                self._profile_data.extend(records)
+            else:
+                outcome = self(result)
+
             results.append(outcome)
             if LOGGER:
                 member = dstore[i]
@@ -492,12 +617,23 @@ class Composable(ComposableType):
 
         finish = time.time()
         taken = finish - start
+        if profile:
+            if started_tracing:
+                tracemalloc.stop()
+
+            if LOGGER:
+                table = self.summary_profile
+                LOGGER.log_message(table.to_string(format="tsv"), label="PROFILE")
+
         if LOGGER:
             LOGGER.log_message(f"{taken}", label="TIME TAKEN")
             LOGGER.shutdown()
             log_file_path = str(log_file_path)
             self.data_store.add_file(log_file_path, cleanup=cleanup, keep_suffix=True)
             self.data_store.close()
+        elif loggable:
+            # commit results still buffered by the writer
+            self.data_store.flush()
 
         # now reconnect input
         if process is not self:
@@ -505,6 +641,63 @@ class Composable(ComposableType):
 
         return results
 
+    def _get_profile_table(self):
+        """returns table of resource usage per call to each step"""
+        return Table(
+            header=_profile_header,
+            data=self._profile_data or None,
+            title="resource usage per call",
+        )
+
+    @property
+    def summary_profile(self):
+        """returns a table summarising resource usage of each step, from the
+        last call of apply_to(..., profile=True)
+
+        Notes
+        -----
+        Times are in seconds, peak memory in bytes. peak_memory is None unless
+        profile='memory'.
+        """
+        steps = OrderedDict()
+        for name, pid, wall, cpu, size, peak in self._profile_data:
+            stats = steps.setdefault(
+                name, dict(num=0, wall=0, cpu=0, sizes=[], peaks=[])
+            )
+            stats["num"] += 1
+            stats["wall"] += wall
+            stats["cpu"] += cpu
+            if size is not None:
+                stats["sizes"].append(size)
+            if peak is not None:
+                stats["peaks"].append(peak)
+
+        rows = []
+        for name, stats in steps.items():
+            sizes, peaks = stats["sizes"], stats["peaks"]
+            rows.append(
+                [
+                    name,
+                    stats["num"],
+                    stats["wall"],
+                    stats["wall"] / stats["num"],
+                    stats["cpu"],
+                    sum(sizes) / len(sizes) if sizes else None,
+                    max(peaks) if peaks else None,
+                ]
+            )
+
+        header = [
+            "step",
+            "calls",
+            "wall",
+            "mean wall",
+            "cpu",
+            "mean size",
+            "peak_memory",
+        ]
+        return Table(header=header, data=rows or None, title="resource usage by step")
+
 
 class ComposableTabular(Composable):
     _type = "tabular"
@@ -591,6 +784,7 @@ class _checkpointable(Composable):
         if_exists=SKIP,
         suffix=None,
         writer_class=None,
+        batch_size=None,
         **kwargs,
     ):
         """
@@ -608,6 +802,10 @@ class _checkpointable(Composable):
             exception), 'overwrite', 'ignore'
         writer_class : type
             constructor for writer
+        batch_size : int or None
+            number of results held in memory before being committed to the
+            data store together. If None, each result is written immediately.
+            Buffered results are committed when the data store is closed.
         """
         super(_checkpointable, self).__init__(**kwargs)
         self._formatted_params()
@@ -634,7 +832,11 @@ class _checkpointable(Composable):
                 else WritableDirectoryDataStore
             )
         self.data_store = klass(
-            data_path, suffix=suffix, create=create, if_exists=if_exists
+            data_path,
+            suffix=suffix,
+            create=create,
+            if_exists=if_exists,
+            batch_size=batch_size,
         )
         self._callback = name_callback
         self.func = self.write
@@ -1,3 +1,4 @@
+import base64
 import glob
 import json
 import os
@@ -7,7 +8,8 @@ import shutil
 import weakref
 import zipfile
 
-from collections import defaultdict
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
 from fnmatch import fnmatch, translate
 from io import TextIOWrapper
 from pathlib import Path
@@ -26,6 +28,7 @@ from cogent3.util.misc import (
     get_format_suffixes,
     open_,
 )
+from cogent3.util.serialise import is_binary
 from cogent3.util.table import Table
 from cogent3.util.union_dict import UnionDict
 
@@ -48,7 +51,19 @@ IGNORE = "ignore"
 
 
 def make_record_for_json(identifier, data, completed):
-    """returns a dict for storage as json"""
+    """returns a dict for storage as json
+
+    Notes
+    -----
+    Binary encoded data (see cogent3.util.serialise.to_binary) is stored as
+    base64 text.
+    """
+    if is_binary(data):
+        data = base64.b64encode(data).decode("ascii")
+        return dict(
+            identifier=identifier, data=data, completed=completed, encoding="binary"
+        )
+
     try:
         data = data.to_rich_dict()
     except AttributeError:
@@ -60,10 +75,18 @@ def make_record_for_json(identifier, data, completed):
 
 
 def load_record_from_json(data):
-    """returns identifier, data, completed status from json string"""
+    """returns identifier, data, completed status from json string
+
+    Notes
+    -----
+    Binary encoded data is returned as bytes.
+    """
     if type(data) == str:
         data = json.loads(data)
-    value = json.loads(data["data"])
+    if data.get("encoding") == "binary":
+        value = base64.b64decode(data["data"])
+    else:
+        value = json.loads(data["data"])
     return data["identifier"], value, data["completed"]
 
 
@@ -73,13 +96,23 @@ class DataStoreMember(str):
         result.name = os.path.basename(name)
         result.parent = parent
         result._file = None
+        result._prefetched = None
         result.id = id
         return result
 
     def read(self):
         """returns contents"""
+        if self._prefetched is not None:
+            data, self._prefetched = self._prefetched, None
+            return data
         return self.parent.read(self)
 
+    def prefetch(self):
+        """reads contents ahead of use, held until the next call to read()"""
+        if self._prefetched is None:
+            self._prefetched = self.parent.read(self)
+        return self
+
     def open(self):
         """returns file-like object"""
         if self._file is None:
@@ -98,6 +131,63 @@ class DataStoreMember(str):
         return self.parent.md5(self, force=True)
 
 
+class PrefetchedMembers:
+    """iterates over data store members while reading the contents of the
+    next depth members in background threads"""
+
+    def __init__(self, members, depth, max_workers=None):
+        """
+        Parameters
+        ----------
+        members
+            series of DataStoreMember instances. Other types, such as path
+            strings, are passed through without prefetching.
+        depth : int
+            the number of members to read ahead of the member being processed
+        max_workers : int or None
+            number of threads performing reads, defaults to min(depth, 4)
+        """
+        assert depth > 0, "depth must be a positive integer"
+        self._members = members
+        self.depth = depth
+        self._max_workers = max_workers or min(depth, 4)
+
+    def __len__(self):
+        return len(self._members)
+
+    def __iter__(self):
+        pending = deque()
+        members = iter(self._members)
+        with ThreadPoolExecutor(max_workers=self._max_workers) as executor:
+
+            def submit_next():
+                for member in members:
+                    future = None
+                    if isinstance(member, DataStoreMember):
+                        future = executor.submit(member.prefetch)
+                    pending.append((member, future))
+                    return
+
+            for _ in range(self.depth):
+                submit_next()
+
+            while pending:
+                member, future = pending.popleft()
+                submit_next()
+                if future is None:
+                    yield member
+                    continue
+
+                # a failed read is left for the consumer to repeat, so the
+                # exception is handled where it would have been without
+                # prefetching
+                future.exception()
+                yield member
+                # discard contents not consumed by the caller, e.g. when a
+                # checkpointed result was used
+                member._prefetched = None
+
+
 class ReadOnlyDataStoreBase:
     """a read only data store"""
 
@@ -384,7 +474,7 @@ class ReadOnlyZippedDataStore(ReadOnlyDataStoreBase):
 
 
 class WritableDataStoreBase:
-    def __init__(self, if_exists=RAISE, create=False):
+    def __init__(self, if_exists=RAISE, create=False, batch_size=None):
         """
         Parameters
         ----------
@@ -394,6 +484,10 @@ class WritableDataStoreBase:
              correspond to lower case version of the same word)
         create : bool
             if True, the destination is created
+        batch_size : int or None
+            number of writes held in memory before being committed together.
+            If None, each write is committed immediately. Buffered writes are
+            committed by flush() or close().
         """
         d = locals()
         d = UnionDict({k: v for k, v in d.items() if k != "self"})
@@ -403,6 +497,8 @@ class WritableDataStoreBase:
             self._persistent = d
 
         self._members = []
+        self._batch_size = batch_size
+        self._pending = []
         if_exists = if_exists.lower()
         assert if_exists in (OVERWRITE, SKIP, RAISE, IGNORE)
         if create is False and if_exists == OVERWRITE:
@@ -460,6 +556,7 @@ class WritableDataStoreBase:
         cleanup : bool
             delete the original
         """
+        self.flush()
         relativeid = self.make_relative_identifier(path)
         relativeid = Path(relativeid)
         path = Path(path)
@@ -526,8 +623,30 @@ class WritableDataStoreBase:
         """
         raise NotImplementedError
 
+    def _buffer(self, *record):
+        """holds record for a later commit, returns False if unbuffered"""
+        if not self._batch_size:
+            return False
+
+        self._pending.append(record)
+        if len(self._pending) >= self._batch_size:
+            self.flush()
+        return True
+
+    def _commit(self, records):
+        # over-ride in subclasses, writes all buffered records
+        raise NotImplementedError
+
+    def flush(self):
+        """commits buffered writes"""
+        if not self._pending:
+            return
+
+        records, self._pending = self._pending, []
+        self._commit(records)
+
     def close(self):
-        pass
+        self.flush()
 
 
 class WritableDirectoryDataStore(ReadOnlyDirectoryDataStore, WritableDataStoreBase):
@@ -539,6 +658,7 @@ class WritableDirectoryDataStore(ReadOnlyDirectoryDataStore, WritableDataStoreBa
         if_exists=RAISE,
         create=False,
         md5=True,
+        batch_size=None,
         **kwargs,
     ):
         """
@@ -558,10 +678,14 @@ class WritableDirectoryDataStore(ReadOnlyDirectoryDataStore, WritableDataStoreBa
             if True, the destination is created
         md5 : bool
             record md5 hexadecimal checksum of data when possible
+        batch_size : int or None
+            number of writes held in memory before being written together
         """
         assert "w" in mode or "a" in mode
         ReadOnlyDirectoryDataStore.__init__(self, source=source, suffix=suffix, md5=md5)
-        WritableDataStoreBase.__init__(self, if_exists=if_exists, create=create)
+        WritableDataStoreBase.__init__(
+            self, if_exists=if_exists, create=create, batch_size=batch_size
+        )
 
         d = locals()
         self._persistent = {k: v for k, v in d.items() if k != "self"}
@@ -604,8 +728,8 @@ class WritableDirectoryDataStore(ReadOnlyDirectoryDataStore, WritableDataStoreBa
         if self._md5:
             self._checksums[absolute_id] = get_text_hexdigest(data)
 
-        with atomic_write(str(absolute_id), in_zip=False) as out:
-            out.write(data)
+        if not self._buffer(absolute_id, data):
+            self._commit([(absolute_id, data)])
 
         member = DataStoreMember(relative_id, self)
         if relative_id not in self and relative_id.endswith(self.suffix):
@@ -613,6 +737,15 @@ class WritableDirectoryDataStore(ReadOnlyDirectoryDataStore, WritableDataStoreBa
 
         return member
 
+    def _commit(self, records):
+        for absolute_id, data in records:
+            with atomic_write(str(absolute_id), in_zip=False) as out:
+                out.write(data)
+
+    def open(self, identifier):
+        self.flush()
+        return super(WritableDirectoryDataStore, self).open(identifier)
+
 
 class WritableZippedDataStore(ReadOnlyZippedDataStore, WritableDataStoreBase):
     def __init__(
@@ -623,6 +756,7 @@ class WritableZippedDataStore(ReadOnlyZippedDataStore, WritableDataStoreBase):
         if_exists=RAISE,
         create=False,
         md5=True,
+        batch_size=None,
         **kwargs,
     ):
         """
@@ -642,9 +776,14 @@ class WritableZippedDataStore(ReadOnlyZippedDataStore, WritableDataStoreBase):
             if True, the destination is created
         md5 : bool
             record md5 hexadecimal checksum of data when possible
+        batch_size : int or None
+            number of writes held in memory before being appended to the
+            archive in a single session
         """
         ReadOnlyZippedDataStore.__init__(self, source=source, suffix=suffix, md5=md5)
-        WritableDataStoreBase.__init__(self, if_exists=if_exists, create=create)
+        WritableDataStoreBase.__init__(
+            self, if_exists=if_exists, create=create, batch_size=batch_size
+        )
 
         d = locals()
         self._persistent = {k: v for k, v in d.items() if k != "self"}
@@ -684,8 +823,9 @@ class WritableZippedDataStore(ReadOnlyZippedDataStore, WritableDataStoreBase):
         if self._md5:
             self._checksums[absolute_id] = get_text_hexdigest(data)
 
-        with atomic_write(str(relative_id), in_zip=self.source) as out:
-            out.write(data)
+        if not self._buffer(relative_id, data):
+            with atomic_write(str(relative_id), in_zip=self.source) as out:
+                out.write(data)
 
         member = DataStoreMember(relative_id, self)
         if relative_id not in self and relative_id.endswith(self.suffix):
@@ -693,6 +833,16 @@ class WritableZippedDataStore(ReadOnlyZippedDataStore, WritableDataStoreBase):
 
         return member
 
+    def _commit(self, records):
+        # a single append session for all records
+        with zipfile.ZipFile(self.source, "a") as archive:
+            for relative_id, data in records:
+                archive.writestr(str(relative_id).replace("\\", "/"), data)
+
+    def open(self, identifier):
+        self.flush()
+        return super(WritableZippedDataStore, self).open(identifier)
+
 
 def _db_lockid(path):
     """returns value for pid in LOCK record or None"""
@@ -723,7 +873,7 @@ class ReadOnlyTinyDbDataStore(ReadOnlyDataStoreBase):
             return identifier.parent is self
 
         query = Query().identifier.matches(identifier)
-        return self.db.contains(query)
+        return self._query_db.contains(query)
 
     def __repr__(self):
         txt = super().__repr__()
@@ -733,6 +883,11 @@ class ReadOnlyTinyDbDataStore(ReadOnlyDataStoreBase):
             txt = f"{txt}, {num}x incomplete"
         return txt
 
+    @property
+    def _query_db(self):
+        """db for member queries"""
+        return self.db
+
     @property
     def db(self):
         if self._db is None:
@@ -855,7 +1010,7 @@ class ReadOnlyTinyDbDataStore(ReadOnlyDataStoreBase):
             members = []
             query = Query()
             query = (query.identifier.matches(pattern)) & (query.completed == True)
-            for record in self.db.search(query):
+            for record in self._query_db.search(query):
                 member = DataStoreMember(record["identifier"], self, id=record.doc_id)
                 members.append(member)
 
@@ -984,8 +1139,45 @@ class WritableTinyDbDataStore(ReadOnlyTinyDbDataStore, WritableDataStoreBase):
     def __init__(self, *args, **kwargs):
         if_exists = kwargs.pop("if_exists", RAISE)
         create = kwargs.pop("create", True)
+        batch_size = kwargs.pop("batch_size", None)
         ReadOnlyTinyDbDataStore.__init__(self, *args, **kwargs)
-        WritableDataStoreBase.__init__(self, if_exists=if_exists, create=create)
+        WritableDataStoreBase.__init__(
+            self, if_exists=if_exists, create=create, batch_size=batch_size
+        )
+
+    @property
+    def db(self):
+        db = ReadOnlyTinyDbDataStore.db.fget(self)
+        # buffered records are committed so they are visible to queries
+        self.flush()
+        return db
+
+    @property
+    def _query_db(self):
+        # buffered writes are already in members and checked by
+        # __contains__, so are not committed
+        return ReadOnlyTinyDbDataStore.db.fget(self)
+
+    def __contains__(self, identifier):
+        """whether identifier has been stored here, including buffered writes"""
+        if not isinstance(identifier, DataStoreMember) and any(
+            re.match(identifier, record["identifier"]) for _, record in self._pending
+        ):
+            return True
+        return super(WritableTinyDbDataStore, self).__contains__(identifier)
+
+    def close(self):
+        """commits buffered writes and closes the data store"""
+        self.flush()
+        super(WritableTinyDbDataStore, self).close()
+
+    def _commit(self, records):
+        # a single insert and storage flush for all records
+        members, records = zip(*records)
+        doc_ids = self._db.insert_multiple(records)
+        self._db.storage.flush()
+        for member, doc_id in zip(members, doc_ids):
+            member.id = doc_id
 
     def _source_create_delete(self, if_exists, create):
         if _db_lockid(self.source):
@@ -1015,9 +1207,10 @@ class WritableTinyDbDataStore(ReadOnlyTinyDbDataStore, WritableDataStoreBase):
 
         relative_id = self.get_relative_identifier(identifier)
         record = make_record_for_json(relative_id, data, True)
-        doc_id = self.db.insert(record)
+        member = DataStoreMember(relative_id, self)
+        if not self._buffer(member, record):
+            member.id = self.db.insert(record)
 
-        member = DataStoreMember(relative_id, self, id=doc_id)
         if relative_id.endswith(self.suffix):
             self._members.append(member)
 
@@ -1033,9 +1226,9 @@ class WritableTinyDbDataStore(ReadOnlyTinyDbDataStore, WritableDataStoreBase):
 
         relative_id = self.get_relative_identifier(identifier)
         record = make_record_for_json(relative_id, not_completed, False)
-        doc_id = self.db.insert(record)
-
-        member = DataStoreMember(relative_id, self, id=doc_id)
+        member = DataStoreMember(relative_id, self)
+        if not self._buffer(member, record):
+            member.id = self.db.insert(record)
 
         return member
 
@@ -16,6 +16,7 @@ from cogent3.evolve.fast_distance import DistanceMatrix
 from cogent3.format.alignment import FORMATTERS
 from cogent3.parse.sequence import PARSERS
 from cogent3.util.deserialise import deserialise_object
+from cogent3.util.serialise import to_binary
 from cogent3.util.table import Table
 
 from .composable import (
@@ -335,7 +336,13 @@ class write_tabular(_checkpointable, ComposableTabular):
     _data_types = ("Table", "DictArray", "DistanceMatrix")
 
     def __init__(
-        self, data_path, format="tsv", name_callback=None, create=False, if_exists=SKIP
+        self,
+        data_path,
+        format="tsv",
+        name_callback=None,
+        create=False,
+        if_exists=SKIP,
+        batch_size=None,
     ):
         """
         Parameters
@@ -353,6 +360,9 @@ class write_tabular(_checkpointable, ComposableTabular):
         if_exists : str
             behaviour if output exists. Either 'skip', 'raise' (raises an
             exception), 'overwrite'
+        batch_size : int or None
+            number of results held in memory before being written together.
+            If None, each result is written immediately.
         """
         super(write_tabular, self).__init__(
             input_types=self._input_types,
@@ -363,6 +373,7 @@ class write_tabular(_checkpointable, ComposableTabular):
             create=create,
             if_exists=if_exists,
             suffix=format,
+            batch_size=batch_size,
         )
         self._formatted_params()
         self._format = format
@@ -390,6 +401,7 @@ class write_seqs(_checkpointable):
         name_callback=None,
         create=False,
         if_exists=SKIP,
+        batch_size=None,
     ):
         """
         Parameters
@@ -409,6 +421,9 @@ class write_seqs(_checkpointable):
         if_exists : str
             behaviour if output exists. Either 'skip', 'raise' (raises an
             exception), 'overwrite'
+        batch_size : int or None
+            number of results held in memory before being written together.
+            If None, each result is written immediately.
         """
         super(write_seqs, self).__init__(
             input_types=self._input_types,
@@ -419,6 +434,7 @@ class write_seqs(_checkpointable):
             create=create,
             if_exists=if_exists,
             suffix=suffix,
+            batch_size=batch_size,
         )
         self._formatted_params()
         self._format = format
@@ -480,8 +496,37 @@ class write_json(_checkpointable):
     _output_types = (IDENTIFIER_TYPE, SERIALISABLE_TYPE)
 
     def __init__(
-        self, data_path, name_callback=None, create=False, if_exists=SKIP, suffix="json"
+        self,
+        data_path,
+        name_callback=None,
+        create=False,
+        if_exists=SKIP,
+        suffix="json",
+        batch_size=None,
+        binary=False,
     ):
+        """
+        Parameters
+        ----------
+        data_path
+            path to write output
+        name_callback
+            function that takes the data object and returns a base
+            file name
+        create : bool
+            whether to create the output directory
+        if_exists : str
+            behaviour if output exists. Either 'skip', 'raise' (raises an
+            exception), 'overwrite'
+        suffix : str
+            filename suffix for output
+        batch_size : int or None
+            number of results held in memory before being written together.
+            If None, each result is written immediately.
+        binary : bool
+            store a compressed binary encoding of the data, see
+            cogent3.util.serialise.to_binary. Loading is unchanged.
+        """
         super(write_json, self).__init__(
             input_types=self._input_types,
             output_types=self._output_types,
@@ -490,8 +535,10 @@ class write_json(_checkpointable):
             create=create,
             if_exists=if_exists,
             suffix=suffix,
+            batch_size=batch_size,
         )
         self.func = self.write
+        self._binary = binary
 
     def _set_checkpoint_loader(self):
         self._load_checkpoint = self
@@ -499,6 +546,8 @@ class write_json(_checkpointable):
     def write(self, data, identifier=None):
         if identifier is None:
             identifier = self._make_output_identifier(data)
+        if self._binary:
+            data = to_binary(data)
         out = make_record_for_json(os.path.basename(identifier), data, True)
         out = json.dumps(out)
         stored = self.data_store.write(identifier, out)
@@ -561,8 +610,37 @@ class write_db(_checkpointable):
     _output_types = (IDENTIFIER_TYPE, SERIALISABLE_TYPE)
 
     def __init__(
-        self, data_path, name_callback=None, create=False, if_exists=SKIP, suffix="json"
+        self,
+        data_path,
+        name_callback=None,
+        create=False,
+        if_exists=SKIP,
+        suffix="json",
+        batch_size=None,
+        binary=False,
     ):
+        """
+        Parameters
+        ----------
+        data_path
+            path to write output
+        name_callback
+            function that takes the data object and returns a base
+            file name
+        create : bool
+            whether to create the output directory
+        if_exists : str
+            behaviour if output exists. Either 'skip', 'raise' (raises an
+            exception), 'overwrite'
+        suffix : str
+            filename suffix for output
+        batch_size : int or None
+            number of results held in memory before being written together.
+            If None, each result is written immediately.
+        binary : bool
+            store a compressed binary encoding of the data, see
+            cogent3.util.serialise.to_binary. Loading is unchanged.
+        """
         super(write_db, self).__init__(
             input_types=self._input_types,
             output_types=self._output_types,
@@ -572,8 +650,10 @@ class write_db(_checkpointable):
             if_exists=if_exists,
             suffix=suffix,
             writer_class=WritableTinyDbDataStore,
+            batch_size=batch_size,
         )
         self.func = self.write
+        self._binary = binary
 
     def _set_checkpoint_loader(self):
         self._load_checkpoint = self
@@ -582,10 +662,13 @@ class write_db(_checkpointable):
         if identifier is None:
             identifier = self._make_output_identifier(data)
         # todo revisit this when we establish immutability behaviour of database
-        try:
-            out = data.to_json()
-        except AttributeError:
-            out = json.dumps(data)
+        if self._binary:
+            out = to_binary(data)
+        else:
+            try:
+                out = data.to_json()
+            except AttributeError:
+                out = json.dumps(data)
         stored = self.data_store.write(identifier, out)
         # todo is anything actually using this stored attriubte? if not, delete this
         #  code and all other cases
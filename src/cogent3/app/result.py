@@ -7,6 +7,9 @@ from functools import total_ordering
 import numpy
 
 from cogent3.maths.stats import chisqprob
+from cogent3.maths.stats.information_criteria import aic, bic
+from cogent3.recalculation.definition import DIM_PLURALS
+from cogent3.recalculation.scope import IncompleteScopeError
 from cogent3.util.misc import extend_docstring_from, get_object_provenance
 from cogent3.util.table import Table
 
@@ -95,6 +98,50 @@ class generic_result(MutableMapping):
                 value.deserialised_values()
 
 
+def _num_sites_from_record(data):
+    """returns number of alignment motifs from a likelihood function rich dict,
+    None if cannot be determined"""
+    if data["likelihood_construction"].get("loci", 1) != 1:
+        return None
+
+    seqs = data["alignment"]["seqs"]
+    seq = next(iter(seqs.values()))["seq"]
+    model = data["model"]
+    alphabet = model["alphabet"]
+    motifs = alphabet.get("data", alphabet.get("motifset"))
+    word_length = len(motifs[0]) * (model.get("motif_length", None) or 1)
+    return len(seq) // word_length
+
+
+def _param_value_from_record(data, par_name, **scope):
+    """returns the scalar value of par_name from a likelihood function rich
+    dict, None if not present as a scalar"""
+    values = set()
+    for rule in data["param_rules"]:
+        if rule["par_name"] != par_name:
+            continue
+        matched = True
+        for dim, val in scope.items():
+            if dim in rule:
+                matched = rule[dim] == val
+            elif DIM_PLURALS.get(dim) in rule:
+                matched = val in rule[DIM_PLURALS[dim]]
+            if not matched:
+                break
+
+        if matched:
+            value = rule.get("value", rule.get("init"))
+            if type(value) not in (int, float):
+                return None
+            values.add(value)
+
+    if len(values) > 1:
+        msg = f"{len(values)} distinct values of {par_name} within {scope}"
+        raise IncompleteScopeError(msg)
+
+    return values.pop() if values else None
+
+
 @total_ordering
 class model_result(generic_result):
     """Storage of model results."""
@@ -139,14 +186,17 @@ class model_result(generic_result):
         self._unique_Q = unique_Q
 
     def _get_repr_data_(self):
-        self.deserialised_values()  # making sure we're fully reloaded
         attrs = list(self._stat_attrs)
         header = ["key"] + attrs[:]
         rows = [[""] + [getattr(self, attr) for attr in attrs]]
         if len(self) > 1:
             # we just add keys, lnL and nfp
-            for key in self:
-                row = [repr(key), self[key].lnL, self[key].nfp, "", ""]
+            for key, value in self.items():
+                if isinstance(value, dict):
+                    lnL, nfp = value.get("lnL"), value.get("nfp")
+                else:
+                    lnL, nfp = value.lnL, value.nfp
+                row = [repr(key), lnL, nfp, "", ""]
                 rows.append(row)
 
         table = Table(header=header, data=rows, title=self.name)
@@ -247,6 +297,68 @@ class model_result(generic_result):
 
         return result
 
+    def get_param_value(self, par_name, *args, **kwargs):
+        """returns the value of par_name for the scope defined by the
+        keyword arguments, e.g. edge='Human'
+
+        Notes
+        -----
+        For a result loaded from json, scalar parameter values are obtained
+        from the stored record without reconstructing the likelihood function.
+        Other parameters require the likelihood function, see lf.
+        """
+        if len(self) != 1:
+            raise ValueError(
+                "multiple likelihood functions, use result.lf[key].get_param_value()"
+            )
+
+        value = list(self.values())[0]
+        if isinstance(value, dict) and not args:
+            result = _param_value_from_record(value, par_name, **kwargs)
+            if result is not None:
+                return result
+
+        return self.lf.get_param_value(par_name, *args, **kwargs)
+
+    def _get_aic_terms(self, key, with_sites):
+        """returns lnL, nfp and number of sites (or None) for a member"""
+        value = self[key]
+        if isinstance(value, dict):
+            num = _num_sites_from_record(value) if with_sites else None
+            if num is not None or not with_sites:
+                return value["lnL"], value["nfp"], num
+
+            from cogent3.util.deserialise import deserialise_object
+
+            value = deserialise_object(value)
+            self[key] = value
+
+        num = None
+        if with_sites:
+            num = sum(
+                len(value.get_param_value("lht", locus=l).index)
+                for l in value.locus_names
+            )
+        return value.lnL, value.nfp, num
+
+    def get_aic(self, second_order=False):
+        """returns Aikake Information Criteria, summed across likelihood
+        functions
+
+        Parameters
+        ----------
+        second_order
+            if true, the second order AIC adjusted by the alignment length
+        """
+        terms = [self._get_aic_terms(k, second_order) for k in self]
+        return sum(aic(*t) for t in terms)
+
+    def get_bic(self):
+        """returns the Bayesian Information Criteria, summed across likelihood
+        functions"""
+        terms = [self._get_aic_terms(k, True) for k in self]
+        return sum(bic(*t) for t in terms)
+
     @property
     def lnL(self):
         if self._lnL is None:
@@ -399,7 +511,6 @@ class model_collection_result(generic_result):
         rows = []
         attrs = ["lnL", "nfp", "DLC", "unique_Q"]
         for key, member in self.items():
-            member.deserialised_values()  # making sure we're fully reloaded
             row = [repr(key)] + [getattr(member, a) for a in attrs]
             rows.append(row)
 
@@ -435,13 +546,15 @@ class model_collection_result(generic_result):
         -------
         list of models satisfying threshold condition
         """
-        self.deserialised_values()
         assert stat in ("aicc", "aic")
         second_order = stat == "aicc"
         results = []
         for m in self.values():
-            if isinstance(m.lf, dict):
-                # multiple lf's, e.g. split codon position analyses have 3
+            if isinstance(m, model_result):
+                # computed from stored values where possible, multiple lf's,
+                # e.g. split codon position analyses have 3, are summed
+                val = m.get_aic(second_order=second_order)
+            elif isinstance(m.lf, dict):
                 val = sum(lf.get_aic(second_order=second_order) for lf in m.lf.values())
             else:
                 val = m.lf.get_aic(second_order=second_order)
@@ -502,7 +615,6 @@ class hypothesis_result(model_collection_result):
         rows = []
         attrs = ["lnL", "nfp", "DLC", "unique_Q"]
         for key, member in self.items():
-            member.deserialised_values()  # making sure we're fully reloaded
             if key == self._name_of_null:
                 status_name = ["null", repr(key)]
             else:
@@ -1,6 +1,6 @@
 from collections import defaultdict
 
-from numpy import array
+from numpy import arange, array, isin
 from numpy import random as np_random
 
 from cogent3.core.alignment import Alignment, ArrayAlignment
@@ -294,9 +294,9 @@ class take_codon_positions(ComposableAligned):
 
     def take_codon_positions(self, aln):
         """takes multiple positions"""
-        length = len(aln)
-        indices = [k for k in range(length) if k % 3 in self._positions]
-        return aln.take_positions(indices)
+        # only the length is needed, so the alignment is not converted
+        mask = isin(arange(len(aln)) % 3, self._positions)
+        return aln.filtered_by_mask(mask)
 
 
 class take_named_seqs(ComposableSeq):
@@ -4,6 +4,7 @@ __all__ = [
     "alignment",
     "alphabet",
     "annotation",
+    "array_tree",
     "genetic_code",
     "info",
     "location",
@@ -55,7 +55,7 @@ import cogent3  # will use to get at cogent3.parse.fasta.MinimalFastaParser,
 from cogent3.core.annotation import Map, _Annotatable
 from cogent3.core.genetic_code import DEFAULT, get_code
 from cogent3.core.info import Info as InfoClass
-from cogent3.core.location import LostSpan, Span
+from cogent3.core.location import IndelMap, LostSpan, Span
 from cogent3.core.profile import PSSM, MotifCountsArray
 from cogent3.core.sequence import ArraySequence, frac_same
 # which is a circular import otherwise.
@@ -227,6 +227,66 @@ class GapsOk:
         return self._func(data)
 
 
+# factory functions for boolean masks of alignment positions. The returned
+# functions take an array of shape (num_seqs, num_motifs, motif_length) and
+# return a bool array of length num_motifs, True for motifs to be retained.
+
+
+def allowed_chars_mask(chars):
+    """mask of motifs containing only the characters with indices in chars"""
+    chars = numpy.array(sorted(set(numpy.atleast_1d(chars).tolist())))
+
+    def mask(data):
+        return numpy.isin(data, chars).all(axis=(0, 2))
+
+    return mask
+
+
+def gap_frac_mask(gap_chars, allowed_frac=0):
+    """mask of motifs with fraction of gap characters <= allowed_frac
+
+    Parameters
+    ----------
+    gap_chars
+        indices of the characters corresponding to gaps
+    allowed_frac : float
+        the threshold gap fraction
+    """
+    gap_chars = numpy.atleast_1d(gap_chars)
+
+    def mask(data):
+        num_seqs, _, motif_length = data.shape
+        num_gaps = numpy.isin(data, gap_chars).sum(axis=(0, 2))
+        return num_gaps / (num_seqs * motif_length) <= allowed_frac
+
+    return mask
+
+
+def variable_mask():
+    """mask of motifs that are not identical in all sequences"""
+
+    def mask(data):
+        return (data != data[:1]).any(axis=(0, 2))
+
+    return mask
+
+
+def codon_position_mask(*positions):
+    """mask of codon positions, assumes motif_length is 1
+
+    Parameters
+    ----------
+    positions
+        codon position numbers, e.g. 3 is third position
+    """
+    positions = numpy.array(positions) - 1
+
+    def mask(data):
+        return numpy.isin(numpy.arange(data.shape[1]) % 3, positions)
+
+    return mask
+
+
 def assign_sequential_names(ignored, num_seqs, base_name="seq", start_at=0):
     """Returns list of num_seqs sequential, unique names.
 
@@ -235,6 +295,310 @@ def assign_sequential_names(ignored, num_seqs, base_name="seq", start_at=0):
     return ["%s_%s" % (base_name, i) for i in range(start_at, start_at + num_seqs)]
 
 
+# maximum number of elements processed per bincount call
+_COUNT_CHUNK_SIZE = 2 ** 22
+# motif codes spanning more states than this are compacted by sorting
+_MAX_DIRECT_CODES = 2 ** 16
+
+
+def _get_index_matrix(seqs):
+    """returns uint8 matrix of character indices and the indexed characters
+
+    Parameters
+    ----------
+    seqs
+        series of equal length strings
+
+    Notes
+    -----
+    Only observed characters are indexed, in sorted order.
+    """
+    seqs = [str(s) for s in seqs]
+    length = len(seqs[0]) if seqs else 0
+    if not length:
+        return zeros((len(seqs), 0), dtype=uint8), []
+
+    # unicode strings are stored as uint32 code points
+    codes = numpy.array(seqs, dtype=f"U{length}").view(numpy.uint32)
+    codes = codes.reshape(len(seqs), length)
+    if codes.max() < 256:
+        observed = numpy.flatnonzero(numpy.bincount(codes.ravel(), minlength=256))
+        lookup = zeros(256, dtype=uint8)
+        lookup[observed] = arange(len(observed), dtype=uint8)
+        indices = lookup[codes]
+    else:
+        observed, indices = numpy.unique(codes, return_inverse=True)
+        if len(observed) > 256:
+            raise ValueError("more than 256 distinct characters")
+        indices = indices.astype(uint8).reshape(codes.shape)
+
+    return indices, [chr(c) for c in observed]
+
+
+def _get_motif_codes(indices, num_states, motif_length):
+    """returns integer codes of non-overlapping motifs and number of codes
+
+    Parameters
+    ----------
+    indices : numpy.ndarray
+        2D array of character indices, each row a sequence
+    num_states : int
+        number of distinct character indices
+    motif_length : int
+        number of characters per motif, trailing incomplete motifs are
+        ignored
+    """
+    if motif_length == 1:
+        return indices, num_states
+
+    num_motifs = indices.shape[1] // motif_length
+    codes = zeros((indices.shape[0], num_motifs), dtype=numpy.int64)
+    for i in range(motif_length):
+        codes *= num_states
+        codes += indices[:, i : num_motifs * motif_length : motif_length]
+    return codes, num_states ** motif_length
+
+
+def _count_codes(codes, num_codes, axis):
+    """returns counts of each code along axis of a 2D array of codes
+
+    Parameters
+    ----------
+    codes : numpy.ndarray
+        2D array of non-negative integer codes
+    num_codes : int
+        codes are in range(num_codes)
+    axis : int
+        if 1, counts are per row, if 0 per column
+
+    Returns
+    -------
+    array with shape (codes.shape[1 - axis], num_codes)
+    """
+    num_rows, num_cols = codes.shape
+    num = num_cols if axis == 0 else num_rows
+    counts = zeros((num, num_codes), dtype=int)
+    # rows are processed in blocks to bound memory use
+    step = max(1, _COUNT_CHUNK_SIZE // max(num_cols, 1))
+    if axis == 0:
+        offsets = arange(num_cols, dtype=numpy.int64) * num_codes
+    for start in range(0, num_rows, step):
+        chunk = codes[start : start + step].astype(numpy.int64)
+        if axis == 1:
+            size = chunk.shape[0]
+            offsets = arange(size, dtype=numpy.int64)[:, None] * num_codes
+            chunk += offsets
+            chunk = numpy.bincount(chunk.ravel(), minlength=size * num_codes)
+            counts[start : start + size] = chunk.reshape(size, num_codes)
+        else:
+            chunk += offsets
+            chunk = numpy.bincount(chunk.ravel(), minlength=num * num_codes)
+            counts += chunk.reshape(num, num_codes)
+    return counts
+
+
+def _count_motifs(indices, states, motif_length, axis):
+    """returns counts of observed motifs and the motifs
+
+    Parameters
+    ----------
+    indices : numpy.ndarray
+        2D array of character indices, each row a sequence
+    states : list
+        the characters corresponding to indices
+    motif_length : int
+        number of characters per non-overlapping motif
+    axis : int
+        if 1, counts are per sequence, if 0 per motif position
+
+    Returns
+    -------
+    counts array with a column per observed motif, list of motif strings
+    """
+    num_states = len(states)
+    codes, num_codes = _get_motif_codes(indices, num_states, motif_length)
+    # codes are compacted to those observed, bounding the size of counts
+    if num_codes <= _MAX_DIRECT_CODES:
+        present = numpy.flatnonzero(numpy.bincount(codes.ravel(), minlength=num_codes))
+        lookup = zeros(num_codes, dtype=numpy.int64)
+        lookup[present] = arange(len(present))
+        codes = lookup[codes]
+    else:
+        present, codes = numpy.unique(codes, return_inverse=True)
+        codes = codes.reshape(indices.shape[0], -1)
+
+    counts = _count_codes(codes, len(present), axis)
+    motifs = []
+    for code in present.tolist():
+        motif = []
+        for _ in range(motif_length):
+            code, index = divmod(code, num_states)
+            motif.append(states[index])
+        motifs.append("".join(reversed(motif)))
+    return counts, motifs
+
+
+def _select_motif_counts(counts, motifs, selected):
+    """returns counts with a column for each of selected motifs, zero for
+    motifs not in motifs"""
+    column = {m: i for i, m in enumerate(motifs)}
+    result = zeros((counts.shape[0], len(selected)), dtype=counts.dtype)
+    for i, motif in enumerate(selected):
+        if motif in column:
+            result[:, i] = counts[:, column[motif]]
+    return result
+
+
+# bounds on the number of position blocks used to find candidate duplicates
+_DUPLICATE_BLOCKS = 8
+_MAX_DUPLICATE_BLOCKS = 256
+
+
+def _row_labels(matrix):
+    """returns integer labels that are equal for identical rows of matrix"""
+    num_rows, width = matrix.shape
+    if width == 0:
+        return zeros(num_rows, dtype=int)
+    matrix = numpy.ascontiguousarray(matrix)
+    rows = matrix.view(numpy.dtype((numpy.void, matrix.dtype.itemsize * width)))
+    return numpy.unique(rows[:, 0], return_inverse=True)[1]
+
+
+def _masked_equal(seq1, mask1, seq2, mask2, length):
+    """whether sequences are identical at positions not masked in either
+
+    Notes
+    -----
+    Positions beyond length, the length of the shorter sequence, must all
+    be masked.
+    """
+    if not (mask1[length:].all() and mask2[length:].all()):
+        return False
+    valid = ~(mask1[:length] | mask2[:length])
+    return (seq1[:length][valid] == seq2[:length][valid]).all()
+
+
+def _get_identical_sets(matrix, names, mask=None, lengths=None):
+    """returns sets of names for sequences that are identical
+
+    Parameters
+    ----------
+    matrix : numpy.ndarray
+        2D array, a row per sequence
+    names
+        names corresponding to rows
+    mask : numpy.ndarray
+        2D bool array, True where a sequence position is to be ignored. If
+        None, sequences must be exactly the same.
+    lengths : numpy.ndarray
+        sequence lengths, if rows are padded. Padding must be masked.
+
+    Notes
+    -----
+    Exactly identical sequences are grouped by hashing. With a mask,
+    sequences are split into blocks, more of them the more positions are
+    masked, and each block unmasked in a sequence is labelled by its
+    content. Each distinct sequence is compared only to later distinct
+    sequences that are masked in, or have the same label for, the block
+    where its label is least common. Matched sequences are not considered
+    further.
+    """
+    num_seqs, width = matrix.shape
+    if lengths is None:
+        lengths = numpy.full(num_seqs, width)
+
+    classes = defaultdict(list)
+    for i, key in enumerate(zip(lengths.tolist(), _row_labels(matrix).tolist())):
+        classes[key].append(i)
+
+    if mask is None:
+        return [set(names[i] for i in c) for c in classes.values() if len(c) > 1]
+
+    # distinct sequences in order of first occurrence
+    members = list(classes.values())
+    reps = numpy.array([c[0] for c in members], dtype=int)
+    if not len(reps):
+        return []
+
+    matrix, mask, lengths = matrix[reps], mask[reps], lengths[reps]
+    num_reps = len(reps)
+    # with several blocks per masked position, most blocks of a pair of
+    # sequences are unmasked in both
+    num_masked = (mask.sum(axis=1) - (width - lengths)).mean()
+    num_blocks = max(_DUPLICATE_BLOCKS, int(numpy.ceil(4 * num_masked)))
+    num_blocks = max(1, min(num_blocks, _MAX_DUPLICATE_BLOCKS, width))
+    step = max(1, -(-width // num_blocks))
+    num_blocks = -(-width // step) if width else 1
+
+    # block labels, -1 where a block is masked
+    labels = numpy.full((num_reps, num_blocks), -1, dtype=int)
+    for b, start in enumerate(range(0, width, step)):
+        clean = ~mask[:, start : start + step].any(axis=1)
+        labels[clean, b] = _row_labels(matrix[clean, start : start + step])
+
+    # index of each block, and the number of sequences it selects
+    indices = []
+    sizes = numpy.full(labels.shape, num_reps + 1)
+    for b in range(num_blocks):
+        column = labels[:, b]
+        order = numpy.argsort(column, kind="stable")
+        ordered = column[order]
+        num_dirty = numpy.searchsorted(ordered, 0)
+        _, inverse, counts = numpy.unique(
+            column, return_inverse=True, return_counts=True
+        )
+        dirty = column < 0
+        sizes[~dirty, b] = counts[inverse[~dirty]] + num_dirty
+        indices.append((order, ordered, num_dirty))
+    anchors = sizes.argmin(axis=1)
+
+    identical_sets = []
+    seen = zeros(num_reps, dtype=bool)
+    for k in range(num_reps):
+        if seen[k]:
+            continue
+
+        b = anchors[k]
+        label = labels[k, b]
+        if label < 0:
+            # masked in every block
+            candidates = numpy.arange(k + 1, num_reps)
+        else:
+            order, ordered, num_dirty = indices[b]
+            lo, hi = numpy.searchsorted(ordered, [label, label + 1])
+            candidates = numpy.sort(
+                numpy.concatenate((order[:num_dirty], order[lo:hi]))
+            )
+            candidates = candidates[candidates > k]
+        candidates = candidates[~seen[candidates]]
+        # blocks unmasked in both must have the same label
+        other = labels[candidates]
+        compatible = (other == labels[k]) | (other < 0) | (labels[k] < 0)
+        candidates = candidates[compatible.all(axis=1)]
+
+        group = set(members[k])
+        for c in candidates.tolist():
+            length = min(lengths[k], lengths[c])
+            if _masked_equal(matrix[k], mask[k], matrix[c], mask[c], length):
+                seen[c] = True
+                group.update(members[c])
+
+        if len(group) > 1:
+            identical_sets.append(set(names[m] for m in group))
+
+    return identical_sets
+
+
+def _window_starts(length, window, step, start=None, end=None):
+    """returns range of window start positions, see sliding_windows"""
+    start = [start, 0][start is None]
+    end = [end, length - window + 1][end is None]
+    end = min(length - window + 1, end)
+    if start < end and length - end >= window - 1:
+        return range(start, end, step)
+    return range(0)
+
+
 class SeqLabeler(object):
     """Allows flexible seq labeling in to_fasta()."""
 
@@ -903,79 +1267,38 @@ class _SequenceCollectionBase:
             if True, degenerate characters are ignored
 
         """
-        # TODO handle case of not strict by building mask of degen positions
-        # per seq
         if mask_degen and not hasattr(self.moltype, "alphabets"):
             UserWarning(
                 "in get_identical_sets, strict has no effect as moltype "
                 "has no degenerate characters"
             )
             mask_degen = False
-        elif mask_degen:
-            degens = list(self.moltype.degenerates) + [self.moltype.gap]
 
-        def reduced(seq, indices):
-            s = "".join(seq[i] for i in range(len(seq)) if i not in indices)
-            return s
-
-        identical_sets = []
-        mask_posns = {}
-        seen = []
-        # if strict, we do a sort and one pass through the list
         seqs = self.to_dict()
         if not mask_degen:
-            seqs_names = [(s, n) for n, s in seqs.items()]
-            seqs_names.sort()
-            matched = None
             dupes = defaultdict(set)
-            for i in range(len(seqs_names) - 1):
-                if seqs_names[i][0] == seqs_names[i + 1][0]:
-                    matched = seqs_names[i][1] if matched is None else matched
-                    dupes[matched].update([seqs_names[i + 1][1], matched])
-                else:
-                    matched = None
-            identical_sets = list(dupes.values())
-            return identical_sets
-
-        for i in range(len(self.names) - 1):
-            n1 = self.names[i]
-            if n1 in seen:
-                continue
-
-            seq1 = seqs[n1]
-            if n1 not in mask_posns:
-                pos = self.moltype.get_degenerate_positions(seq1, include_gap=True)
-                mask_posns[n1] = pos
-                # TODO separately implement for ArrayAlignment
-
-            group = set()
-            for j in range(i + 1, len(self.names)):
-                n2 = self.names[j]
-                if n2 in seen:
-                    continue
-
-                seq2 = seqs[n2]
-                if n2 not in mask_posns:
-                    pos = self.moltype.get_degenerate_positions(seq2, include_gap=True)
-                    mask_posns[n2] = pos
-
-                seq2 = seqs[n2]
-
-                s1, s2 = seq1, seq2
-
-                pos = mask_posns[n1] + mask_posns[n2]
-                if pos:
-                    s1 = reduced(seq1, pos)
-                    s2 = reduced(seq2, pos)
-
-                if s1 == s2:
-                    seen.append(n2)
-                    group.update([n1, n2])
-
-            if group:
-                identical_sets.append(group)
+            for name in self.names:
+                dupes[seqs[name]].add(name)
+            return [group for group in dupes.values() if len(group) > 1]
+
+        # character codes of sequences, padded with 0
+        seqs = [seqs[n] for n in self.names]
+        lengths = numpy.array([len(seq) for seq in seqs], dtype=int)
+        width = lengths.max() if len(seqs) else 0
+        if not width:
+            return _get_identical_sets(zeros((len(seqs), 0)), self.names)
+
+        padded = "".join(seq.ljust(width, "\0") for seq in seqs)
+        try:
+            matrix = numpy.frombuffer(padded.encode("latin-1"), dtype=uint8)
+        except UnicodeEncodeError:
+            matrix = numpy.frombuffer(padded.encode("utf-32-le"), dtype="<u4")
+        matrix = matrix.reshape(len(seqs), width)
 
-        return identical_sets
+        degens = list(self.moltype.degenerates) + [self.moltype.gap]
+        mask = numpy.isin(matrix, [ord(c) for c in degens])
+        mask |= arange(width) >= lengths[:, None]
+        return _get_identical_sets(matrix, self.names, mask=mask, lengths=lengths)
 
     def get_similar(
         self,
@@ -2085,6 +2408,17 @@ class Aligned(object):
     def with_termini_unknown(self):
         return self.__class__(self.map.with_termini_unknown(), self.data)
 
+    def with_indel_map(self):
+        """returns copy of self with the gaps stored in an IndelMap
+
+        Notes
+        -----
+        The IndelMap holds gap positions and lengths as arrays, reducing the
+        memory required for sequences with many indels. Raises a ValueError
+        if self.map is not representable as an IndelMap.
+        """
+        return self.__class__(IndelMap.from_map(self.map), self.data)
+
     def copy_annotations(self, other):
         self.data.copy_annotations(other)
 
@@ -2349,6 +2683,67 @@ class AlignmentI(object):
         """
         return self.take_positions(self.get_position_indices(f, negate=negate))
 
+    def get_position_mask(self, mask, motif_length=1, drop_remainder=True):
+        """returns bool array, True for motifs to be retained
+
+        Parameters
+        ----------
+        mask
+            a bool array with an element per motif, or a callable that takes
+            an array of character indices of shape
+            (num_seqs, num_motifs, motif_length) and returns one. See
+            allowed_chars_mask, gap_frac_mask, variable_mask and
+            codon_position_mask.
+        motif_length : int
+            length of the motifs the sequences should be split into
+        drop_remainder : bool
+            If length is not modulo motif_length, allow dropping the terminal
+            remaining columns
+        """
+        length = self.seq_len
+        if length % motif_length != 0 and not drop_remainder:
+            raise ValueError(
+                "aligned length not divisible by " "motif_length=%d" % motif_length
+            )
+
+        num_motifs = length // motif_length
+        if callable(mask):
+            data = self._get_array_alignment().array_seqs
+            data = data[:, : num_motifs * motif_length]
+            mask = mask(data.reshape((self.num_seqs, num_motifs, motif_length)))
+
+        mask = numpy.asarray(mask, dtype=bool)
+        if mask.shape != (num_motifs,):
+            raise ValueError(f"mask shape {mask.shape} != ({num_motifs},)")
+        return mask
+
+    def filtered_by_mask(self, mask, motif_length=1, drop_remainder=True):
+        """The alignment motifs where mask is True. Returns None if no motifs
+        are retained.
+
+        Parameters
+        ----------
+        mask
+            a bool array with an element per motif, or a callable that takes
+            an array of character indices of shape
+            (num_seqs, num_motifs, motif_length) and returns one. See
+            allowed_chars_mask, gap_frac_mask, variable_mask and
+            codon_position_mask.
+        motif_length : int
+            length of the motifs the sequences should be split into, eg. 3 for
+            filtering aligned codons.
+        drop_remainder : bool
+            If length is not modulo motif_length, allow dropping the terminal
+            remaining columns
+        """
+        mask = self.get_position_mask(
+            mask, motif_length=motif_length, drop_remainder=drop_remainder
+        )
+        if not mask.any():
+            return None
+
+        return self._take_motifs(mask, motif_length)
+
     def iupac_consensus(self, alphabet=None):
         """Returns string containing IUPAC consensus sequence of the alignment.
         """
@@ -2496,18 +2891,15 @@ class AlignmentI(object):
             )
             raise ValueError(msg)
 
-        is_array = isinstance(self, ArrayAlignment)
-        alpha = self.alphabet
         if allow_gap:
             chars.extend(self.moltype.gap)
-            alpha = self.moltype.alphabet.gapped
 
-        if is_array:
-            chars = list(map(alpha.index, chars))
-
-        predicate = AllowedCharacters(chars, is_array=is_array)
-        new = self.filtered(predicate, motif_length=motif_length)
-        return new
+        aligned = self._get_array_alignment()
+        chars = [aligned.alphabet.index(c) for c in chars if c in aligned.alphabet]
+        mask = aligned.get_position_mask(
+            allowed_chars_mask(chars), motif_length=motif_length
+        )
+        return self.filtered_by_mask(mask, motif_length=motif_length)
 
     def omit_gap_pos(self, allowed_gap_frac=1 - eps, motif_length=1):
         """Returns new alignment where all cols (motifs) have <= allowed_gap_frac gaps.
@@ -2525,23 +2917,19 @@ class AlignmentI(object):
             is included in the counting. Default is 1.
 
         """
-        is_array = isinstance(self, ArrayAlignment)
-        try:
-            alpha = self.moltype.alphabets.degen_gapped
-        except:
-            alpha = self.moltype.alphabet
-
-        gaps = list(self.moltype.gaps)
-        if is_array:
-            gaps = list(map(alpha.index, gaps))
-
-        gaps_ok = GapsOk(
-            gaps, allowed_gap_frac, is_array=is_array, motif_length=motif_length
+        aligned = self._get_array_alignment()
+        alpha = aligned.alphabet
+        gaps = [alpha.index(c) for c in self.moltype.gaps if c in alpha]
+        mask = aligned.get_position_mask(
+            gap_frac_mask(gaps, allowed_gap_frac), motif_length=motif_length
         )
-        # if we're not deleting the 'naughty' seqs that contribute to the
-        # gaps, it's easy...
-        result = self.filtered(gaps_ok, motif_length=motif_length)
-        return result
+        return self.filtered_by_mask(mask, motif_length=motif_length)
+
+    def _get_array_alignment(self):
+        """self as an ArrayAlignment, converted if necessary"""
+        if isinstance(self, ArrayAlignment):
+            return self
+        return self.to_type(array_align=True)
 
     def get_gap_array(self, include_ambiguity=True):
         """returns bool array with gap state True, False otherwise
@@ -2734,12 +3122,8 @@ class AlignmentI(object):
             last window start position
 
         """
-        start = [start, 0][start is None]
-        end = [end, len(self) - window + 1][end is None]
-        end = min(len(self) - window + 1, end)
-        if start < end and len(self) - end >= window - 1:
-            for pos in range(start, end, step):
-                yield self[pos : pos + window]
+        for pos in _window_starts(len(self), window, step, start, end):
+            yield self[pos : pos + window]
 
     def _get_raw_pretty(self, name_order):
         """returns dict {name: seq, ...} for pretty print"""
@@ -2970,6 +3354,11 @@ class AlignmentI(object):
 
         return "\n".join(result)
 
+    def _get_index_matrix(self):
+        """returns uint8 matrix of character indices, a row per sequence, and
+        the characters corresponding to the indices"""
+        return _get_index_matrix(self.named_seqs[n] for n in self.names)
+
     def counts_per_pos(
         self, motif_length=1, include_ambiguity=False, allow_gap=False, alert=False
     ):
@@ -2986,9 +3375,9 @@ class AlignmentI(object):
         if alert and len(self) != length:
             warnings.warn(f"trimmed {len(self) - length}", UserWarning)
 
-        data = list(self.to_dict().values())
+        indices, states = self._get_index_matrix()
+        counts, motifs = _count_motifs(indices, states, motif_length, axis=0)
         alpha = self.moltype.alphabet.get_word_alphabet(motif_length)
-        all_motifs = set()
         exclude_chars = set()
         if not allow_gap:
             exclude_chars.update(self.moltype.gap)
@@ -2997,22 +3386,16 @@ class AlignmentI(object):
             ambigs = [c for c, v in self.moltype.ambiguities.items() if len(v) > 1]
             exclude_chars.update(ambigs)
 
-        result = []
-        for i in range(0, len(self) - motif_length + 1, motif_length):
-            counts = CategoryCounter([s[i : i + motif_length] for s in data])
-            all_motifs.update(list(counts))
-            result.append(counts)
-
-        if all_motifs:
-            alpha += tuple(sorted(set(alpha) ^ all_motifs))
-
+        alpha = list(alpha) + sorted(set(motifs) - set(alpha))
         if exclude_chars:
             # this additional clause is required for the bytes moltype
             # That moltype includes '-' as a character
             alpha = [m for m in alpha if not (set(m) & exclude_chars)]
 
-        for i, counts in enumerate(result):
-            result[i] = counts.tolist(alpha)
+        result = _select_motif_counts(counts, motifs, alpha)
+        if not result.any():
+            # all zero counts are only accepted by MotifCountsArray as lists
+            result = result.tolist()
 
         result = MotifCountsArray(result, alpha)
         return result
@@ -3046,24 +3429,23 @@ class AlignmentI(object):
         if alert and len(self) != length:
             warnings.warn(f"trimmed {len(self) - length}", UserWarning)
 
-        is_array = isinstance(self, ArrayAlignment)
-        counts = []
-        motifs = set()
-        for name in self.names:
-            if is_array:
-                seq = self.moltype.make_array_seq(
-                    self.array_seqs[self.names.index(name)]
-                )
-            else:
-                seq = self.get_gapped_seq(name)
-            c = seq.counts(
-                motif_length=motif_length,
-                include_ambiguity=include_ambiguity,
-                allow_gap=allow_gap,
-                exclude_unobserved=exclude_unobserved,
-            )
-            motifs.update(c.keys())
-            counts.append(c)
+        indices, states = self._get_index_matrix()
+        counts, observed = _count_motifs(indices, states, motif_length, axis=1)
+        if not include_ambiguity or not allow_gap:
+            is_degen = self.moltype.is_degenerate
+            is_gap = self.moltype.is_gapped
+            keep = []
+            for i, motif in enumerate(observed):
+                if not include_ambiguity and is_degen(motif):
+                    continue
+                elif not allow_gap and is_gap(motif):
+                    continue
+                keep.append(i)
+
+            counts = counts[:, keep]
+            observed = [observed[i] for i in keep]
+
+        motifs = set(observed)
 
         if not exclude_unobserved:
             motifs.update(self.moltype.alphabet.get_word_alphabet(motif_length))
@@ -3072,8 +3454,10 @@ class AlignmentI(object):
         if not motifs:
             return None
 
-        for i, c in enumerate(counts):
-            counts[i] = c.tolist(motifs)
+        counts = _select_motif_counts(counts, observed, motifs)
+        if not counts.any():
+            counts = counts.tolist()
+
         return MotifCountsArray(counts, motifs, row_indices=self.names)
 
     def variable_positions(self, include_gap_motif=True):
@@ -3086,20 +3470,17 @@ class AlignmentI(object):
             column are ignored.
 
         """
-        seqs = [str(self.named_seqs[n]) for n in self.names]
-        seq1 = seqs[0]
-        positions = list(zip(*seqs[1:]))
-        result = []
-        for (position, (motif1, column)) in enumerate(zip(seq1, positions)):
-            for motif in column:
-                if motif != motif1:
-                    if include_gap_motif:
-                        result.append(position)
-                        break
-                    elif motif != "-" and motif1 != "-":
-                        result.append(position)
-                        break
+        indices, states = self._get_index_matrix()
+        if not len(indices):
+            return []
+
+        first = indices[0]
+        variable = indices[1:] != first
+        if not include_gap_motif and "-" in states:
+            gap = states.index("-")
+            variable &= (indices[1:] != gap) & (first != gap)
 
+        result = numpy.flatnonzero(variable.any(axis=0)).tolist()
         return result
 
     def to_type(self, array_align=False, moltype=None, alphabet=None):
@@ -3801,6 +4182,42 @@ class ArrayAlignment(AlignmentI, _SequenceCollectionBase):
         result._repr_policy.update(self._repr_policy)
         return result
 
+    def window_view(self, window, step, start=None, end=None):
+        """returns sliding windows as views of the alignment array
+
+        Parameters
+        ----------
+        window
+            the number of positions in each window
+        step
+            the interval between the starts of successive windows
+        start
+            first window start position
+        end
+            last window start position
+
+        Returns
+        -------
+        ArrayAlignmentWindows, which provides per-window statistics and
+        iterates over windows as alignments
+        """
+        return ArrayAlignmentWindows(self, window, step, start=start, end=end)
+
+    def to_packed(self, bits=4):
+        """returns a bit-packed copy of a nucleotide alignment
+
+        Parameters
+        ----------
+        bits
+            4 stores each character in 4 bits, 2 stores canonical nucleotides
+            in 2 bits plus a mask of positions with other characters
+
+        Returns
+        -------
+        PackedArrayAlignment
+        """
+        return PackedArrayAlignment(self, bits=bits)
+
     def _coerce_seqs(self, seqs, is_array):
         """Controls how seqs are coerced in _names_seqs_order.
 
@@ -4002,6 +4419,45 @@ class ArrayAlignment(AlignmentI, _SequenceCollectionBase):
         )
         return result
 
+    def _take_motifs(self, mask, motif_length):
+        """returns new instance with motifs where mask is True"""
+        indices = numpy.flatnonzero(mask)
+        if motif_length != 1:
+            indices = (indices[:, None] * motif_length + arange(motif_length)).ravel()
+        return self._take_array_positions(indices)
+
+    def _take_array_positions(self, indices):
+        positions = self.array_seqs.take(indices, axis=1)
+        result = self.__class__(
+            positions,
+            force_same_data=True,
+            moltype=self.moltype,
+            info=self.info,
+            names=self.names,
+        )
+        return result
+
+    def take_positions(self, cols, negate=False):
+        """Returns new Alignment containing only specified positions.
+
+        Parameters
+        ----------
+        cols
+            series of position indices
+        negate : bool
+            if True, all positions except cols are returned
+        """
+        cols = numpy.asarray(cols, dtype=int)
+        if negate:
+            keep = numpy.ones(self.seq_len, dtype=bool)
+            keep[cols] = False
+            cols = numpy.flatnonzero(keep)
+        return self._take_array_positions(cols)
+
+    def _get_index_matrix(self):
+        """returns array_seqs and the alphabet characters"""
+        return self.array_seqs, list(self.alphabet)
+
     def get_gapped_seq(self, seq_name, recode_gaps=False, moltype=None):
         """Return a gapped Sequence object for the specified seqname.
 
@@ -4247,56 +4703,13 @@ class ArrayAlignment(AlignmentI, _SequenceCollectionBase):
             )
             mask_degen = False
 
-        if not mask_degen:
-            seqs_names = list(zip(self.array_seqs.tolist(), self.names))
-            seqs_names.sort()
-            matched = None
-            dupes = defaultdict(set)
-            for i in range(self.num_seqs - 1):
-                if seqs_names[i][0] == seqs_names[i + 1][0]:
-                    matched = seqs_names[i][1] if matched is None else matched
-                    dupes[matched].update([seqs_names[i + 1][1], matched])
-                else:
-                    matched = None
-            identical_sets = list(dupes.values())
-            return identical_sets
-
-        # we get the indexes range for non-degenerate characters
-        indices = [self.alphabet.index(c) for c in self.moltype]
-        # make sure they're all consecutive
-        diffs = set([indices[i - 1] - indices[i] for i in range(1, len(indices))])
-        assert diffs == set([-1]), diffs
-        start, end = min(indices), max(indices)
-        # identify non-masked positions
-        degen_masks = {}
-        for i in range(self.num_seqs):
-            s1 = self.array_seqs[i]
-            degen_masks[i] = logical_or(s1 <= start, s1 <= end)
-
-        identical_sets = []
-        seen = set()
-        for i in range(self.num_seqs - 1):
-            if i in seen:
-                continue
-
-            s1 = self.array_seqs[i]
-            m1 = degen_masks[i]
-            group = set()
-            for j in range(i + 1, self.num_seqs):
-                if j in seen:
-                    continue
-
-                s2 = self.array_seqs[j]
-                m2 = degen_masks[j]
-                valid_pos = logical_and(m1, m2)  # non-degen positions
-                if (s1[valid_pos] == s2[valid_pos]).all():
-                    seen.update([i, j])
-                    group.update([i, j])
-
-            if group:
-                identical_sets.append(set(self.names[i] for i in group))
+        mask = None
+        if mask_degen:
+            # non-degenerate characters have the lowest indices
+            end = max(self.alphabet.index(c) for c in self.moltype)
+            mask = self.array_seqs > end
 
-        return identical_sets
+        return _get_identical_sets(self.array_seqs, self.names, mask=mask)
 
     def deepcopy(self, sliced=True):
         """Returns deep copy of self."""
@@ -4313,6 +4726,455 @@ class ArrayAlignment(AlignmentI, _SequenceCollectionBase):
         return result
 
 
+class ArrayAlignmentWindows:
+    """sliding windows over an ArrayAlignment
+
+    Windows are strided views of the alignment array_seqs, so no data is
+    copied. Statistics for all windows are computed in one pass from
+    cumulative sums of per-position values.
+    """
+
+    def __init__(self, alignment, window, step, start=None, end=None):
+        """
+        Parameters
+        ----------
+        alignment : ArrayAlignment
+            the alignment
+        window : int
+            the number of positions in each window
+        step : int
+            the interval between the starts of successive windows
+        start
+            first window start position
+        end
+            last window start position
+        """
+        self.alignment = alignment
+        self.window = window
+        self.step = step
+        self.starts = numpy.array(
+            _window_starts(len(alignment), window, step, start, end), dtype=int
+        )
+
+    def __len__(self):
+        return len(self.starts)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def __getitem__(self, index):
+        """returns the window as an ArrayAlignment"""
+        start = self.starts[index]
+        return self.alignment[start : start + self.window]
+
+    def __repr__(self):
+        return (
+            f"{self.__class__.__name__}(num_windows={len(self)}, "
+            f"window={self.window}, step={self.step})"
+        )
+
+    @property
+    def array(self):
+        """read-only array view with shape (num_windows, num_seqs, window)"""
+        data = self.alignment.array_seqs
+        num_seqs = data.shape[0]
+        if not len(self):
+            return numpy.empty((0, num_seqs, self.window), dtype=data.dtype)
+
+        seq_stride, pos_stride = data.strides
+        return numpy.lib.stride_tricks.as_strided(
+            data[:, self.starts[0] :],
+            shape=(len(self), num_seqs, self.window),
+            strides=(self.step * pos_stride, seq_stride, pos_stride),
+            writeable=False,
+        )
+
+    def _window_sums(self, values):
+        """returns the sum of values per window
+
+        Parameters
+        ----------
+        values : numpy.ndarray
+            per-position values, first axis corresponds to alignment positions
+        """
+        values = numpy.asarray(values)
+        cumulative = zeros(
+            (values.shape[0] + 1,) + values.shape[1:], dtype=values.dtype
+        )
+        numpy.cumsum(values, axis=0, out=cumulative[1:])
+        return cumulative[self.starts + self.window] - cumulative[self.starts]
+
+    def counts(self, include_ambiguity=False, allow_gap=False):
+        """returns MotifCountsArray of counts per window
+
+        Parameters
+        ----------
+        include_ambiguity
+            if True, ambiguous characters from the moltype are included
+        allow_gap
+            if True, gap characters are included
+        """
+        counts = self.alignment.counts_per_pos(
+            include_ambiguity=include_ambiguity, allow_gap=allow_gap
+        )
+        result = self._window_sums(counts.array)
+        return MotifCountsArray(result, counts.motifs, row_indices=self.starts)
+
+    def gap_fraction(self, include_ambiguity=True):
+        """returns DictArray of the fraction of gap states per window
+
+        Parameters
+        ----------
+        include_ambiguity : bool
+            if True, ambiguity characters that include the gap state are
+            included
+        """
+        gaps = self.alignment.count_gaps_per_pos(include_ambiguity=include_ambiguity)
+        result = self._window_sums(gaps.array)
+        result = result / (self.alignment.num_seqs * self.window)
+        return DictArrayTemplate(self.starts.tolist()).wrap(result)
+
+    def entropy(self, include_ambiguity=False, allow_gap=False):
+        """returns DictArray of the mean Shannon entropy per position for
+        each window
+
+        Parameters
+        ----------
+        include_ambiguity
+            if True, ambiguous characters from the moltype are included
+        allow_gap
+            if True, gap characters are included
+
+        Notes
+        -----
+        Positions without any included characters are excluded, a window
+        without any such positions is nan.
+        """
+        entropy = self.alignment.entropy_per_pos(
+            include_ambiguity=include_ambiguity, allow_gap=allow_gap
+        )
+        valid = ~numpy.isnan(entropy)
+        totals = self._window_sums(numpy.where(valid, entropy, 0))
+        num = self._window_sums(valid.astype(int))
+        with numpy.errstate(divide="ignore", invalid="ignore"):
+            result = totals / num
+        return DictArrayTemplate(self.starts.tolist()).wrap(result)
+
+
+def _nonzero_fields_table(bits):
+    """number of non-zero bit fields of size bits in each byte value"""
+    values = numpy.arange(256)
+    result = numpy.zeros(256, dtype=numpy.int64)
+    field_mask = (1 << bits) - 1
+    for shift in range(0, 8, bits):
+        result += ((values >> shift) & field_mask) != 0
+    return result
+
+
+def _field_counts_table(bits):
+    """counts of each bit field value in each byte value"""
+    values = numpy.arange(256)
+    result = numpy.zeros((256, 1 << bits), dtype=numpy.int64)
+    field_mask = (1 << bits) - 1
+    for shift in range(0, 8, bits):
+        result[values, (values >> shift) & field_mask] += 1
+    return result
+
+
+def _pack_fields(data, bits):
+    """packs uint8 values < 2**bits into bytes, first field most
+    significant"""
+    per_byte = 8 // bits
+    num_rows, length = data.shape
+    num_bytes = -(-length // per_byte)
+    padded = numpy.zeros((num_rows, num_bytes * per_byte), dtype=numpy.uint8)
+    padded[:, :length] = data
+    padded = padded.reshape((num_rows, num_bytes, per_byte))
+    packed = numpy.zeros((num_rows, num_bytes), dtype=numpy.uint8)
+    for i in range(per_byte):
+        packed |= padded[:, :, i] << (8 - bits * (i + 1))
+    return packed
+
+
+def _unpack_fields(packed, bits, start, end):
+    """returns uint8 values for columns start to end"""
+    per_byte = 8 // bits
+    packed = packed[:, start // per_byte : -(-end // per_byte)]
+    field_mask = (1 << bits) - 1
+    shifts = 8 - bits * (numpy.arange(per_byte) + 1)
+    fields = (packed[:, :, None] >> shifts.astype(numpy.uint8)) & field_mask
+    fields = fields.reshape((packed.shape[0], -1))
+    offset = start - (start // per_byte) * per_byte
+    return fields[:, offset : offset + end - start].astype(numpy.uint8)
+
+
+class PackedArrayAlignment:
+    """nucleotide alignment with sequences bit-packed in memory
+
+    With bits=4, each character index of the degenerate gapped alphabet is
+    stored in 4 bits. With bits=2, canonical nucleotides are stored in 2 bits
+    and all other characters are recorded in a bit mask, with their
+    character indices stored separately. Positions are unpacked on demand
+    when sliced. Counting, Hamming distances and identity comparisons are
+    computed on the packed data.
+    """
+
+    def __init__(self, alignment, bits=4):
+        """
+        Parameters
+        ----------
+        alignment : ArrayAlignment
+            a DNA or RNA alignment
+        bits : int
+            either 4 or 2
+        """
+        if bits not in (2, 4):
+            raise ValueError(f"bits must be 2 or 4, not {bits}")
+
+        if alignment.moltype.label.lower() not in ("dna", "rna"):
+            raise ValueError("packing requires a nucleotide moltype")
+
+        data = alignment.array_seqs
+        if bits == 4 and data.size and data.max() >= 16:
+            raise ValueError("character indices exceed 4 bits, use bits=2")
+
+        self.names = list(alignment.names)
+        self.moltype = alignment.moltype
+        self.alphabet = alignment.alphabet
+        self.info = alignment.info
+        self.bits = bits
+        self.shape = data.shape
+        self._exceptions = None
+        self._exception_offsets = None
+        if bits == 2:
+            num_canonical = len(self.moltype.alphabet)
+            non_canonical = data >= num_canonical
+            self._exceptions = data[non_canonical]
+            self._exception_offsets = numpy.concatenate(
+                ([0], numpy.cumsum(non_canonical.sum(axis=1)))
+            )
+            self._mask = numpy.packbits(non_canonical, axis=1)
+            data = numpy.where(non_canonical, 0, data)
+
+        self._packed = _pack_fields(data, bits)
+
+    def __len__(self):
+        return self.shape[1]
+
+    @property
+    def num_seqs(self):
+        return self.shape[0]
+
+    @property
+    def nbytes(self):
+        """memory used by the packed data"""
+        result = self._packed.nbytes
+        if self.bits == 2:
+            result += (
+                self._mask.nbytes
+                + self._exceptions.nbytes
+                + self._exception_offsets.nbytes
+            )
+        return result
+
+    def __repr__(self):
+        return (
+            f"{self.num_seqs} x {len(self)} {self.bits}-bit packed "
+            f"{self.moltype.label} alignment"
+        )
+
+    def _get_array(self, start, end, rows=None):
+        """returns unpacked character indices for columns start to end"""
+        rows = numpy.arange(self.num_seqs) if rows is None else numpy.asarray(rows)
+        result = _unpack_fields(self._packed[rows], self.bits, start, end)
+        if self.bits == 4 or not len(self._exceptions):
+            return result
+
+        # restore non-canonical characters from their mask
+        mask = numpy.unpackbits(self._mask[rows], axis=1, count=end).astype(bool)
+        rank = numpy.cumsum(mask, axis=1) - 1
+        rank += self._exception_offsets[rows][:, None]
+        mask = mask[:, start:]
+        result[mask] = self._exceptions[rank[:, start:][mask]]
+        return result
+
+    @property
+    def array_seqs(self):
+        """unpacked array of character indices"""
+        return self._get_array(0, len(self))
+
+    def to_array_alignment(self):
+        """returns an ArrayAlignment"""
+        return self[:]
+
+    def __getitem__(self, index):
+        """returns the unpacked ArrayAlignment for a slice of positions"""
+        if isinstance(index, int):
+            index = slice(index, index + 1 or None)
+        if not isinstance(index, slice):
+            raise TypeError(f"cannot index by {type(index)}")
+
+        start, end, step = index.indices(len(self))
+        end = max(start, end) if step > 0 else end
+        if step > 0:
+            data = self._get_array(start, end)[:, ::step]
+        else:
+            data = self._get_array(0, len(self))[:, index]
+        return ArrayAlignment(
+            data,
+            names=self.names,
+            moltype=self.moltype,
+            info=self.info,
+            force_same_data=True,
+        )
+
+    def _byte_counts(self, packed):
+        """per row counts of each byte value"""
+        num_rows = packed.shape[0]
+        offsets = (numpy.arange(num_rows) * 256)[:, None]
+        return numpy.bincount(
+            (packed + offsets).ravel(), minlength=num_rows * 256
+        ).reshape((num_rows, 256))
+
+    def counts_per_seq(
+        self, include_ambiguity=False, allow_gap=False, exclude_unobserved=False
+    ):
+        """returns MotifCountsArray of character counts per sequence
+
+        Parameters
+        ----------
+        include_ambiguity
+            if True, ambiguous characters from the moltype are included.
+        allow_gap
+            if True, gap characters are included.
+        exclude_unobserved
+            if False, all canonical states included
+        """
+        field_counts = _field_counts_table(self.bits)
+        counts = self._byte_counts(self._packed.astype(numpy.int64)) @ field_counts
+        per_byte = 8 // self.bits
+        num_padding = self._packed.shape[1] * per_byte - len(self)
+        counts[:, 0] -= num_padding
+        num_states = len(self.alphabet)
+        result = numpy.zeros((self.num_seqs, num_states), dtype=int)
+        result[:, : counts.shape[1]] = counts[:, :num_states]
+        if self.bits == 2 and len(self._exceptions):
+            # masked positions are stored as 0
+            num_masked = numpy.diff(self._exception_offsets)
+            result[:, 0] -= num_masked
+            rows = numpy.repeat(numpy.arange(self.num_seqs), num_masked)
+            numpy.add.at(result, (rows, self._exceptions), 1)
+
+        # select motifs as for ArrayAlignment.counts_per_seq()
+        is_degen = self.moltype.is_degenerate
+        is_gap = self.moltype.is_gapped
+        canonical = set(self.moltype.alphabet)
+        observed = result.any(axis=0)
+        columns = {}
+        for i, motif in enumerate(self.alphabet):
+            if not include_ambiguity and is_degen(motif):
+                continue
+            elif not allow_gap and is_gap(motif):
+                continue
+            elif observed[i] or (motif in canonical and not exclude_unobserved):
+                columns[motif] = i
+
+        if not columns:
+            return None
+
+        motifs = list(sorted(columns))
+        counts = result[:, [columns[m] for m in motifs]]
+        if not counts.any():
+            counts = counts.tolist()
+
+        return MotifCountsArray(counts, motifs, row_indices=self.names)
+
+    def _row_key(self, index):
+        """bytes uniquely identifying a sequence"""
+        key = self._packed[index].tobytes()
+        if self.bits == 2:
+            lo, hi = self._exception_offsets[index : index + 2]
+            key += self._mask[index].tobytes() + self._exceptions[lo:hi].tobytes()
+        return key
+
+    def seqs_equal(self, name1, name2):
+        """whether two sequences are identical"""
+        index1 = self.names.index(name1)
+        index2 = self.names.index(name2)
+        return self._row_key(index1) == self._row_key(index2)
+
+    def get_identical_sets(self):
+        """returns sets of names for sequences that are identical"""
+        groups = defaultdict(list)
+        for i, name in enumerate(self.names):
+            groups[self._row_key(i)].append(name)
+        return [set(g) for g in groups.values() if len(g) > 1]
+
+    def _masked_fields(self):
+        """bytes with 2-bit fields set for masked positions, aligned with the
+        packed data"""
+        # each mask byte covers two bytes of packed data
+        values = numpy.arange(256)
+        table = numpy.zeros((256, 2), dtype=numpy.uint8)
+        for k in range(8):
+            is_set = ((values >> (7 - k)) & 1).astype(numpy.uint8)
+            table[:, k // 4] |= is_set * (3 << (6 - 2 * (k % 4)))
+        fields = table[self._mask].reshape((self.num_seqs, -1))
+        return fields[:, : self._packed.shape[1]]
+
+    def _exception_positions(self):
+        """column positions of masked characters for each sequence"""
+        bits = numpy.unpackbits(self._mask, axis=1, count=len(self)).astype(bool)
+        return [numpy.flatnonzero(row) for row in bits]
+
+    def _hamming_row(self, index, unmasked=None, positions=None):
+        """Hamming distances from sequence index to all sequences"""
+        nonzero = _nonzero_fields_table(self.bits)
+        diffs = self._packed ^ self._packed[index]
+        if self.bits == 4 or not len(self._exceptions):
+            return nonzero[diffs].sum(axis=1)
+
+        # canonical characters are compared where neither sequence is masked
+        diffs &= unmasked & unmasked[index]
+        result = nonzero[diffs].sum(axis=1)
+        # characters differ where only one sequence is masked
+        one_masked = numpy.unpackbits(self._mask ^ self._mask[index], axis=1)
+        result += one_masked.sum(axis=1, dtype=int)
+        # compare recorded characters where both are masked
+        offsets = self._exception_offsets
+        exceptions = self._exceptions
+        values = exceptions[offsets[index] : offsets[index + 1]]
+        for other in range(self.num_seqs):
+            _, i1, i2 = numpy.intersect1d(
+                positions[index],
+                positions[other],
+                assume_unique=True,
+                return_indices=True,
+            )
+            if len(i1):
+                other_values = exceptions[offsets[other] : offsets[other + 1]]
+                result[other] += (values[i1] != other_values[i2]).sum()
+        return result
+
+    def distance_matrix(self):
+        """returns DistanceMatrix of pairwise Hamming distances"""
+        from cogent3.evolve.fast_distance import DistanceMatrix
+
+        unmasked = positions = None
+        if self.bits == 2:
+            unmasked = ~self._masked_fields()
+            positions = self._exception_positions()
+
+        dists = {}
+        for i in range(self.num_seqs):
+            row = self._hamming_row(i, unmasked=unmasked, positions=positions)
+            for j in range(i + 1, self.num_seqs):
+                dists[(self.names[i], self.names[j])] = row[j]
+                dists[(self.names[j], self.names[i])] = row[j]
+        return DistanceMatrix(dists)
+
+
 class CodonArrayAlignment(ArrayAlignment):
     """Stores alignment of gapped codons, no degenerate symbols."""
 
@@ -4511,6 +5373,14 @@ class Alignment(_Annotatable, AlignmentI, SequenceCollection):
         new = self.__class__(data=masked_seqs, info=self.info, name=self.name)
         return new
 
+    def _take_motifs(self, mask, motif_length):
+        """returns new instance with motifs where mask is True"""
+        edges = numpy.diff(numpy.concatenate(([0], mask.astype(numpy.int8), [0])))
+        starts = numpy.flatnonzero(edges == 1) * motif_length
+        ends = numpy.flatnonzero(edges == -1) * motif_length
+        keep = Map(list(zip(starts.tolist(), ends.tolist())), parent_length=len(self))
+        return self.gapped_by_map(keep, info=self.info)
+
     @extend_docstring_from(ArrayAlignment.filtered)
     def filtered(self, predicate, motif_length=1, drop_remainder=True, **kwargs):
         length = self.seq_len
@@ -0,0 +1,588 @@
+#!/usr/bin/env python
+"""An immutable tree stored as arrays, for large phylogenies.
+
+Nodes are identified by their index in a preorder traversal, so the root
+is node 0, a node's parent always has a smaller index and the descendants
+of node i are the nodes i + 1 to i + size[i] - 1. These properties allow
+traversals, ancestry tests, lowest common ancestors, sub trees and
+distances to be computed using numpy operations on whole arrays.
+"""
+import numpy
+
+from cogent3.core.tree import PhyloNode, TreeError
+
+
+__author__ = "Gavin Huttley"
+__copyright__ = "Copyright 2007-2020, The Cogent Project"
+__credits__ = ["Gavin Huttley"]
+__license__ = "BSD-3"
+__version__ = "2020.2.7a"
+__maintainer__ = "Gavin Huttley"
+__email__ = "gavin.huttley@anu.edu.au"
+__status__ = "Alpha"
+
+
+def _preorder(parents):
+    """returns the preorder traversal of nodes, children visited in the
+    order they occur in parents"""
+    roots = numpy.flatnonzero(parents < 0)
+    if len(roots) != 1:
+        raise ValueError(f"a tree must have one root, not {len(roots)}")
+
+    num_nodes = len(parents)
+    nonroot = parents >= 0
+    child_nodes = numpy.flatnonzero(nonroot)
+    child_nodes = child_nodes[numpy.argsort(parents[nonroot], kind="stable")]
+    counts = numpy.bincount(parents[nonroot], minlength=num_nodes)
+    starts = numpy.concatenate(([0], numpy.cumsum(counts))).tolist()
+    child_nodes = child_nodes.tolist()
+
+    order = []
+    stack = [int(roots[0])]
+    while stack:
+        node = stack.pop()
+        order.append(node)
+        stack.extend(reversed(child_nodes[starts[node] : starts[node + 1]]))
+
+    if len(order) != num_nodes:
+        raise ValueError("parents includes nodes not connected to the root")
+    return numpy.array(order)
+
+
+def _subtree_sizes(parents):
+    """returns the number of nodes in each subtree, parents in preorder"""
+    sizes = [1] * len(parents)
+    parent_list = parents.tolist()
+    for node in range(len(parents) - 1, 0, -1):
+        sizes[parent_list[node]] += sizes[node]
+    return numpy.array(sizes)
+
+
+def _is_preorder(parents, sizes):
+    """whether nodes are in preorder, in which case every subtree lies within
+    the subtree of its parent"""
+    if sizes is None or parents[0] != -1:
+        return False
+    nodes = numpy.arange(1, len(parents))
+    parents = parents[1:]
+    return bool(
+        ((0 <= parents) & (parents < nodes)).all()
+        and (nodes + sizes[1:] <= parents + sizes[parents]).all()
+    )
+
+
+def _sum_over_ancestry(values, sizes):
+    """returns, for each node, the sum of values of the node and its
+    ancestors"""
+    num_nodes = len(values)
+    diff = numpy.zeros(num_nodes + 1, dtype=values.dtype)
+    diff[:num_nodes] = values
+    # the value of node i applies to its subtree, i to i + size[i] - 1
+    numpy.subtract.at(diff, numpy.arange(num_nodes) + sizes, values)
+    return numpy.cumsum(diff[:num_nodes])
+
+
+def _sparse_table(values):
+    """returns 2D array where [k, i] is the index of the minimum of
+    values[i: i + 2**k]"""
+    num = len(values)
+    num_levels = max(int(num).bit_length(), 1)
+    table = numpy.empty((num_levels, num), dtype=numpy.int32)
+    table[0] = numpy.arange(num)
+    for level in range(1, num_levels):
+        half = 1 << (level - 1)
+        prev = table[level - 1]
+        valid = num - (1 << level) + 1
+        left = prev[:valid]
+        right = prev[half : half + valid]
+        table[level, :valid] = numpy.where(values[left] <= values[right], left, right)
+        table[level, valid:] = prev[valid:]
+    return table
+
+
+def _range_argmin(table, values, start, end):
+    """returns indices of the minimum of values[start: end + 1]"""
+    level = numpy.frexp(end - start + 1)[1] - 1
+    left = table[level, start]
+    right = table[level, end - (1 << level) + 1]
+    return numpy.where(values[left] <= values[right], left, right)
+
+
+def _unrooted(parents, names, lengths, name_loaded):
+    """returns arrays with at least 3 children of the root, the children of
+    the first internal child of the root become children of the root"""
+    root_children = numpy.flatnonzero(parents == 0)
+    internal = root_children[numpy.isin(root_children, parents)]
+    if len(root_children) > 2 or len(internal) == 0:
+        return parents, names, lengths, name_loaded
+
+    merged = internal[0]
+    grand_children = parents == merged
+    lengths = lengths.copy()
+    if not numpy.isnan(lengths[merged]):
+        # a missing length is ignored, as for TreeNode.unrooted()
+        lengths[grand_children] += lengths[merged]
+    parents = parents.copy()
+    parents[grand_children] = 0
+
+    keep = numpy.arange(len(parents)) != merged
+    # one fewer node preceding those after merged
+    parents[parents > merged] -= 1
+    return parents[keep], names[keep], lengths[keep], name_loaded[keep]
+
+
+class ArrayTree:
+    """an immutable tree with nodes stored in preorder
+
+    Attributes
+    ----------
+    names
+        node names, as an object array
+    parents
+        parent index of each node, the root has parent -1
+    lengths
+        branch lengths, nan where missing
+    sizes
+        number of nodes in the subtree of each node (including the node)
+    """
+
+    def __init__(self, parents, names, lengths=None, name_loaded=None):
+        """
+        Parameters
+        ----------
+        parents
+            series with index of the parent of each node, -1 for the root
+        names
+            series of node names
+        lengths
+            series of branch lengths, None or nan where missing
+        name_loaded
+            series of bools, whether a name was specified (as opposed to
+            generated) for a node. Defaults to all True.
+        """
+        parents = numpy.array(parents, dtype=int)
+        num_nodes = len(parents)
+        names = list(names)
+        # assigning avoids numpy creating 2D arrays from tuple names
+        names_array = numpy.empty(len(names), dtype=object)
+        names_array[:] = names
+        names = names_array
+        if lengths is None:
+            lengths = numpy.full(num_nodes, numpy.nan)
+        else:
+            lengths = numpy.array(
+                [numpy.nan if l is None else l for l in lengths], dtype=float
+            )
+        if name_loaded is None:
+            name_loaded = numpy.ones(num_nodes, dtype=bool)
+        else:
+            name_loaded = numpy.array(name_loaded, dtype=bool)
+
+        if not len(names) == len(lengths) == len(name_loaded) == num_nodes:
+            raise ValueError("inconsistent number of nodes")
+
+        sizes = None if num_nodes == 0 else _subtree_sizes(parents)
+        if not _is_preorder(parents, sizes):
+            order = _preorder(parents)
+            new_index = numpy.empty(num_nodes, dtype=int)
+            new_index[order] = numpy.arange(num_nodes)
+            parents = parents[order]
+            parents[1:] = new_index[parents[1:]]
+            names, lengths, name_loaded = (
+                a[order] for a in (names, lengths, name_loaded)
+            )
+            sizes = _subtree_sizes(parents)
+
+        self.parents = parents
+        self.names = names
+        self.lengths = lengths
+        self.name_loaded = name_loaded
+        self.sizes = sizes
+        for array in (parents, names, lengths, name_loaded, self.sizes):
+            array.flags.writeable = False
+
+        self._name_index = None
+        self._depths = None
+        self._root_distances = None
+        self._children = None
+        self._lca_table = None
+
+    @classmethod
+    def from_tree(cls, tree):
+        """returns an ArrayTree with the names, lengths and topology of tree
+
+        Parameters
+        ----------
+        tree
+            a TreeNode or PhyloNode. Only names and the "length" param
+            are retained.
+        """
+        parents = []
+        names = []
+        lengths = []
+        name_loaded = []
+        index = {}
+        for node in tree.preorder():
+            index[id(node)] = len(parents)
+            parent = None if node is tree else node.parent
+            parents.append(-1 if parent is None else index[id(parent)])
+            names.append(node.name)
+            lengths.append(node.params.get("length", None))
+            name_loaded.append(node.name_loaded)
+        return cls(parents, names, lengths=lengths, name_loaded=name_loaded)
+
+    def to_tree(self, constructor=PhyloNode):
+        """returns the tree as linked nodes
+
+        Parameters
+        ----------
+        constructor
+            the node class, defaults to PhyloNode
+        """
+        nodes = []
+        parents = self.parents.tolist()
+        lengths = self.lengths.tolist()
+        for index, (name, loaded) in enumerate(zip(self.names, self.name_loaded)):
+            length = lengths[index]
+            params = {"length": None if length != length else length}
+            node = constructor(name=name, params=params, name_loaded=bool(loaded))
+            if index:
+                parent = nodes[parents[index]]
+                node._parent = parent
+                parent.children.append(node)
+            nodes.append(node)
+        return nodes[0]
+
+    def __len__(self):
+        return len(self.parents)
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}(num_nodes={len(self)}, num_tips={self.num_tips})"
+
+    @property
+    def num_nodes(self):
+        return len(self.parents)
+
+    @property
+    def is_tip(self):
+        """bool array, True for tips"""
+        return self.sizes == 1
+
+    @property
+    def num_tips(self):
+        return int(self.is_tip.sum())
+
+    @property
+    def depths(self):
+        """number of edges between each node and the root"""
+        if self._depths is None:
+            ones = numpy.ones(len(self), dtype=int)
+            ones[0] = 0
+            self._depths = _sum_over_ancestry(ones, self.sizes)
+            self._depths.flags.writeable = False
+        return self._depths
+
+    @property
+    def root_distances(self):
+        """sum of branch lengths between each node and the root, missing
+        lengths are treated as 0"""
+        if self._root_distances is None:
+            self._root_distances = self._get_root_distances()
+            self._root_distances.flags.writeable = False
+        return self._root_distances
+
+    def _get_root_distances(self, default_length=None):
+        """root distances with missing lengths set to default_length"""
+        if default_length is None:
+            if self._root_distances is not None:
+                return self._root_distances
+            default_length = 0
+        lengths = numpy.where(numpy.isnan(self.lengths), default_length, self.lengths)
+        lengths[0] = 0
+        return _sum_over_ancestry(lengths, self.sizes)
+
+    @property
+    def preorder(self):
+        """node indices in preorder"""
+        return numpy.arange(len(self))
+
+    @property
+    def postorder(self):
+        """node indices in postorder"""
+        last_descendant = numpy.arange(len(self)) + self.sizes - 1
+        return numpy.lexsort((-self.depths, last_descendant))
+
+    @property
+    def levelorder(self):
+        """node indices in levelorder"""
+        return numpy.lexsort((numpy.arange(len(self)), self.depths))
+
+    def _get_name_index(self):
+        if self._name_index is None:
+            # reversed, so the first node with a name is retained
+            self._name_index = {
+                name: index
+                for index, name in reversed(list(enumerate(self.names.tolist())))
+            }
+        return self._name_index
+
+    def get_node_index(self, name):
+        """returns the index of the node with name"""
+        try:
+            return self._get_name_index()[name]
+        except KeyError:
+            raise TreeError(f"No node named '{name}'")
+
+    def _as_indices(self, nodes):
+        """returns int array of node indices from node names or indices"""
+        nodes = numpy.asarray(nodes)
+        if nodes.dtype.kind in "iu":
+            return nodes
+        index = self._get_name_index()
+        try:
+            result = [index[name] for name in nodes.ravel().tolist()]
+        except KeyError as err:
+            raise TreeError(f"No node named {err}")
+        return numpy.array(result, dtype=int).reshape(nodes.shape)
+
+    def get_node_names(self, tipsonly=False):
+        """returns names of nodes in preorder"""
+        names = self.names[self.is_tip] if tipsonly else self.names
+        return names.tolist()
+
+    def get_tip_names(self):
+        """returns names of tips in preorder"""
+        return self.get_node_names(tipsonly=True)
+
+    def tips(self, node=0):
+        """returns indices of tips descended from node"""
+        node = int(self._as_indices(node))
+        descendants = numpy.arange(node, node + self.sizes[node])
+        return descendants[self.sizes[descendants] == 1]
+
+    def _get_children(self):
+        if self._children is None:
+            counts = numpy.bincount(self.parents[1:], minlength=len(self))
+            starts = numpy.concatenate(([0], numpy.cumsum(counts)))
+            # children are in preorder, so a stable sort keeps their order
+            children = numpy.argsort(self.parents[1:], kind="stable") + 1
+            self._children = starts, children
+        return self._children
+
+    def children(self, node):
+        """returns indices of the children of node"""
+        node = int(self._as_indices(node))
+        starts, children = self._get_children()
+        return children[starts[node] : starts[node + 1]]
+
+    def ancestors(self, node):
+        """returns indices of ancestors of node, from its parent to the root"""
+        node = int(self._as_indices(node))
+        result = []
+        parent = self.parents[node]
+        while parent >= 0:
+            result.append(parent)
+            parent = self.parents[parent]
+        return numpy.array(result, dtype=int)
+
+    def is_ancestor(self, ancestors, descendants):
+        """True where ancestors[i] is descendants[i], or one of its ancestors"""
+        ancestors = self._as_indices(ancestors)
+        descendants = self._as_indices(descendants)
+        return (ancestors <= descendants) & (
+            descendants < ancestors + self.sizes[ancestors]
+        )
+
+    def lca(self, nodes1, nodes2):
+        """returns indices of the lowest common ancestors of pairs of nodes
+
+        Parameters
+        ----------
+        nodes1, nodes2
+            node names or indices, or equal length series of these
+        """
+        nodes1 = self._as_indices(nodes1)
+        nodes2 = self._as_indices(nodes2)
+        if self._lca_table is None:
+            self._lca_table = _sparse_table(self.depths)
+
+        start = numpy.minimum(nodes1, nodes2)
+        end = numpy.maximum(nodes1, nodes2)
+        same = start == end
+        # for preorder indices u < v, the lca is the parent of the shallowest
+        # node among u + 1 .. v
+        shallowest = _range_argmin(
+            self._lca_table, self.depths, numpy.where(same, end, start + 1), end
+        )
+        return numpy.where(same, start, self.parents[shallowest])
+
+    def lowest_common_ancestor(self, nodes):
+        """returns index of the lowest common ancestor of nodes"""
+        nodes = self._as_indices(nodes)
+        return int(self.lca(nodes.min(), nodes.max()))
+
+    def distance(self, nodes1, nodes2, default_length=None):
+        """returns the sum of branch lengths between pairs of nodes
+
+        Parameters
+        ----------
+        nodes1, nodes2
+            node names or indices, or equal length series of these
+        default_length
+            used for missing branch lengths, defaults to 0
+        """
+        nodes1 = self._as_indices(nodes1)
+        nodes2 = self._as_indices(nodes2)
+        root_distances = self._get_root_distances(default_length)
+        lca = self.lca(nodes1, nodes2)
+        return root_distances[nodes1] + root_distances[nodes2] - 2 * root_distances[lca]
+
+    def tip_to_tip_distances(self, nodes=None, default_length=None):
+        """returns the matrix of distances between tips, and their indices
+
+        Parameters
+        ----------
+        nodes
+            node names or indices, defaults to all tips in preorder
+        default_length
+            used for missing branch lengths, defaults to 0
+        """
+        if nodes is not None:
+            root_distances = self._get_root_distances(default_length)
+            nodes = self._as_indices(nodes)
+            result = numpy.empty((len(nodes), len(nodes)), dtype=float)
+            # in blocks of rows, to limit the memory used by lca queries
+            block = max(1, 2 ** 22 // max(len(nodes), 1))
+            for start in range(0, len(nodes), block):
+                rows = nodes[start : start + block, None]
+                lca = self.lca(rows, nodes[None, :])
+                result[start : start + block] = (
+                    root_distances[rows]
+                    + root_distances[nodes]
+                    - 2 * root_distances[lca]
+                )
+            return result, nodes
+
+        tips = numpy.flatnonzero(self.is_tip)
+        # tips descended from node i have ranks first_tip[i] to
+        # first_tip[i + size[i]] - 1
+        first_tip = numpy.concatenate(([0], numpy.cumsum(self.is_tip)))
+        ends = first_tip[numpy.arange(len(self)) + self.sizes].tolist()
+        first_tip = first_tip.tolist()
+        lengths = self.lengths
+        if default_length is not None:
+            lengths = numpy.where(numpy.isnan(lengths), default_length, lengths)
+        lengths = numpy.nan_to_num(lengths).tolist()
+        result = numpy.zeros((len(tips), len(tips)), dtype=float)
+        # distances from tips to the current node, accumulated from the tips
+        # up so sums are in the same order as a recursive traversal
+        to_node = numpy.zeros(len(tips), dtype=float)
+        starts, children = self._get_children()
+        for node in numpy.flatnonzero(~self.is_tip)[::-1].tolist():
+            kids = children[starts[node] : starts[node + 1]].tolist()
+            for kid in kids:
+                to_node[first_tip[kid] : ends[kid]] += lengths[kid]
+            # node is the lca of tips from a child and tips from any later
+            # child, which together occupy a contiguous block of ranks
+            for kid, next_kid in zip(kids, kids[1:]):
+                rows = slice(first_tip[kid], ends[kid])
+                cols = slice(first_tip[next_kid], ends[node])
+                block = to_node[rows, None] + to_node[None, cols]
+                result[rows, cols] = block
+                result[cols, rows] = block.T
+        return result, tips
+
+    def get_sub_tree(
+        self, names, ignore_missing=False, keep_root=False, tipsonly=False
+    ):
+        """returns a new ArrayTree containing the named nodes
+
+        Parameters
+        ----------
+        names
+            node names, the tips of a named internal node are included
+        ignore_missing
+            if False, raises a ValueError if a name is not in the tree
+        keep_root
+            if False, the root is the lowest common ancestor of the selected
+            tips, otherwise it is the root of this tree
+        tipsonly
+            only tip names are allowed
+
+        Notes
+        -----
+        Nodes with a single descendant lineage are removed, with their branch
+        lengths added to that of their child (nan if any were missing). The
+        root is named "root".
+        """
+        index = self._get_name_index()
+        is_tip = self.is_tip
+        selected = []
+        for name in names:
+            node = index.get(name, None)
+            if node is not None and (is_tip[node] or not tipsonly):
+                selected.append(node)
+            elif not ignore_missing:
+                raise ValueError(f"edge {name} not found in tree")
+
+        num_nodes = len(self)
+        selected = numpy.array(selected, dtype=int)
+        covered = numpy.zeros(num_nodes + 1, dtype=int)
+        numpy.add.at(covered, selected, 1)
+        numpy.subtract.at(covered, selected + self.sizes[selected], 1)
+        kept_tips = (numpy.cumsum(covered[:num_nodes]) > 0) & is_tip
+
+        # number of kept tips in each subtree
+        cumulative = numpy.concatenate(([0], numpy.cumsum(kept_tips)))
+        nodes = numpy.arange(num_nodes)
+        num_kept = cumulative[nodes + self.sizes] - cumulative[nodes]
+        if num_kept[0] == 0:
+            raise TreeError("no tree created in make sub tree")
+        if num_kept[0] == 1 and not keep_root:
+            raise TreeError("only a tip was returned from selecting sub tree")
+
+        active = num_kept > 0
+        active[0] = False
+        active_children = numpy.bincount(self.parents[active], minlength=num_nodes)
+        keep = kept_tips | (active_children >= 2)
+        keep[0] |= keep_root
+
+        # nearest kept ancestor by pointer jumping, with num_nodes as a
+        # sentinel parent of the root
+        parents = numpy.append(self.parents, num_nodes)
+        parents[0] = num_nodes
+        nearest = numpy.where(
+            numpy.append(keep, True), numpy.arange(num_nodes + 1), parents
+        )
+        while True:
+            jumped = nearest[nearest]
+            if (jumped == nearest).all():
+                break
+            nearest = jumped
+
+        kept = numpy.flatnonzero(keep)
+        new_parents = nearest[parents[kept]]
+        new_index = numpy.full(num_nodes + 1, -1, dtype=int)
+        new_index[kept] = numpy.arange(len(kept))
+        new_parents = new_index[new_parents]
+
+        # branch lengths are the sum over the edges merged, nan if any of
+        # these were missing
+        lengths = self.lengths[kept].copy()
+        is_kept = numpy.append(keep, True)
+        ancestors = parents[kept]
+        merged = ~is_kept[ancestors]
+        while merged.any():
+            lengths[merged] += self.lengths[ancestors[merged]]
+            ancestors[merged] = parents[ancestors[merged]]
+            merged = ~is_kept[ancestors]
+
+        names = self.names[kept].copy()
+        names[0] = "root"
+        name_loaded = self.name_loaded[kept].copy()
+        if (self.parents == 0).sum() > 2:
+            # keep unrooted, as for TreeNode.get_sub_tree()
+            new_parents, names, lengths, name_loaded = _unrooted(
+                new_parents, names, lengths, name_loaded
+            )
+        return self.__class__(new_parents, names, lengths, name_loaded=name_loaded)
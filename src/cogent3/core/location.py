@@ -43,6 +43,8 @@ from bisect import bisect_left, bisect_right
 from functools import total_ordering
 from itertools import chain
 
+import numpy
+
 from cogent3.util.misc import (
     ClassChecker,
     ConstrainedList,
@@ -830,6 +832,296 @@ class Map(object):
         return zeroed
 
 
+class IndelMap(Map):
+    """A Map of a segment of an ungapped parent sequence onto gapped (e.g.
+    alignment) coordinates.
+
+    Gaps are stored as arrays of parent positions, before which each gap is
+    inserted, and cumulative gap lengths. Slicing, inversion and coordinate
+    conversion operate on these arrays. Span objects are only created if the
+    spans attribute is accessed.
+    """
+
+    def __init__(self, gap_pos, gap_lengths, parent_length, start=0, end=None):
+        """
+        Parameters
+        ----------
+        gap_pos
+            parent sequence positions before which gaps are inserted
+        gap_lengths
+            lengths of the gaps
+        parent_length : int
+            length of the ungapped parent sequence
+        start, end : int
+            the segment of the parent sequence that is mapped, defaults to
+            all of it
+        """
+        end = parent_length if end is None else end
+        gap_pos = numpy.asarray(gap_pos, dtype=numpy.int64)
+        gap_lengths = numpy.asarray(gap_lengths, dtype=numpy.int64)
+        keep = gap_lengths > 0
+        gap_pos, gap_lengths = gap_pos[keep], gap_lengths[keep]
+        if len(gap_pos) and (numpy.diff(gap_pos) <= 0).any():
+            # gaps at the same position are merged
+            gap_pos, index = numpy.unique(gap_pos, return_inverse=True)
+            gap_lengths = numpy.bincount(index, weights=gap_lengths).astype(numpy.int64)
+
+        if len(gap_pos) and (gap_pos[0] < start or gap_pos[-1] > end):
+            raise ValueError("gap positions outside mapped segment")
+
+        self.gap_pos = gap_pos
+        self.cum_gap_lengths = numpy.cumsum(gap_lengths)
+        self.parent_length = parent_length
+        self._start = start
+        self._end = end
+        self._inverse_map = None
+        self._spans = None
+        self._serialisable = dict(
+            gap_pos=gap_pos.tolist(),
+            gap_lengths=gap_lengths.tolist(),
+            parent_length=parent_length,
+            start=start,
+            end=end,
+        )
+
+    @classmethod
+    def from_map(cls, map):
+        """returns an IndelMap equivalent to a Map
+
+        Raises
+        ------
+        ValueError if the map spans are reversed or are not contiguous on the
+        parent
+        """
+        if isinstance(map, cls):
+            return map
+
+        gap_pos = []
+        gap_lengths = []
+        start = end = None
+        for span in map.spans:
+            if span.lost:
+                gap_pos.append(end)
+                gap_lengths.append(span.length)
+                continue
+
+            if span.reverse or (end is not None and span.start != end):
+                raise ValueError(f"{map} cannot be represented as an IndelMap")
+            start = span.start if start is None else start
+            end = span.end
+
+        if start is None:
+            # only gaps
+            start = end = 0
+        gap_pos = [start if p is None else p for p in gap_pos]
+        return cls(gap_pos, gap_lengths, map.parent_length, start=start, end=end)
+
+    @classmethod
+    def from_gapped_seq(cls, seq, gap_char="-"):
+        """returns an IndelMap for a gapped sequence string
+
+        Parameters
+        ----------
+        seq : str
+            the gapped sequence
+        gap_char : str
+            the gap character
+        """
+        gapped = numpy.frombuffer(
+            str(seq).encode("utf-32-le"), dtype=numpy.uint32
+        ) == ord(gap_char)
+        edges = numpy.diff(numpy.concatenate(([0], gapped.astype(numpy.int8), [0])))
+        gap_starts = numpy.flatnonzero(edges == 1)
+        gap_ends = numpy.flatnonzero(edges == -1)
+        gap_lengths = gap_ends - gap_starts
+        # parent positions are offset by the preceding gap lengths
+        preceding = numpy.concatenate(([0], numpy.cumsum(gap_lengths)[:-1]))
+        gap_pos = gap_starts - preceding
+        parent_length = len(gapped) - gap_lengths.sum()
+        return cls(gap_pos, gap_lengths, parent_length)
+
+    @property
+    def start(self):
+        return self._start
+
+    @property
+    def end(self):
+        return self._end
+
+    @property
+    def num_gaps(self):
+        """total length of gaps"""
+        return int(self.cum_gap_lengths[-1]) if len(self.cum_gap_lengths) else 0
+
+    @property
+    def gap_lengths(self):
+        return numpy.diff(self.cum_gap_lengths, prepend=0)
+
+    @property
+    def length(self):
+        return self._end - self._start + self.num_gaps
+
+    @property
+    def useful(self):
+        return self._end > self._start
+
+    @property
+    def complete(self):
+        return self.num_gaps == 0
+
+    @property
+    def reverse(self):
+        return False if self.useful else None
+
+    @property
+    def spans(self):
+        if self._spans is None:
+            self._spans = self._get_spans()
+        return self._spans
+
+    def _get_spans(self):
+        spans = []
+        last = self._start
+        for pos, length in zip(self.gap_pos.tolist(), self.gap_lengths.tolist()):
+            if pos > last:
+                spans.append(Span(last, pos))
+            spans.append(LostSpan(length))
+            last = pos
+        if self._end > last:
+            spans.append(Span(last, self._end))
+        return spans
+
+    @property
+    def offsets(self):
+        offsets = []
+        posn = 0
+        for span in self.spans:
+            offsets.append(posn)
+            posn += span.length
+        return offsets
+
+    def __repr__(self):
+        return repr(self.spans) + "/%s" % self.parent_length
+
+    def _gap_align_starts(self):
+        """alignment coordinates of the start of each gap"""
+        preceding = self.cum_gap_lengths - self.gap_lengths
+        return self.gap_pos - self._start + preceding
+
+    def _num_seq_before(self, align_index):
+        """number of sequence positions before alignment indices"""
+        align_index = numpy.asarray(align_index, dtype=numpy.int64)
+        gap_starts = self._gap_align_starts()
+        gap_lengths = self.gap_lengths
+        index = numpy.searchsorted(gap_starts, align_index, side="right") - 1
+        valid = index >= 0
+        index = numpy.where(valid, index, 0)
+        if not len(gap_starts):
+            return align_index
+
+        preceding = self.cum_gap_lengths[index] - gap_lengths[index]
+        within = numpy.minimum(gap_lengths[index], align_index - gap_starts[index])
+        gaps_before = numpy.where(valid, preceding + within, 0)
+        return align_index - gaps_before
+
+    def get_seq_index(self, align_index):
+        """returns parent sequence positions of alignment indices, -1 for
+        positions that are gaps
+
+        Parameters
+        ----------
+        align_index : int or array of int
+            positions in gapped coordinates
+        """
+        align_index = numpy.asarray(align_index, dtype=numpy.int64)
+        result = self._start + self._num_seq_before(align_index)
+        # a gap if the next position has the same number preceding
+        is_gap = self._num_seq_before(align_index + 1) == result - self._start
+        return numpy.where(is_gap, -1, result)
+
+    def get_align_index(self, seq_index):
+        """returns gapped coordinates of parent sequence positions
+
+        Parameters
+        ----------
+        seq_index : int or array of int
+            positions on the parent, within the mapped segment
+        """
+        seq_index = numpy.asarray(seq_index, dtype=numpy.int64)
+        index = numpy.searchsorted(self.gap_pos, seq_index, side="right") - 1
+        if len(self.gap_pos):
+            gaps_before = numpy.where(
+                index >= 0, self.cum_gap_lengths[numpy.maximum(index, 0)], 0
+            )
+        else:
+            gaps_before = 0
+        return seq_index - self._start + gaps_before
+
+    def __getitem__(self, index):
+        if isinstance(index, Map) or isinstance(index, (list, tuple)):
+            return Map.__getitem__(self, index)
+
+        lo, hi, step = _norm_slice(index, len(self))
+        assert (step or 1) == 1
+        hi = max(lo, hi)
+        start, end = self._start + self._num_seq_before(numpy.array([lo, hi]))
+        gap_starts = self._gap_align_starts()
+        gap_ends = gap_starts + self.gap_lengths
+        lengths = numpy.minimum(gap_ends, hi) - numpy.maximum(gap_starts, lo)
+        return self.__class__(
+            self.gap_pos, lengths, self.parent_length, start=int(start), end=int(end)
+        )
+
+    def inverse(self):
+        if self._inverse_map is None:
+            self._inverse_map = self._inverse()
+        return self._inverse_map
+
+    def _inverse(self):
+        # segment boundaries on the parent
+        bounds = numpy.concatenate(([self._start], self.gap_pos, [self._end]))
+        align_starts = self.get_align_index(bounds[:-1])
+        spans = []
+        last_hi = 0
+        for (lo, hi, start) in zip(
+            bounds[:-1].tolist(), bounds[1:].tolist(), align_starts.tolist()
+        ):
+            if hi <= lo:
+                continue
+            if lo > last_hi:
+                spans.append(LostSpan(lo - last_hi))
+            spans.append(Span(start, start + hi - lo))
+            last_hi = hi
+        if self.parent_length > last_hi:
+            spans.append(LostSpan(self.parent_length - last_hi))
+        return Map(spans=spans, parent_length=len(self))
+
+    def get_coordinates(self):
+        bounds = numpy.concatenate(([self._start], self.gap_pos, [self._end]))
+        return [
+            (lo, hi)
+            for lo, hi in zip(bounds[:-1].tolist(), bounds[1:].tolist())
+            if hi > lo
+        ]
+
+    def to_map(self):
+        """returns equivalent Map"""
+        return Map(spans=self.spans, parent_length=self.parent_length)
+
+    def to_rich_dict(self):
+        return self.to_map().to_rich_dict()
+
+    def zeroed(self):
+        """returns a new instance with the mapped segment starting at 0"""
+        return self.__class__(
+            self.gap_pos - self._start,
+            self.gap_lengths,
+            self._end - self._start,
+            start=0,
+            end=self._end - self._start,
+        )
+
+
 class SpansOnly(ConstrainedList):
     """List that converts elements to Spans on addition."""
 
@@ -75,6 +75,78 @@ class TreeError(Exception):
     pass
 
 
+class _TreeIndex:
+    """name and ancestry index for the nodes of a tree
+
+    Lowest common ancestors are computed from preorder positions, using a
+    sparse table for range minimum queries of node depth. The name and
+    ancestry indices are built on first use.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self.num_changes = TreeNode._num_changes
+        self.lookups = 0
+        self.nodes = None
+        self.names = None
+        self.positions = None
+        self.tree = None
+
+    def _get_nodes(self):
+        """returns nodes in preorder, marking them as indexed"""
+        if self.nodes is None:
+            self.nodes = list(self.root.preorder())
+            for node in self.nodes:
+                if node._stale:
+                    if node is not self.root:
+                        # built before the subtree changed
+                        node.__dict__.pop("_index", None)
+                    node._stale = False
+        return self.nodes
+
+    def _index_ancestry(self):
+        from cogent3.core.array_tree import ArrayTree
+
+        self.positions = {}
+        parents = []
+        for node in self._get_nodes():
+            self.positions[id(node)] = len(parents)
+            parent = None if node is self.root else node._parent
+            parents.append(-1 if parent is None else self.positions[id(parent)])
+        self.tree = ArrayTree(parents, [None] * len(parents))
+
+    def get_node(self, name):
+        """returns first node in preorder with name, or None"""
+        if self.names is None:
+            self.lookups += 1
+            if self.lookups == 1:
+                # a single lookup between changes is cheaper as a search
+                for node in self.root.preorder():
+                    if node.name == name:
+                        return node
+                return None
+            self.names = {}
+            for node in self._get_nodes():
+                self.names.setdefault(node.name, node)
+        return self.names.get(name)
+
+    def lca(self, node1, node2):
+        """returns lowest common ancestor of two nodes, None if either is
+        not in the tree"""
+        return self.lowest_common_ancestor([node1, node2])
+
+    def lowest_common_ancestor(self, nodes):
+        """returns lowest common ancestor of nodes, None if any is not in
+        the tree"""
+        if self.tree is None:
+            self._index_ancestry()
+        try:
+            positions = [self.positions[id(node)] for node in nodes]
+        except KeyError:
+            return None
+        return self.nodes[self.tree.lowest_common_ancestor(positions)]
+
+
 class TreeNode(object):
     """Store information about a tree node. Mutable.
 
@@ -85,7 +157,13 @@ class TreeNode(object):
         name_loaded: ?
     """
 
-    _exclude_from_copy = dict.fromkeys(["_parent", "children"])
+    _exclude_from_copy = dict.fromkeys(["_parent", "children", "_index", "_stale"])
+    # whether the topology or names of the subtree changed since it was
+    # indexed, if so, so have those of all ancestors
+    _stale = True
+    # counts changes to all trees
+    _num_changes = 0
+    _parent = None
 
     def __init__(
         self,
@@ -121,6 +199,30 @@ class TreeNode(object):
         """Returns Newick-format string representation of tree."""
         return self.get_newick()
 
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state.pop("_index", None)
+        return state
+
+    def _get_name(self):
+        return self.__dict__["name"]
+
+    def _set_name(self, name):
+        # stored in the instance dict, as for a plain attribute
+        self.__dict__["name"] = name
+        self._changed()
+
+    name = property(_get_name, _set_name)
+
+    def _changed(self):
+        """invalidates the indices of self and its ancestors"""
+        TreeNode._num_changes += 1
+        node = self
+        # ancestors of a stale node are already stale
+        while node is not None and not node._stale:
+            node._stale = True
+            node = node._parent
+
     # TODO have methods that need to rely on identity of self and
     # other actually do that
     # For now, the following comparison operators are peculiar in that
@@ -165,10 +267,12 @@ class TreeNode(object):
 
         Cleans up refs from i's original parent, but doesn't give self ref to i.
         """
+        self._changed()
         c = self.__class__
         if isinstance(i, c):
             if i._parent not in (None, self):
                 i._parent.children.remove(i)
+                i._parent._changed()
         else:
             i = c(i)
         i._parent = self
@@ -188,6 +292,7 @@ class TreeNode(object):
 
     def pop(self, index=-1):
         """Returns and deletes child of self at index (default: -1)"""
+        self._changed()
         result = self.children.pop(index)
         result._parent = None
         return result
@@ -225,6 +330,7 @@ class TreeNode(object):
 
     def __delitem__(self, i):
         """del node[i] deletes index or slice from self.children."""
+        self._changed()
         curr = self.children[i]
         if isinstance(i, slice):
             for c in curr:
@@ -305,6 +411,16 @@ class TreeNode(object):
 
     # support for basic tree operations -- finding objects and moving in the
     # tree
+    def _get_index(self):
+        """returns index of the nodes of self, built on first use and
+        rebuilt after the topology or names of self change"""
+        index = self.__dict__.get("_index")
+        if index is None or (
+            self._stale and index.num_changes != TreeNode._num_changes
+        ):
+            index = self._index = _TreeIndex(self)
+        return index
+
     def _get_parent(self):
         """Accessor for parent.
 
@@ -319,8 +435,10 @@ class TreeNode(object):
         if self._parent is not None:
             self._parent.remove_node(self)
         self._parent = parent
-        if (parent is not None) and (self not in parent.children):
-            parent.children.append(self)
+        if parent is not None:
+            if self not in parent.children:
+                parent.children.append(self)
+            parent._changed()
 
     parent = property(_get_parent, _set_parent)
 
@@ -610,53 +728,23 @@ class TreeNode(object):
 
         Always tests by identity.
         """
-        my_lineage = set([id(node) for node in [self] + self.ancestors()])
-        curr = other
-        while curr is not None:
-            if id(curr) in my_lineage:
-                return curr
-            curr = curr._parent
-        return None
+        return self.root()._get_index().lca(self, other)
 
     def lowest_common_ancestor(self, tipnames):
         """Lowest common ancestor for a list of tipnames
 
-        This should be around O(H sqrt(n)), where H is height and n is the
-        number of tips passed in.
+        Names not matching a tip are ignored, returns None if no names match.
         """
         if len(tipnames) == 1:
             return self.get_node_matching_name(tipnames[0])
 
-        tipnames = set(tipnames)
-        tips = [tip for tip in self.tips() if tip.name in tipnames]
-
+        index = self._get_index()
+        tips = [index.get_node(name) for name in set(tipnames)]
+        tips = [tip for tip in tips if tip is not None and not tip.children]
         if len(tips) == 0:
             return None
 
-        # scrub tree
-        if hasattr(self, "black"):
-            for n in self.traverse(include_self=True):
-                if hasattr(n, "black"):
-                    delattr(n, "black")
-
-        for t in tips:
-            prev = t
-            curr = t.parent
-
-            while curr and not hasattr(curr, "black"):
-                setattr(curr, "black", [prev])
-                prev = curr
-                curr = curr.parent
-
-            # increase black count, multiple children lead to here
-            if curr:
-                curr.black.append(prev)
-
-        curr = self
-        while len(curr.black) == 1:
-            curr = curr.black[0]
-
-        return curr
+        return index.lowest_common_ancestor(tips)
 
     lca = last_common_ancestor  # for convenience
 
@@ -1506,10 +1594,7 @@ class TreeNode(object):
         """
         find the edge with the name, or return None
         """
-        for node in self.traverse(self_before=True, self_after=False):
-            if node.name == name:
-                return node
-        return None
+        return self._get_index().get_node(name)
 
     def get_node_matching_name(self, name):
         node = self._get_node_matching_name(name)
@@ -1521,7 +1606,7 @@ class TreeNode(object):
         """Finds the last common ancestor of the two named edges."""
         edge1 = self.get_node_matching_name(name1)
         edge2 = self.get_node_matching_name(name2)
-        lca = edge1.last_common_ancestor(edge2)
+        lca = self._get_index().lca(edge1, edge2)
         if lca is None:
             raise TreeError("No LCA found for %s and %s" % (name1, name2))
         return lca
@@ -1536,17 +1621,15 @@ class TreeNode(object):
 
         LCA = self.get_connecting_node(name1, name2)
         node_path = [edge1]
-        node_path.extend(edge1.ancestors())
-        # remove nodes deeper than the LCA
-        LCA_ind = node_path.index(LCA)
-        node_path = node_path[: LCA_ind + 1]
-        # remove LCA and deeper nodes from anc list of other
-        anc2 = edge2.ancestors()
-        LCA_ind = anc2.index(LCA)
-        anc2 = anc2[:LCA_ind]
-        anc2.reverse()
-        node_path.extend(anc2)
-        node_path.append(edge2)
+        while node_path[-1] is not LCA:
+            node_path.append(node_path[-1]._parent)
+        # nodes from the LCA down to edge2
+        anc2 = []
+        curr = edge2
+        while curr is not LCA:
+            anc2.append(curr)
+            curr = curr._parent
+        node_path.extend(reversed(anc2))
         if not include_parent:
             node_path.remove(LCA)
         return node_path
@@ -1662,6 +1745,30 @@ class TreeNode(object):
                 i.__leaf_set = leaf_set
         return frozenset(sets)
 
+    def iter_clade_bits(self, tip_bits):
+        """iterates over (node, bits) in postorder
+
+        Parameters
+        ----------
+        tip_bits
+            {tip name: int with a single bit set, ...}
+
+        Notes
+        -----
+        bits is the bitwise or of tip_bits for the tips descended from node,
+        making it a compact and hashable encoding of the clade.
+        """
+        bits = {}
+        for node in self.postorder():
+            if node.children:
+                clade = 0
+                for child in node.children:
+                    clade |= bits.pop(id(child))
+            else:
+                clade = tip_bits[node.name]
+            bits[id(node)] = clade
+            yield node, clade
+
     def compare_by_subsets(self, other, exclude_absent_taxa=False):
         """Returns fraction of overlapping subsets where self and other differ.
 
@@ -1671,13 +1778,22 @@ class TreeNode(object):
         mismatches: if you don't want this behavior, strip out the non-matching
         tips first.
         """
-        self_sets, other_sets = self.subsets(), other.subsets()
+        names = set(self.get_tip_names()) | set(other.get_tip_names())
+        tip_bits = {name: 1 << i for i, name in enumerate(names)}
+        self_sets, other_sets = [
+            frozenset(
+                bits
+                for node, bits in tree.iter_clade_bits(tip_bits)
+                if node is not tree and bits & (bits - 1)
+            )
+            for tree in (self, other)
+        ]
         if exclude_absent_taxa:
-            in_both = self.subset() & other.subset()
+            in_both = sum(tip_bits[n] for n in self.subset() & other.subset())
             self_sets = [i & in_both for i in self_sets]
-            self_sets = frozenset([i for i in self_sets if len(i) > 1])
+            self_sets = frozenset([i for i in self_sets if i & (i - 1)])
             other_sets = [i & in_both for i in other_sets]
-            other_sets = frozenset([i for i in other_sets if len(i) > 1])
+            other_sets = frozenset([i for i in other_sets if i & (i - 1)])
         total_subsets = len(self_sets) + len(other_sets)
         intersection_length = len(self_sets & other_sets)
         if not total_subsets:  # no common subsets after filtering, so max dist
@@ -2143,134 +2259,86 @@ class PhyloNode(TreeNode):
             if hasattr(node, "TipDistance"):
                 del node.TipDistance
 
-    def _get_distances(self, endpoints=None):
-        """Iteratively calcluates all of the root-to-tip and tip-to-tip
-        distances, resulting in a tuple of:
-            - A list of (name, path length) pairs.
-            - A dictionary of (tip1,tip2):distance pairs
-        """
-        # linearize the tips in postorder.
-        # .__start, .__stop compose the slice in tip_order.
-        if endpoints is None:
-            tip_order = list(self.tips())
-        else:
-            tip_order = []
-            for i, name in enumerate(endpoints):
-                node = self.get_node_matching_name(name)
-                tip_order.append(node)
-        for i, node in enumerate(tip_order):
-            node.__start, node.__stop = i, i + 1
-
-        num_tips = len(tip_order)
-        result = {}
-        # distances from tip to curr node
-        tipdistances = zeros((num_tips), float)
-
-        def update_result():
-            # set tip_tip distance between tips of different child
-            for child1, child2 in combinations(node.children, 2):
-                for tip1 in range(child1.__start, child1.__stop):
-                    for tip2 in range(child2.__start, child2.__stop):
-                        name1 = tip_order[tip1].name
-                        name2 = tip_order[tip2].name
-                        result[(name1, name2)] = tipdistances[tip1] + tipdistances[tip2]
-                        result[(name2, name1)] = tipdistances[tip1] + tipdistances[tip2]
-
-        for node in self.traverse(self_before=False, self_after=True):
-            if not node.children:
-                continue
-            # subtree with solved child wedges
-            starts, stops = [], []  # to calc ._start and ._stop for curr node
-            for child in node.children:
-                if hasattr(child, "length") and child.length is not None:
-                    child_len = child.length
-                else:
-                    child_len = 1  # default length
-                tipdistances[child.__start : child.__stop] += child_len
-                starts.append(child.__start)
-                stops.append(child.__stop)
-            node.__start, node.__stop = min(starts), max(stops)
-            # update result if nessessary
-            if len(node.children) > 1:  # not single child
-                update_result()
+    def _to_array_tree(self, nodes=None):
+        """returns ArrayTree of self and indices of nodes within it"""
+        from cogent3.core.array_tree import ArrayTree
 
-        from_root = []
-        for i, n in enumerate(tip_order):
-            from_root.append((n.name, tipdistances[i]))
-        return from_root, result
+        tree = ArrayTree.from_tree(self)
+        if nodes is not None and len(nodes) and isinstance(nodes[0], TreeNode):
+            index = {id(node): i for i, node in enumerate(self.preorder())}
+            nodes = [index[id(node)] for node in nodes]
+        return tree, nodes
 
-    def get_distances(self, endpoints=None):
+    def get_distances(self, endpoints=None, default_length=1):
         """The distance matrix as a dictionary.
 
-        Usage:
-            Grabs the branch lengths (evolutionary distances) as
-            a complete matrix (i.e. a,b and b,a)."""
-
-        (root_dists, endpoint_dists) = self._get_distances(endpoints)
-        return endpoint_dists
+        Parameters
+        ----------
+        endpoints
+            names of nodes, defaults to all tips
+        default_length
+            used for edges without a length
+
+        Returns
+        -------
+        {(name1, name2): distance, ...} for both orders of each pair
+        """
+        matrix, tip_order = self.tip_to_tip_distances(
+            endpoints=endpoints, default_length=default_length
+        )
+        names = [node.name for node in tip_order]
+        matrix = matrix.tolist()
+        result = {}
+        for i, j in combinations(range(len(names)), 2):
+            result[(names[i], names[j])] = result[(names[j], names[i])] = matrix[i][j]
+        return result
 
     def tip_to_tip_distances(self, endpoints=None, default_length=1):
         """Returns distance matrix between all pairs of tips, and a tip order.
 
-        Warning: .__start and .__stop added to self and its descendants.
+        Parameters
+        ----------
+        endpoints
+            nodes, or their names, defaults to all tips
+        default_length
+            used for edges without a length
 
+        Notes
+        -----
         tip_order contains the actual node objects, not their names (may be
         confusing in some cases).
         """
-        all_tips = self.tips()
-        if endpoints is None:
-            tip_order = list(all_tips)
-        else:
-            if isinstance(endpoints[0], PhyloNode):
-                tip_order = endpoints
-            else:
-                tip_order = [self.get_node_matching_name(n) for n in endpoints]
-
-        # linearize all tips in postorder
-        # .__start, .__stop compose the slice in tip_order.
-        for i, node in enumerate(all_tips):
-            node.__start, node.__stop = i, i + 1
+        tree, nodes = self._to_array_tree(endpoints)
+        result, indices = tree.tip_to_tip_distances(
+            nodes=nodes, default_length=default_length
+        )
+        if endpoints is not None and isinstance(endpoints[0], TreeNode):
+            return result, list(endpoints)
 
-        # the result map provides index in the result matrix
-        result_map = dict([(n.__start, i) for i, n in enumerate(tip_order)])
-        num_all_tips = len(all_tips)  # total number of tips
-        num_tips = len(tip_order)  # total number of tips in result
-        result = zeros((num_tips, num_tips), float)  # tip by tip matrix
-        # dist from tip to curr node
-        tipdistances = zeros((num_all_tips), float)
+        preorder = list(self.preorder())
+        return result, [preorder[i] for i in indices.tolist()]
 
-        def update_result():
-            # set tip_tip distance between tips of different child
-            for child1, child2 in combinations(node.children, 2):
-                for tip1 in range(child1.__start, child1.__stop):
-                    if tip1 not in result_map:
-                        continue
-                    res_tip1 = result_map[tip1]
-                    for tip2 in range(child2.__start, child2.__stop):
-                        if tip2 not in result_map:
-                            continue
-                        result[res_tip1, result_map[tip2]] = (
-                            tipdistances[tip1] + tipdistances[tip2]
-                        )
+    def get_pairwise_distances(self, pairs, default_length=1):
+        """returns distances between pairs of nodes
 
-        for node in self.traverse(self_before=False, self_after=True):
-            if not node.children:
-                continue
-            # subtree with solved child wedges
-            starts, stops = [], []  # to calc ._start and ._stop for curr node
-            for child in node.children:
-                if hasattr(child, "length") and child.length is not None:
-                    child_len = child.length
-                else:
-                    child_len = default_length
-                tipdistances[child.__start : child.__stop] += child_len
-                starts.append(child.__start)
-                stops.append(child.__stop)
-            node.__start, node.__stop = min(starts), max(stops)
-            # update result if nessessary
-            if len(node.children) > 1:  # not single child
-                update_result()
-        return result + result.T, tip_order
+        Parameters
+        ----------
+        pairs
+            series of (node1, node2), as names or nodes
+        default_length
+            used for edges without a length
+
+        Returns
+        -------
+        numpy array of distances, in the order of pairs
+        """
+        pairs = list(pairs)
+        if not pairs:
+            return zeros(0, dtype=float)
+        nodes = [node for pair in pairs for node in pair]
+        tree, nodes = self._to_array_tree(nodes)
+        nodes = tree._as_indices(nodes).reshape(len(pairs), 2)
+        return tree.distance(nodes[:, 0], nodes[:, 1], default_length=default_length)
 
     def compare_by_tip_distances(
         self, other, sample=None, dist_f=distance_from_r, shuffle_f=shuffle
@@ -16,6 +16,8 @@ also:
 
 import re
 
+import numpy
+
 from cogent3.parse.record import FileFormatError
 
 
@@ -199,3 +201,188 @@ def parse_string(text, constructor, **kw):
     assert not stack, stack
     assert len(nodes) == 1, len(nodes)
     return nodes[0]
+
+
+_structure = re.compile("([(),:;])")
+
+
+def _fast_arrays(text, underscore_unmunge=False):
+    """returns parents, names, lengths and completion order of nodes in
+    preorder, or None if text requires the full parser
+
+    Notes
+    -----
+    Text with quoted labels or comments, or that is not a valid tree with
+    at least one pair of parentheses, is not handled.
+    """
+    if "'" in text or '"' in text or "[" in text:
+        return None
+
+    pieces = _structure.split(text)
+    if pieces[0].strip():
+        return None
+
+    # seps[k] is a structural character and between[k] the text following it
+    seps = numpy.array(pieces[1::2], dtype="U1")
+    between = pieces[2::2]
+    end = numpy.flatnonzero(seps == ";")
+    if len(end):
+        seps = seps[: end[0]]
+    num_seps = len(seps)
+    if num_seps == 0 or seps[0] != "(":
+        return None
+
+    is_open = seps == "("
+    is_close = seps == ")"
+    is_colon = seps == ":"
+    level = numpy.cumsum(is_open.astype(int) - is_close)
+    root_end = numpy.flatnonzero(level == 0)
+    if len(root_end) == 0:
+        return None
+    root_end = root_end[0]
+    # only the length of the root can follow its closing parenthesis
+    trailing = seps[root_end + 1 :]
+    if len(trailing) > 1 or (len(trailing) == 1 and trailing[0] != ":"):
+        return None
+
+    next_sep = numpy.append(seps[1:], ";")
+    prev_sep = numpy.insert(seps[:-1], 0, "")
+    is_tip = (is_open | (seps == ",")) & (next_sep != "(")
+    # labels can only precede a subtree if they are blank, and lengths only
+    # follow a label
+    before_subtree = numpy.flatnonzero(next_sep == "(")
+    if (
+        (is_close & (next_sep == "(")).any()
+        or (is_colon & ~numpy.isin(prev_sep, ["(", ")", ","])).any()
+        or (is_colon & numpy.isin(next_sep, ["(", ":"])).any()
+        or any(between[k].strip() for k in before_subtree)
+    ):
+        return None
+
+    lengths_at = numpy.full(num_seps, numpy.nan)
+    for k in numpy.flatnonzero(is_colon).tolist():
+        try:
+            lengths_at[k - 1] = float(between[k])
+        except ValueError:
+            return None
+
+    opens = numpy.flatnonzero(is_open)
+    closes = numpy.flatnonzero(is_close)
+    # parentheses at the same level pair up in order
+    opens = opens[numpy.lexsort((opens, level[opens]))]
+    closes = closes[numpy.lexsort((closes, level[closes] + 1))]
+    tips = numpy.flatnonzero(is_tip)
+
+    # internal nodes precede tips at the same sep, giving preorder
+    order = numpy.argsort(numpy.concatenate((2 * opens, 2 * tips + 1)))
+    label_at = numpy.concatenate((closes, tips))[order]
+    depths = numpy.concatenate((level[opens] - 1, level[tips]))[order]
+
+    # the parent is the nearest preceding node one level up
+    num_nodes = len(order)
+    index = numpy.arange(num_nodes)
+    keys = depths * num_nodes + index
+    by_depth = numpy.argsort(keys)
+    position = numpy.searchsorted(keys[by_depth], keys - num_nodes) - 1
+    parents = by_depth[position]
+    parents[0] = -1
+
+    names = []
+    for k in label_at.tolist():
+        name = between[k].strip()
+        if "\n" in name:
+            return None
+        if underscore_unmunge and "_" in name:
+            name = name.replace("_", " ")
+        names.append(name or None)
+
+    # nodes are completed, and so named, in order of their labels
+    completion = numpy.argsort(label_at)
+    return parents, names, lengths_at[label_at], completion
+
+
+def _unique_names(names, completion):
+    """returns names made unique as by TreeBuilder, and whether each name
+    was loaded"""
+    from cogent3.core.tree import TreeBuilder
+
+    builder = TreeBuilder()
+    result = list(names)
+    for index in completion.tolist():
+        result[index] = builder._unique_name(names[index])
+    return result, [name is not None for name in names]
+
+
+def parse_array_tree(text, underscore_unmunge=False):
+    """returns an ArrayTree from a Newick-format string
+
+    Parameters
+    ----------
+    text
+        Newick-format string
+    underscore_unmunge
+        replaces underscores with spaces in unquoted names
+
+    Notes
+    -----
+    Names are made unique as for trees built by TreeBuilder. An unnamed
+    root is named "root".
+    """
+    from cogent3.core.array_tree import ArrayTree
+
+    parsed = _fast_arrays(text, underscore_unmunge=underscore_unmunge)
+    if parsed is None:
+        tree = parse_tree(text, underscore_unmunge=underscore_unmunge)
+        return ArrayTree.from_tree(tree)
+
+    parents, names, lengths, completion = parsed
+    names, name_loaded = _unique_names(names, completion)
+    if not name_loaded[0]:
+        names[0] = "root"
+    return ArrayTree(parents, names, lengths, name_loaded=name_loaded)
+
+
+def parse_tree(text, constructor=None, underscore_unmunge=False):
+    """returns a tree from a Newick-format string
+
+    Parameters
+    ----------
+    text
+        Newick-format string
+    constructor
+        the node class, defaults to PhyloNode
+    underscore_unmunge
+        replaces underscores with spaces in unquoted names
+
+    Notes
+    -----
+    Produces the same tree as parse_string() with a TreeBuilder, but
+    without recursion. Text with quoted labels or comments is passed to
+    parse_string(). An unnamed root is named "root".
+    """
+    from cogent3.core.tree import PhyloNode, TreeBuilder
+
+    constructor = constructor or PhyloNode
+    parsed = _fast_arrays(text, underscore_unmunge=underscore_unmunge)
+    if parsed is None:
+        builder = TreeBuilder(constructor=constructor).create_edge
+        tree = parse_string(text, builder, underscore_unmunge=underscore_unmunge)
+    else:
+        parents, names, lengths, completion = parsed
+        names, name_loaded = _unique_names(names, completion)
+        nodes = []
+        for index, parent in enumerate(parents.tolist()):
+            length = lengths[index]
+            params = {} if length != length else {"length": float(length)}
+            node = constructor(
+                name=names[index], params=params, name_loaded=name_loaded[index]
+            )
+            if parent >= 0:
+                node._parent = nodes[parent]
+                nodes[parent].children.append(node)
+            nodes.append(node)
+        tree = nodes[0]
+
+    if not tree.name_loaded:
+        tree.name = "root"
+    return tree
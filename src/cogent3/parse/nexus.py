@@ -38,6 +38,63 @@ def parse_nexus_tree(tree_f):
     return trans_table, dnd
 
 
+def _strip_leading_comments(text):
+    """removes [bracketed] comments from the start of text"""
+    while text.startswith("[") and "]" in text:
+        text = text[text.index("]") + 1 :].lstrip()
+    return text
+
+
+def iter_nexus_tree_strings(tree_f):
+    """yields (name, dnd, trans_table) for each tree in a Nexus file
+
+    Parameters
+    ----------
+    tree_f
+        series of lines from a Nexus formatted file, read one at a time
+
+    Notes
+    -----
+    trans_table is the dict mapping taxa # to name from the translation
+    table, or None if there is no table.
+    """
+    in_tree = False
+    trans_table = None
+    statement = []
+    for line in tree_f:
+        line = line.strip()
+        line_lower = line.lower()
+        if not in_tree:
+            in_tree = line_lower.startswith("begin trees;")
+            continue
+
+        if not statement and (
+            line_lower.startswith("end;") or line_lower.startswith("endblock;")
+        ):
+            return
+
+        if line:
+            statement.append(line)
+        text = " ".join(statement)
+        # statements end with a ';' that is not within a comment
+        if not text.endswith(";") or text.count("[") > text.count("]"):
+            continue
+
+        statement = []
+        text = _strip_leading_comments(text)
+        text_lower = text.lower()
+        if text_lower.startswith("translate"):
+            entries = text[len("translate") :].rstrip(";").split(",")
+            trans_table = parse_trans_table([e for e in entries if e.strip()])
+        elif text_lower.startswith("tree") and "=" in text:
+            name, dnd = list(map(strip, text.split("=", 1)))
+            name = name.split(None, 1)[1].lstrip("* ") if " " in name else ""
+            yield name, _strip_leading_comments(dnd), trans_table
+
+    if not in_tree:
+        raise RecordError("not a valid Nexus Tree File")
+
+
 def get_tree_info(tree_f):
     """returns the trees section of a Nexus file:
     takes a handle for a Nexus formatted file as input:
@@ -1,10 +1,23 @@
 #!/usr/bin/env python
 
 import csv
+import json
+import struct
+import zipfile
 
 from collections.abc import Callable
+from itertools import islice
+
+import numpy
+
+from numpy.lib import format as npy_format
 
 from cogent3.util.misc import open_
+from cogent3.util.table import (
+    NPZ_METADATA,
+    cast_str_to_array,
+    cast_str_to_numeric,
+)
 
 from .record_finder import is_empty
 
@@ -192,3 +205,342 @@ def load_delimited(
         legend = ""
     # now do type casting in the order int, float, default is string
     return header, rows, title, legend
+
+
+def _split_lines(lines, delimiter, num_fields, skip_inconsistent):
+    """returns list of fields from lines, flattened in row order, and the
+    number of rows"""
+    num_delims = num_fields - 1
+    consistent = [line.count(delimiter) == num_delims for line in lines]
+    if all(consistent) and '"' not in "".join(lines):
+        # no quoting, so a single split gives all fields in row order
+        fields = delimiter.join(lines).split(delimiter)
+        return fields, len(lines)
+
+    rows = csv.reader(lines, dialect="excel", delimiter=delimiter)
+    rows = [row for row in rows]
+    lengths = set(map(len, rows)) | {num_fields}
+    if len(lengths) != 1:
+        if not skip_inconsistent:
+            msg = f"inconsistent number of fields {lengths}"
+            raise ValueError(msg)
+        rows = [row for row in rows if len(row) == num_fields]
+
+    fields = [field for row in rows for field in row]
+    return fields, len(rows)
+
+
+def _cast_chunk_column(values, dtype, inferred):
+    """returns values cast to dtype, or the type inferred from an earlier
+    chunk, or from values themselves"""
+    if dtype is not None:
+        return values.astype(dtype)
+
+    if inferred is not None:
+        try:
+            return values.astype(inferred)
+        except (ValueError, TypeError, OverflowError):
+            pass
+
+    return cast_str_to_numeric(values)
+
+
+class DelimitedChunkReader:
+    """reads a delimited file as chunks of numpy column arrays
+
+    Lines are split on the delimiter in blocks of chunk_size rows and each
+    selected column is cast to a numpy array in one operation. Lines containing
+    quote characters are parsed using the csv module. Types are inferred from
+    the first chunk and applied to subsequent chunks, falling back to per chunk
+    inference if a chunk cannot be cast. Iterating yields a dict of
+    {column name: array} per chunk. The title, header and legend attributes are
+    set once iteration has started (legend, once it has completed).
+    """
+
+    def __init__(
+        self,
+        filename,
+        delimiter=",",
+        header=True,
+        with_title=False,
+        with_legend=False,
+        limit=None,
+        columns=None,
+        dtype=None,
+        chunk_size=100000,
+        skip_inconsistent=False,
+    ):
+        """
+        Parameters
+        ----------
+        filename
+            path to a delimited file, can be compressed
+        delimiter
+            the delimiting character between columns
+        header
+            whether the first line (after the title) is the header, otherwise
+            columns are named by their index as a str
+        with_title
+            the first line is a title
+        with_legend
+            the last line is a legend
+        limit
+            maximum number of data rows to read
+        columns
+            series of column names to be read, others are ignored
+        dtype
+            a numpy type applied to all columns, or a dict of
+            {column name: type}. Columns without a type are inferred.
+        chunk_size
+            number of rows per chunk
+        skip_inconsistent
+            skips rows that have different length to header row, otherwise
+            these raise a ValueError
+        """
+        self.filename = filename
+        self.delimiter = delimiter or ","
+        self._has_header = header
+        self._with_title = with_title
+        self._with_legend = with_legend
+        self.limit = limit
+        self._columns = None if columns is None else list(columns)
+        self._dtype = dtype
+        self.chunk_size = chunk_size
+        self.skip_inconsistent = skip_inconsistent
+        self.title = ""
+        self.header = None
+        self.legend = ""
+
+    def _split(self, line):
+        if '"' in line:
+            return next(csv.reader([line], dialect="excel", delimiter=self.delimiter))
+        return line.split(self.delimiter)
+
+    def _dtypes(self):
+        """returns {column name: type or None}"""
+        if isinstance(self._dtype, dict):
+            return {c: self._dtype.get(c, None) for c in self.header}
+        return {c: self._dtype for c in self.header}
+
+    def _lines(self, infile):
+        """yields lists of lines without the line terminator"""
+        num_rows = 0
+        carry = []
+        while True:
+            size = self.chunk_size
+            if self.limit is not None:
+                size = min(size, self.limit - num_rows)
+            if size <= 0:
+                break
+
+            lines = [l.rstrip("\r\n") for l in islice(infile, size)]
+            if self._with_legend:
+                # the last line is held back until we know it is the last
+                lines = carry + lines
+                carry = lines[-1:]
+                lines = lines[:-1]
+
+            if not lines:
+                break
+
+            num_rows += len(lines)
+            yield lines
+
+        if carry and (self.limit is None or next(infile, None) is None):
+            self.legend = "".join(self._split(carry[0]))
+
+    def __iter__(self):
+        with open_(self.filename) as infile:
+            if self._with_title:
+                self.title = "".join(self._split(next(infile, "").rstrip("\r\n")))
+
+            line = next(infile, "")
+            first = line.rstrip("\r\n")
+            first = self._split(first) if first else []
+            if self._has_header:
+                header = first
+            else:
+                header = [str(i) for i in range(len(first))]
+                infile = _prepend(line, infile)
+
+            num_fields = len(header)
+            selected = self._columns or header
+            missing = set(selected) - set(header)
+            if missing:
+                raise ValueError(f"columns {missing} not in header")
+
+            indices = [header.index(c) for c in selected]
+            self.header = list(selected)
+            dtypes = self._dtypes()
+            inferred = {}
+            for lines in self._lines(infile):
+                fields, num_rows = _split_lines(
+                    lines, self.delimiter, num_fields, self.skip_inconsistent
+                )
+                chunk = {}
+                for index, name in zip(indices, self.header):
+                    values = numpy.array(fields[index::num_fields], dtype="U")
+                    values = _cast_chunk_column(
+                        values, dtypes[name], inferred.get(name, None)
+                    )
+                    if values.dtype.kind != "U":
+                        inferred[name] = values.dtype
+                    chunk[name] = values
+
+                yield chunk
+
+
+def _prepend(line, infile):
+    """yields line, followed by lines from infile"""
+    if line:
+        yield line
+    yield from infile
+
+
+def _combine_chunks(chunks, header, static_type, dtypes):
+    """returns {column: array} from a series of chunks"""
+    data = {}
+    for name in header:
+        arrays = [chunk[name] for chunk in chunks]
+        if dtypes.get(name, None) is not None:
+            data[name] = (
+                numpy.concatenate(arrays)
+                if arrays
+                else numpy.array([], dtype=dtypes[name])
+            )
+            continue
+
+        if not arrays or any(a.dtype.kind == "U" for a in arrays):
+            # mixed types, which we resolve for the column as a whole
+            arrays = [a.astype(str) for a in arrays] or [numpy.array([], dtype="U")]
+            data[name] = cast_str_to_array(
+                numpy.concatenate(arrays), static_type=static_type
+            )
+            continue
+
+        data[name] = numpy.concatenate(arrays)
+    return data
+
+
+def load_delimited_columns(
+    filename,
+    header=True,
+    delimiter=",",
+    with_title=False,
+    with_legend=False,
+    limit=None,
+    columns=None,
+    dtype=None,
+    static_column_types=False,
+    skip_inconsistent=False,
+    chunk_size=100000,
+):
+    """loads a delimited file as typed numpy column arrays
+
+    Returns
+    -------
+    header, {column: array}, title, legend
+
+    Notes
+    -----
+    Columns are typed following cast_str_to_array(). If a column cannot be
+    cast to the type inferred from earlier chunks, values from those chunks
+    are converted back to str before the column is cast as a whole.
+    """
+    reader = DelimitedChunkReader(
+        filename,
+        delimiter=delimiter,
+        header=header,
+        with_title=with_title,
+        with_legend=with_legend,
+        limit=limit,
+        columns=columns,
+        dtype=dtype,
+        chunk_size=chunk_size,
+        skip_inconsistent=skip_inconsistent,
+    )
+    chunks = list(reader)
+    dtypes = reader._dtypes()
+    data = _combine_chunks(chunks, reader.header, static_column_types, dtypes)
+    return reader.header, data, reader.title, reader.legend
+
+
+_npy_headers = {
+    (1, 0): npy_format.read_array_header_1_0,
+    (2, 0): npy_format.read_array_header_2_0,
+}
+# zip local file header, the last two fields are the name and extra lengths
+_ZIP_LOCAL_HEADER = struct.Struct("<4s5H3L2H")
+
+
+def _memmap_npz_member(filename, info):
+    """returns a read-only memory map of an uncompressed npz member, or None
+    if the member cannot be memory mapped"""
+    if info.compress_type != zipfile.ZIP_STORED:
+        return None
+
+    with open(filename, "rb") as infile:
+        infile.seek(info.header_offset)
+        local = _ZIP_LOCAL_HEADER.unpack(infile.read(_ZIP_LOCAL_HEADER.size))
+        infile.seek(sum(local[-2:]), 1)
+        read_header = _npy_headers.get(npy_format.read_magic(infile), None)
+        if read_header is None:
+            return None
+        shape, fortran_order, dtype = read_header(infile)
+        offset = infile.tell()
+
+    if dtype.hasobject or 0 in shape:
+        return None
+
+    order = "F" if fortran_order else "C"
+    return numpy.memmap(
+        filename, dtype=dtype, mode="r", shape=shape, order=order, offset=offset
+    )
+
+
+def load_npz_columns(filename, columns=None, limit=None, memory_map=False):
+    """loads columns from a Table saved in npz format
+
+    Parameters
+    ----------
+    filename
+        path to a npz file written by Table.write()
+    columns
+        series of column names to load, other columns are not read
+    limit
+        number of rows to return
+    memory_map
+        numeric columns of uncompressed files are returned as read-only
+        memory maps, so their data is only read from disk when accessed
+
+    Returns
+    -------
+    header, {column: array}, {Table attribute: value}
+
+    Notes
+    -----
+    As for the pickle format, columns with an object dtype are pickled
+    so only load files from trusted sources.
+    """
+    with zipfile.ZipFile(filename) as archive:
+        with archive.open(f"{NPZ_METADATA}.npy") as infile:
+            metadata = npy_format.read_array(infile)
+        metadata = json.loads(metadata.item())
+        header = metadata["header"]
+        selected = header if columns is None else list(columns)
+        missing = set(selected) - set(header)
+        if missing:
+            raise ValueError(f"columns {missing} not in header")
+
+        data = {}
+        for name in selected:
+            member = f"column_{header.index(name)}.npy"
+            values = None
+            if memory_map:
+                values = _memmap_npz_member(filename, archive.getinfo(member))
+            if values is None:
+                with archive.open(member) as infile:
+                    values = npy_format.read_array(infile, allow_pickle=True)
+            data[name] = values if limit is None else values[:limit]
+
+    return selected, data, metadata["attrs"]
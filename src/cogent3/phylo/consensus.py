@@ -3,7 +3,6 @@
 import warnings
 
 from collections import defaultdict
-from itertools import product
 
 from cogent3 import make_tree
 from cogent3.core.tree import TreeBuilder
@@ -27,7 +26,7 @@ def majority_rule(trees, strict=False):
     Parameters
     ----------
     trees
-        A list of cogent3.evolve.tree objects
+        A series of cogent3.evolve.tree objects, can be an iterator
     strict
         A boolean flag for strict majority rule tree
         construction when true only nodes occurring >50% will be used
@@ -38,7 +37,7 @@ def majority_rule(trees, strict=False):
     Returns:
         a list of cogent3.evolve.tree objects
     """
-    trees = [(1, tree) for tree in trees]
+    trees = ((1, tree) for tree in trees)
     return weighted_majority_rule(trees, strict, "count", method="rooted")
 
 
@@ -52,7 +51,9 @@ def weighted_majority_rule(
     Parameters
     ----------
     weighted_trees : list
-        A reverse ordered list of (weight, tree) tuples.
+        A reverse ordered list of (weight, tree) tuples. Can be an iterator,
+        e.g. from tree_collection.iter_trees(), so trees are processed one
+        at a time.
     strict : bool
         Discard splits or clusters with consensus weight <= 0.5.
     attr : str
@@ -87,15 +88,17 @@ def weighted_majority_rule(
 
 @extend_docstring_from(weighted_majority_rule)
 def weighted_rooted_majority_rule(weighted_trees, strict=False, attr="support"):
+    # clades are encoded as bits, see TreeNode.iter_clade_bits
+    tip_bits = {}
     cladecounts = {}
     edgelengths = {}
     total = 0
     for (weight, tree) in weighted_trees:
         total += weight
-        edges = tree.get_edge_vector()
-        for edge in edges:
-            tips = edge.get_tip_names(includeself=True)
-            tips = frozenset(tips)
+        for name in tree.get_tip_names():
+            if name not in tip_bits:
+                tip_bits[name] = 1 << len(tip_bits)
+        for edge, tips in tree.iter_clade_bits(tip_bits):
             if tips not in cladecounts:
                 cladecounts[tips] = 0
             cladecounts[tips] += weight
@@ -105,8 +108,7 @@ def weighted_rooted_majority_rule(weighted_trees, strict=False, attr="support"):
             else:
                 edgelengths[tips] = length
     cladecounts = [(count, clade) for (clade, count) in list(cladecounts.items())]
-    cladecounts.sort()
-    cladecounts.reverse()
+    cladecounts.sort(reverse=True)
 
     if strict:
         # Remove any with support < 50%
@@ -116,19 +118,29 @@ def weighted_rooted_majority_rule(weighted_trees, strict=False, attr="support"):
                 break
 
     # Remove conflicts
-    accepted_clades = set()
-    counts = {}
+    accepted = []
     for (count, clade) in cladecounts:
-        for accepted_clade in accepted_clades:
-            if clade.intersection(accepted_clade) and not (
-                clade.issubset(accepted_clade) or clade.issuperset(accepted_clade)
+        for (_, accepted_clade) in accepted:
+            if (
+                clade & accepted_clade
+                and clade & ~accepted_clade
+                and accepted_clade & ~clade
             ):
                 break
         else:
-            accepted_clades.add(clade)
-            counts[clade] = count
-            weighted_length = edgelengths[clade]
-            edgelengths[clade] = weighted_length and weighted_length / count
+            accepted.append((count, clade))
+
+    names = _bit_names(tip_bits)
+    accepted_clades = set()
+    counts = {}
+    lengths = {}
+    for (count, bits) in accepted:
+        clade = _names_from_bits(bits, names)
+        accepted_clades.add(clade)
+        counts[clade] = count
+        weighted_length = edgelengths[bits]
+        lengths[clade] = weighted_length and weighted_length / count
+    edgelengths = lengths
 
     nodes = {}
     queue = []
@@ -170,74 +182,207 @@ def weighted_unrooted_majority_rule(weighted_trees, strict=False, attr="support"
     # Calculate raw split lengths and weights
     split_weights = defaultdict(float)
     split_lengths = defaultdict(float)
-    tips = None
+    tip_bits = None
+    total_weight = 0
     for (weight, tree) in weighted_trees:
-        for split, params in list(get_splits(tree).items()):
+        total_weight += weight
+        # Check that all trees have the same taxa
+        tips = tree.get_tip_names()
+        if tip_bits is None:
+            tip_bits = get_tip_bits(tips)
+        elif len(tips) != len(tip_bits) or tip_bits.keys() != set(tips):
+            raise NotImplementedError("all trees must have the same taxa")
+
+        for split, params in list(get_split_bits(tree, tip_bits).items()):
             split_weights[split] += weight
             if params["length"] is None:
                 split_lengths[split] = None
             else:
                 split_lengths[split] += weight * params["length"]
-        # Check that all trees have the same taxa
-        if tips is None:
-            tips = frozenset.union(*split)
-        elif tips != frozenset.union(*split):
-            raise NotImplementedError("all trees must have the same taxa")
 
     # Normalise split lengths by split weight and split weights by total weight
     for split in split_lengths:
         if not split_lengths[split] is None:
             split_lengths[split] /= split_weights[split]
-    total_weight = sum(w for w, t in weighted_trees[::-1])
     weighted_splits = [(w / total_weight, s) for s, w in list(split_weights.items())]
     weighted_splits.sort(reverse=True)
 
-    # Remove conflicts and any with support < 50% if strict
+    # Remove conflicts and any with support < 50% if strict. Splits are
+    # encoded as the side without the first tip, so two splits are
+    # compatible if they are disjoint or one contains the other
     accepted_splits = {}
     for weight, split in weighted_splits:
         if strict and weight <= 0.5:
             break
 
         for accepted_split in accepted_splits:
-            for s, a in product(split, accepted_split):
-                if s.isdisjoint(a):
-                    break
-            else:
+            if (
+                split & accepted_split
+                and split & ~accepted_split
+                and accepted_split & ~split
+            ):
                 break
         else:
             accepted_splits[split] = {attr: weight, "length": split_lengths[split]}
 
-    return [get_tree(accepted_splits)]
+    names = _bit_names(tip_bits)
+    return [get_tree(_splits_from_bits(accepted_splits, names))]
 
 
-def get_splits(tree):
-    """Return a dict keyed by the splits equivalent to the tree.
-    Values are {'length' : edge.length} for the corresponding edge.
+def get_tip_bits(names):
+    """returns {name: bit, ...} assigning bits in sorted name order
+
+    Notes
+    -----
+    Each bit is an int with a single bit set. A set of tips is the
+    bitwise or of their bits, making it compact, hashable and quick to
+    intersect or compare.
+    """
+    return {name: 1 << i for i, name in enumerate(sorted(names))}
+
+
+def _bit_names(tip_bits):
+    """returns list of names indexed by bit position"""
+    names = [None] * len(tip_bits)
+    for name, bit in tip_bits.items():
+        names[bit.bit_length() - 1] = name
+    return names
+
+
+def _names_from_bits(bits, names):
+    """returns frozenset of the names whose bits are set"""
+    return frozenset(
+        name for name, bit in zip(names, reversed(bin(bits)[2:])) if bit == "1"
+    )
+
+
+def _splits_from_bits(split_bits, names):
+    """returns dict keyed by splits as frozensets of names"""
+    everything = (1 << len(names)) - 1
+    result = {}
+    for split, params in split_bits.items():
+        halves = (
+            _names_from_bits(split, names),
+            _names_from_bits(everything ^ split, names),
+        )
+        result[frozenset(halves)] = params
+    return result
+
+
+def get_split_bits(tree, tip_bits=None):
+    """Return a dict keyed by the splits equivalent to the tree, encoded
+    as bits. Values are {'length' : edge.length} for the corresponding edge.
+
+    Parameters
+    ----------
+    tree
+        a PhyloNode
+    tip_bits
+        {name: bit, ...}, defaults to get_tip_bits(tree.get_tip_names())
+
+    Notes
+    -----
+    A split is encoded as the bitwise or of tip_bits for the side of the
+    split without the tip with the lowest bit.
     """
     if len(tree.children) < 3:
         warnings.warn("tree is rooted - will return splits for unrooted tree")
 
-    def getTipsAndSplits(tree):
-        if tree.is_tip():
-            return ({frozenset([tree.name]): {"length": tree.length}}, [tree.name])
-
-        splits = defaultdict(lambda: {"length": 0.0})
-        tips = []
-        for child in tree.children:
-            s, t = getTipsAndSplits(child)
-            splits.update(s)
-            tips.extend(t)
-        if not tree.is_root():
-            split = frozenset([t for s in splits for t in s])
-            if tree.length is None:
-                splits[split] = {"length": None}
+    if tip_bits is None:
+        tip_bits = get_tip_bits(tree.get_tip_names())
+
+    splits = {}
+    everything = 0
+    for node, clade in tree.iter_clade_bits(tip_bits):
+        if not node.children:
+            splits[clade] = {"length": node.length}
+            everything |= clade
+        elif not node.is_root():
+            if node.length is None:
+                splits[clade] = {"length": None}
             else:
-                splits[split] = {"length": tree.length + splits[split]["length"]}
-        return splits, tips
+                length = splits.get(clade, {"length": 0.0})["length"]
+                splits[clade] = {"length": node.length + length}
+
+    lowest = everything & -everything
+    return {
+        clade ^ everything if clade & lowest else clade: params
+        for clade, params in splits.items()
+    }
+
+
+def get_splits(tree):
+    """Return a dict keyed by the splits equivalent to the tree.
+    Values are {'length' : edge.length} for the corresponding edge.
+    """
+    tip_bits = get_tip_bits(tree.get_tip_names())
+    splits = get_split_bits(tree, tip_bits)
+    return _splits_from_bits(splits, _bit_names(tip_bits))
 
-    splits, tips = getTipsAndSplits(tree)
-    tips = frozenset(tips)
-    return {frozenset([tips - s, s]): params for s, params in list(splits.items())}
+
+def get_informative_bits(tree, tip_bits, rooted=False):
+    """returns the set of clades, or splits if not rooted, with more than
+    one tip on each side, encoded as bits
+
+    Parameters
+    ----------
+    tree
+        a TreeNode
+    tip_bits
+        {name: bit, ...} for the tips of tree
+    rooted
+        if True, returns clades otherwise splits encoded as the side without
+        the tip with the lowest bit
+    """
+    everything = 0
+    clades = []
+    for node, clade in tree.iter_clade_bits(tip_bits):
+        if not node.children:
+            everything |= clade
+        elif node is not tree:
+            clades.append(clade)
+
+    lowest = everything & -everything
+    result = set()
+    for clade in clades:
+        if not rooted and clade & lowest:
+            clade ^= everything
+        # both sides of a split, or the outside of a clade, have > 1 tip
+        outside = everything ^ clade
+        if clade & (clade - 1) and (rooted or outside & (outside - 1)):
+            result.add(clade)
+    return result
+
+
+def robinson_foulds(tree1, tree2, rooted=False, normalise=False):
+    """returns the Robinson-Foulds distance between two trees
+
+    Parameters
+    ----------
+    tree1, tree2
+        trees with the same tip names
+    rooted
+        if True, compares clades, otherwise compares splits
+    normalise
+        if True, divides by the total number of clades or splits in both
+        trees, giving a value between 0 and 1
+
+    Returns
+    -------
+    The number of informative clades or splits present in only one of the
+    trees.
+    """
+    names = tree1.get_tip_names()
+    if set(names) != set(tree2.get_tip_names()):
+        raise ValueError("trees must have the same tip names")
+    tip_bits = get_tip_bits(names)
+    splits1 = get_informative_bits(tree1, tip_bits, rooted=rooted)
+    splits2 = get_informative_bits(tree2, tip_bits, rooted=rooted)
+    distance = len(splits1 ^ splits2)
+    if normalise:
+        total = len(splits1) + len(splits2)
+        distance = distance / total if total else 0.0
+    return distance
 
 
 def get_tree(splits):
@@ -4,11 +4,7 @@ import numpy
 from numpy.linalg import solve as solve_linear_equations
 
 from .tree_space import TreeEvaluator, ancestry2tree
-from .util import (
-    distance_dict_and_names_to_1D,
-    distance_dict_to_1D,
-    triangular_order,
-)
+from .util import distance_dict_and_names_to_1D, distance_dict_to_1D
 
 
 __author__ = "Peter Maxwell"
@@ -33,17 +29,17 @@ def _ancestry2paths(A):
     split metric matrix.  The paths will be in the same triangular matrix order
     as produced by distance_dict_and_names_to_1D, provided that the tips appear in
     the correct order in A"""
-    tips = [i for i in range(A.shape[0]) if sum(A[:, i]) == 1]
-    paths = []
-    for (tip1, tip2) in triangular_order(tips):
-        path = A[tip1] ^ A[tip2]
-        paths.append(path)
-    return numpy.array(paths)
+    tips = numpy.flatnonzero(A.sum(axis=0) == 1)
+    # row major lower triangle indices are in triangular_order()
+    (tip2, tip1) = numpy.tril_indices(len(tips), -1)
+    return A[tips[tip1]] ^ A[tips[tip2]]
 
 
 class WLS(TreeEvaluator):
     """(err, best_tree) = WLS(dists).trex()"""
 
+    scores_grown_together = True
+
     def __init__(self, dists, weights=None):
         """Arguments:
             - dists: a dict with structure (seq1, seq2): distance
@@ -91,6 +87,93 @@ class WLS(TreeEvaluator):
 
         return evaluate
 
+    def make_grown_tree_scorer(self, names, max_size=2 ** 21):
+        """Scores the trees grown from an ancestry matrix of names[:-1] by
+        adding names[-1] at each of split_edges, or every edge if None,
+        without constructing their path matrices. The
+        normal equations of each grown tree are derived from those of the
+        tree it is grown from and solved together, in batches of no more than
+        'max_size' matrix elements."""
+        dists = distance_dict_and_names_to_1D(self.dists, names)
+        weights = distance_dict_and_names_to_1D(self.weights, names)
+        # paths to the added tip are the last in triangular order
+        num_new = len(names) - 1
+        (dists0, dists1) = (dists[:-num_new], dists[-num_new:])
+        (weights0, weights1) = (weights[:-num_new], weights[-num_new:])
+        total1 = weights1.sum()
+        total_dists1 = dists1 @ weights1
+
+        def evaluate_grown(B, split_edges=None):
+            # A grown tree's paths are those of B with the split edge, e,
+            # divided into e and the new parent edge, plus a path from each
+            # tip to the new leaf. The latter differs from the path to the
+            # tip end of e, b = B[e], by the new leaf and parent edges, and
+            # their contribution to the normal equations is derived from the
+            # tip x edge matrix T and the sign of each edge in b.
+            m = len(B)
+            (sib, par) = (m, m + 1)
+            paths = _ancestry2paths(B)
+            X0 = paths.T @ (weights0[:, None] * paths)
+            y0 = paths.T @ (weights0 * dists0)
+            T = B[B.sum(axis=0) == 1].astype(float)
+            G = T.T @ (weights1[:, None] * T)
+            g = weights1 @ T
+            gd = (weights1 * dists1) @ T
+
+            if split_edges is None:
+                split_edges = numpy.arange(m)
+            split_edges = numpy.asarray(split_edges, dtype=int)
+            results = []
+            step = max(1, max_size // (m + 2) ** 2)
+            for start in range(0, len(split_edges), step):
+                edges = split_edges[start : start + step]
+                rows = numpy.arange(len(edges))
+                b = B[edges].astype(float)
+                s = 1 - 2 * b
+                sg = s * g
+                X = numpy.empty((len(edges), m + 2, m + 2))
+                X[:, :m, :m] = X0 + s[:, :, None] * s[:, None, :] * G
+                X[:, :m, :m] += sg[:, :, None] * b[:, None, :]
+                X[:, :m, :m] += b[:, :, None] * sg[:, None, :]
+                X[:, :m, :m] += total1 * b[:, :, None] * b[:, None, :]
+                # so far row e is that of the new parent edge, which is on
+                # the paths to the new leaf from tips not below e
+                X[:, par, :m] = X[rows, edges, :m]
+                X[:, par, par] = X[rows, edges, edges]
+                h = s * G[edges] + b * g[edges][:, None]
+                X[rows, edges, :m] = X0[edges] + h
+                X[rows, edges, edges] = X0[edges, edges] + g[edges]
+                X[rows, :m, edges] = X[rows, edges, :m]
+                X[rows, par, edges] = X0[edges, edges]
+                X[:, :m, par] = X[:, par, :m]
+                qbar = sg + total1 * b
+                X[:, sib, :m] = qbar
+                X[rows, sib, edges] = g[edges]
+                X[:, sib, par] = qbar[rows, edges]
+                X[:, sib, sib] = total1
+                X[:, :, sib] = X[:, sib]
+
+                y = numpy.empty((len(edges), m + 2))
+                y[:, :m] = y0 + s * gd + b * total_dists1
+                y[:, par] = y[rows, edges]
+                y[rows, edges] = y0[edges] + gd[edges]
+                y[:, sib] = total_dists1
+
+                lengths = numpy.maximum(solve_linear_equations(X, y), 0.0)
+                Lq = lengths[:, :m].copy()
+                Lq[rows, edges] = lengths[:, par]
+                diffs0 = paths @ lengths[:, :m].T
+                diffs0 += paths[:, edges] * lengths[:, par]
+                diffs0 -= dists0[:, None]
+                diffs1 = T @ (s * Lq).T + (b * Lq).sum(axis=1)
+                diffs1 += T[:, edges] * lengths[rows, edges] + lengths[:, sib]
+                diffs1 -= dists1[:, None]
+                errs = (diffs0 ** 2).sum(axis=0) + (diffs1 ** 2).sum(axis=0)
+                results.extend(zip(errs.tolist(), edges.tolist(), lengths))
+            return results
+
+        return evaluate_grown
+
     def result2output(self, err, ancestry, lengths, names):
         return (err, ancestry2tree(ancestry, lengths, names))
 
@@ -1,10 +1,12 @@
 #!/usr/bin/env python'
 from math import exp
 
+from cogent3.util import progress_display as UI
+
 from .least_squares import WLS
 from .tree_collection import make_trees  # only for back compat.
 from .tree_collection import LogLikelihoodScoredTreeCollection
-from .tree_space import TreeEvaluator, ancestry2tree
+from .tree_space import TreeEvaluator, ancestry2tree, ancestry_key, tree2ancestry
 
 
 __author__ = "Peter Maxwell"
@@ -29,15 +31,13 @@ class ML(TreeEvaluator):
         self.opt_args = opt_args
         self.names = alignment.names
         self.alignment = alignment
+        # bound methods rather than lambdas so instances can be pickled for
+        # parallel evaluation
         if hasattr(model, "make_likelihood_function"):
-            self.lf_factory = lambda tree: model.make_likelihood_function(tree)
+            self.lf_factory = model.make_likelihood_function
         else:
             self.lf_factory = model
-        if dists:
-            self.wlsMakeTreeScorer = WLS(dists).make_tree_scorer
-        else:
-            fake_wls = lambda a: (None, None)
-            self.wlsMakeTreeScorer = lambda n: fake_wls
+        self.wls = WLS(dists) if dists else None
 
     def evaluate_tree(self, tree):
         names = tree.get_tip_names()
@@ -48,10 +48,12 @@ class ML(TreeEvaluator):
 
     def make_tree_scorer(self, names):
         subalign = self.alignment.take_seqs(names)
-        wls_eval = self.wlsMakeTreeScorer(names)
+        wls_eval = None if self.wls is None else self.wls.make_tree_scorer(names)
 
         def evaluate(ancestry, lengths=None):
-            if lengths is None:
+            if lengths is None and wls_eval is None:
+                init_lengths = None
+            elif lengths is None:
                 (wls_err, init_lengths) = wls_eval(ancestry)
             else:
                 init_lengths = lengths
@@ -67,6 +69,99 @@ class ML(TreeEvaluator):
 
         return evaluate
 
+    def _fitted_lf(self, tree, alignment, free_edges=None):
+        """likelihood function for 'tree' optimised from the parameter values
+        on its edges. If 'free_edges' is provided, only the lengths of those
+        edges are optimised and all else held constant."""
+        lf = self.lf_factory(tree)
+        lf.set_alignment(alignment)
+        if free_edges is not None:
+            rules = []
+            for rule in lf.get_param_rules():
+                if rule["par_name"] == "length" and rule.get("edge") in free_edges:
+                    continue
+                if not rule.get("is_constant"):
+                    rule = {
+                        k: v for k, v in rule.items() if k not in ("lower", "upper")
+                    }
+                    rule["value"] = rule.pop("init")
+                    rule["is_constant"] = True
+                rules.append(rule)
+            lf.apply_param_rules(rules)
+        lf.optimise(show_progress=False, **self.opt_args)
+        return lf
+
+    @UI.display_wrap
+    def nni(self, tree, max_passes=None, show_progress=False, ui=None):
+        """Hill climbing by nearest neighbour interchanges from 'tree',
+        returns (lnL, annotated_tree).
+
+        Each rearrangement is scored after optimising only the lengths of
+        the five edges it touches, with all other parameters held at their
+        current values. An improving rearrangement is accepted immediately.
+        After each pass over all internal edges which changed the tree, all
+        parameters are optimised again. A topology is only scored the first
+        time it is encountered. Stops when a pass makes no change, or after
+        'max_passes'.
+
+        Every candidate builds a new likelihood function, so no partial
+        likelihoods are shared between candidates. Within the optimisation
+        of a candidate, only those on the path from the changed edges to
+        the root are recomputed."""
+        tree = tree.unrooted()
+        names = tree.get_tip_names()
+        alignment = self.alignment.take_seqs(names)
+
+        def topology(tree):
+            return ancestry_key(tree2ancestry(tree, order=names)[0])
+
+        lf = self._fitted_lf(tree, alignment)
+        lnL = lf.get_log_likelihood()
+        tree = lf.get_annotated_tree()
+        visited = {topology(tree)}
+        num_passes = 0
+        while max_passes is None or num_passes < max_passes:
+            num_passes += 1
+            changed = False
+            internal = [n.name for n in tree.nontips(include_self=False)]
+            for name in ui.series(internal, noun="NNI pass %s" % num_passes):
+                node = tree.get_node_matching_name(name)
+                num_siblings = len(node.parent.children) - 1
+                best = None
+                for i in range(len(node.children)):
+                    for j in range(num_siblings):
+                        candidate = tree.deepcopy()
+                        centre = candidate.get_node_matching_name(name)
+                        parent = centre.parent
+                        child = centre.children[i]
+                        sibling = [c for c in parent.children if c is not centre][j]
+                        centre.append(sibling)
+                        parent.append(child)
+                        key = topology(candidate)
+                        if key in visited:
+                            continue
+                        visited.add(key)
+                        free_edges = {c.name for c in centre.children}
+                        free_edges.update(c.name for c in parent.children)
+                        if not parent.isroot():
+                            free_edges.add(parent.name)
+                        cand_lf = self._fitted_lf(candidate, alignment, free_edges)
+                        cand_lnL = cand_lf.get_log_likelihood()
+                        if best is None or cand_lnL > best[0]:
+                            best = (cand_lnL, cand_lf)
+                if best is not None and best[0] > lnL:
+                    (lnL, lf) = best
+                    tree = lf.get_annotated_tree()
+                    changed = True
+
+            if not changed:
+                break
+            lf = self._fitted_lf(tree, alignment)
+            lnL = lf.get_log_likelihood()
+            tree = lf.get_annotated_tree()
+
+        return (lnL, tree)
+
     def result2output(self, err, ancestry, annotated_tree, names):
         return (-1.0 * err, annotated_tree)
 
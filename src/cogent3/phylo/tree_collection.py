@@ -1,4 +1,25 @@
-from numpy import exp, log
+import re
+
+from itertools import chain
+
+from numpy import (
+    arange,
+    array,
+    bincount,
+    concatenate,
+    cumsum,
+    exp,
+    log,
+    minimum,
+    repeat,
+    where,
+    zeros,
+)
+
+from cogent3.parse.nexus import iter_nexus_tree_strings
+from cogent3.util import parallel as PAR
+from cogent3.util.dict_array import DictArrayTemplate
+from cogent3.util.misc import open_
 
 from . import consensus
 
@@ -9,6 +30,9 @@ __credits__ = ["Peter Maxwell", "Ben Kaehler"]
 __license__ = "BSD-3"
 __version__ = "2020.2.7a"
 
+# a score in brackets following a tree
+_score_suffix = re.compile(r"^\s*\[\s*([-+]?[\d.]+(?:[eE][-+]?\d+)?)\s*\]")
+
 
 class _UserList(list):
     def __getitem__(self, index):
@@ -20,6 +44,67 @@ class _UserList(list):
         return result
 
 
+def _get_split_lengths(tree, tip_bits, rooted=False):
+    """returns {split bits: length} for all edges of tree, with missing
+    lengths treated as 0"""
+    everything = sum(tip_bits.values())
+    result = {}
+    for node, bits in tree.iter_clade_bits(tip_bits):
+        if node is tree:
+            continue
+        if not rooted and bits & 1:
+            bits ^= everything
+        # edges either side of a bifurcating root are the same split
+        result[bits] = result.get(bits, 0.0) + (node.length or 0.0)
+    return result
+
+
+class _SplitDistances:
+    """computes distances between trees from their splits
+
+    Splits are indexed across all trees, with trees stored as sparse rows
+    of split indices and lengths.
+    """
+
+    def __init__(self, tree_splits):
+        """
+        Parameters
+        ----------
+        tree_splits
+            series of {split: length} for each tree
+        """
+        index = {}
+        ids = []
+        lengths = []
+        counts = []
+        for splits in tree_splits:
+            counts.append(len(splits))
+            for split, length in splits.items():
+                ids.append(index.setdefault(split, len(index)))
+                lengths.append(length)
+        self.num_splits = len(index)
+        self.ids = array(ids, dtype=int)
+        self.lengths = array(lengths, dtype=float)
+        self.starts = concatenate(([0], cumsum(counts))).astype(int)
+        self.owners = repeat(arange(len(counts)), counts)
+        self.totals = bincount(self.owners, weights=self.lengths, minlength=len(counts))
+
+    def __call__(self, i):
+        """returns distances from tree i to trees i + 1 onwards"""
+        row = zeros(self.num_splits, dtype=float)
+        span = slice(self.starts[i], self.starts[i + 1])
+        row[self.ids[span]] = self.lengths[span]
+        start = self.starts[i + 1]
+        # sum of |a - b| over splits is the total lengths less twice the sum
+        # of min(a, b) over shared splits
+        shared = minimum(row[self.ids[start:]], self.lengths[start:])
+        num_after = len(self.totals) - i - 1
+        shared = bincount(
+            self.owners[start:] - i - 1, weights=shared, minlength=num_after
+        )
+        return self.totals[i] + self.totals[i + 1 :] - 2 * shared
+
+
 class ScoredTreeCollection(_UserList):
     """An ordered list of (score, tree) tuples"""
 
@@ -46,6 +131,83 @@ class ScoredTreeCollection(_UserList):
             strict = True
         return consensus.weighted_majority_rule(self, strict, method=method)
 
+    def distance_matrix(
+        self,
+        method="rf",
+        rooted=False,
+        normalise=False,
+        names=None,
+        parallel=False,
+        par_kw=None,
+    ):
+        """returns the pairwise distances between trees
+
+        Parameters
+        ----------
+        method : str
+            'rf' for Robinson-Foulds, the number of informative splits found
+            in only one tree. 'wrf' for weighted Robinson-Foulds, the sum
+            over all splits of the absolute difference in branch length
+            (0 for a split absent from a tree).
+        rooted : bool
+            compare clades instead of splits
+        normalise : bool
+            divide each distance by the sum of the number of splits, or
+            the total branch length if weighted, for the two trees
+        names
+            series of labels for the trees, defaults to their index
+        parallel : bool
+            compute rows in parallel
+        par_kw
+            dict of arguments for cogent3.util.parallel.imap
+
+        Returns
+        -------
+        DistanceMatrix
+        """
+        from cogent3.evolve.fast_distance import DistanceMatrix
+
+        method = method.lower()
+        if method not in ("rf", "wrf"):
+            raise ValueError(f"unknown method '{method}', use 'rf' or 'wrf'")
+
+        trees = [tree for _, tree in self]
+        if names is None:
+            names = [str(i) for i in range(len(trees))]
+        elif len(names) != len(trees):
+            raise ValueError("number of names does not match number of trees")
+
+        tip_names = set(trees[0].get_tip_names()) if trees else set()
+        tip_bits = consensus.get_tip_bits(tip_names)
+        tree_splits = []
+        for tree in trees:
+            if set(tree.get_tip_names()) != tip_names:
+                raise ValueError("all trees must have the same tip names")
+            if method == "wrf":
+                splits = _get_split_lengths(tree, tip_bits, rooted=rooted)
+            else:
+                splits = consensus.get_informative_bits(tree, tip_bits, rooted=rooted)
+                splits = dict.fromkeys(splits, 1.0)
+            tree_splits.append(splits)
+
+        calc = _SplitDistances(tree_splits)
+        rows = range(len(trees) - 1)
+        if parallel:
+            par_kw = par_kw or {}
+            results = PAR.imap(calc, list(rows), **par_kw)
+        else:
+            results = map(calc, rows)
+
+        dists = zeros((len(trees), len(trees)), dtype=float)
+        for i, row in enumerate(results):
+            dists[i, i + 1 :] = row
+        dists += dists.T
+        if normalise:
+            totals = calc.totals[:, None] + calc.totals[None, :]
+            dists /= where(totals, totals, 1)
+
+        return DistanceMatrix(DictArrayTemplate(names, names).wrap(dists))
+
 
 class UsefullyScoredTreeCollection(ScoredTreeCollection):
     def scored_tree_format(self, tree, score):
@@ -122,18 +284,102 @@ class LogLikelihoodScoredTreeCollection(UsefullyScoredTreeCollection):
         )
 
 
+def _iter_newick_strings(lines):
+    """yields (score, newick) from lines of Newick trees, each optionally
+    preceded by a score ('score<tab>tree') or followed by a score in
+    brackets ('tree<tab>[score]'). Score is None if absent."""
+    buffer = []
+    for line in lines:
+        while ";" in line:
+            text, line = line.split(";", 1)
+            text = ("".join(buffer) + text).strip()
+            buffer = []
+            score = None
+            parts = text.split(None, 1)
+            if len(parts) == 2 and parts[0][0] not in "('":
+                try:
+                    score = float(parts[0])
+                    text = parts[1]
+                except ValueError:
+                    pass
+            suffix = _score_suffix.match(line)
+            if suffix:
+                score = float(suffix.group(1))
+                line = line[suffix.end() :]
+            yield score, text + ";"
+        if line.strip():
+            buffer.append(line)
+
+
+def iter_trees(filename, burnin=0, thin=1, format=None, underscore_unmunge=False):
+    """yields (score, tree) from a multi-tree file, one tree at a time
+
+    Parameters
+    ----------
+    filename
+        path to a file of Newick or Nexus formatted trees. Newick trees can
+        be preceded by a score ('score<tab>tree'), as written by
+        UsefullyScoredTreeCollection.write(), or followed by a score in
+        brackets ('tree<tab>[score]'), as written by
+        ScoredTreeCollection.write().
+    burnin : int
+        number of trees to skip from the start of the file
+    thin : int
+        yield every thin'th tree after the burn-in
+    format : str
+        'newick' or 'nexus', inferred from the file content if None
+    underscore_unmunge : bool
+        replace underscores with spaces in all names read
+
+    Notes
+    -----
+    Only the trees retained after burn-in and thinning are parsed. Score is
+    None if the file has no scores, as for Nexus files.
+    """
+    from cogent3 import make_tree
+
+    if burnin < 0 or thin < 1:
+        raise ValueError("burnin must be >= 0 and thin >= 1")
+
+    with open_(filename) as infile:
+        for line in infile:
+            if line.strip():
+                break
+        else:
+            return
+
+        lines = chain([line], infile)
+        if format is None:
+            format = "nexus" if line.strip().lower().startswith("#nexus") else "newick"
+
+        if format.lower() == "nexus":
+            trees = (
+                (None, dnd, trans_table)
+                for _, dnd, trans_table in iter_nexus_tree_strings(lines)
+            )
+        elif format.lower() == "newick":
+            trees = ((score, dnd, None) for score, dnd in _iter_newick_strings(lines))
+        else:
+            raise ValueError(f"unsupported format '{format}'")
+
+        for index, (score, dnd, trans_table) in enumerate(trees):
+            if index < burnin or (index - burnin) % thin:
+                continue
+            tree = make_tree(dnd, underscore_unmunge=underscore_unmunge)
+            if trans_table:
+                tree.reassign_names(trans_table, nodes=tree.tips())
+            yield score, tree
+
+
 def make_trees(filename):
     """Parse a file of (score, tree) lines. Scores can be positive probabilities
     or negative log likelihoods."""
-    from cogent3 import make_tree
-
-    infile = open(filename, "r")
     trees = []
     klass = list
     # expect score, tree
-    for line in infile:
-        line = line.split(None, 1)
-        lnL = float(line[0])
+    for lnL, tree in iter_trees(filename, format="newick"):
+        if lnL is None:
+            raise ValueError("no score for tree %s" % tree)
         if lnL > 1:
             raise ValueError("likelihoods expected, not %s" % lnL)
         elif lnL > 0:
@@ -142,8 +388,6 @@ def make_trees(filename):
         else:
             assert klass in [list, LogLikelihoodScoredTreeCollection]
             klass = LogLikelihoodScoredTreeCollection
-        tree = make_tree(treestring=line[1])
         trees.append((lnL, tree))
     trees.sort(reverse=True)
-    infile.close()
     return klass(trees)
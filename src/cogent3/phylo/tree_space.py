@@ -104,6 +104,18 @@ def ancestry2tree(A, lengths, tip_names):
     return constructor(list(free.values()), "root", {})
 
 
+def ancestry_key(A):
+    """hashable encoding of the unrooted topology represented by ancestry
+    matrix 'A'. Independent of the order of the internal edges within A, but
+    assumes the same tip order."""
+    tips = numpy.sum(A, axis=0) == 1
+    splits = A[tips].astype(bool)
+    # each edge as the side of its split which excludes the first tip
+    splits[:, splits[0]] ^= True
+    edges = numpy.packbits(splits, axis=0).T
+    return b"".join(sorted(edge.tobytes() for edge in edges))
+
+
 def grown(B, split_edge):
     """Ancestry matrix 'B' with one extra leaf added at 'split_edge'.
     Row/column order within the matrix is independent of the topology it
@@ -125,12 +137,75 @@ def grown(B, split_edge):
     return A
 
 
+class _GrownTreeScorer(object):
+    """Scores trees grown from one of 'ancestries' by adding a leaf at the
+    given split edges, or all edges if None. Picklable so it can be sent to
+    worker processes, where the evaluator's grown tree scorer is built once
+    and then reused for all the trees in a chunk."""
+
+    def __init__(self, evaluator, names, ancestries):
+        self.evaluator = evaluator
+        self.names = names
+        self.ancestries = ancestries
+        self._evaluate = None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_evaluate"] = None
+        return state
+
+    def __call__(self, spec):
+        (tree_ordinal, split_edges) = spec
+        if self._evaluate is None:
+            self._evaluate = self.evaluator.make_grown_tree_scorer(self.names)
+        return [
+            (err, tree_ordinal, split_edge, lengths)
+            for (err, split_edge, lengths) in self._evaluate(
+                self.ancestries[tree_ordinal], split_edges
+            )
+        ]
+
+
+def _distinct_trees(trees):
+    """trees with duplicate topologies removed, keeping the first"""
+    seen = set()
+    result = []
+    for tree in trees:
+        key = ancestry_key(tree[-1])
+        if key not in seen:
+            seen.add(key)
+            result.append(tree)
+    return result
+
+
 class TreeEvaluator(object):
     """Subclass must provide make_tree_scorer and result2output"""
 
+    # whether make_grown_tree_scorer() scores trees together, in which case
+    # all the trees grown from one tree are scored as a single task
+    scores_grown_together = False
+
     def results2output(self, results):
         return ScoredTreeCollection(results)
 
+    def make_grown_tree_scorer(self, names):
+        """Function returning (err, split_edge, lengths) for the trees grown
+        from an ancestry matrix of names[:-1] by adding names[-1] at each of
+        split_edges, or every edge if None. Subclasses can override this to
+        score the grown trees together."""
+        evaluate = self.make_tree_scorer(names)
+
+        def evaluate_grown(ancestry, split_edges=None):
+            if split_edges is None:
+                split_edges = range(len(ancestry))
+            results = []
+            for split_edge in split_edges:
+                (err, lengths) = evaluate(grown(ancestry, split_edge))
+                results.append((err, split_edge, lengths))
+            return results
+
+        return evaluate_grown
+
     def evaluate_topology(self, tree):
         """Optimal (score, tree) for the one topology 'tree'"""
         (ancestry, names, lengths) = tree2ancestry(tree)
@@ -171,6 +246,8 @@ class TreeEvaluator(object):
         return_all=False,
         filename=None,
         interval=None,
+        parallel=False,
+        par_kw=None,
         show_progress=False,
         ui=None,
     ):
@@ -180,6 +257,8 @@ class TreeEvaluator(object):
         'start' is an optional list of initial trees.  Each of the trees must
         contain the same tips.
         'filename' and 'interval' control checkpointing.
+        'parallel' evaluates the candidate trees of each size across
+        processes, 'par_kw' is passed to cogent3.util.parallel.imap.
 
         Advanced step-wise addition algorithm
         M. J. Wolf, S. Easteal, M. Kahn, B. D. McKay, and L. S. Jermiin.
@@ -243,34 +322,35 @@ class TreeEvaluator(object):
 
         # For each tree size, grow at each edge of each tree. Keep best k.
         for n in range(init_tree_size + 1, tree_size + 1):
-            evaluate = self.make_tree_scorer(names[:n])
-
-            def grown_tree(spec):
-                (tree_ordinal, tree, split_edge) = spec
-                (old_err, old_lengths, old_ancestry) = tree
-                ancestry = grown(old_ancestry, split_edge)
-                (err, lengths) = evaluate(ancestry)
-                return (err, tree_ordinal, split_edge, lengths, ancestry)
-
-            specs = [
-                (i, tree, edge)
-                for (i, tree) in enumerate(trees)
-                for edge in range(n * 2 - 5)
-            ]
+            # A grown tree determines the tree it was grown from, so trees
+            # grown from distinct topologies are themselves distinct and only
+            # duplicated starting trees need removing to avoid rescoring.
+            trees = _distinct_trees(trees)
+            grown_trees = _GrownTreeScorer(
+                self, names[:n], [ancestry for (err, lengths, ancestry) in trees]
+            )
+            if self.scores_grown_together:
+                specs = [(i, None) for i in range(len(trees))]
+            else:
+                specs = [
+                    (i, [edge]) for i in range(len(trees)) for edge in range(n * 2 - 5)
+                ]
 
             candidates = ui.imap(
-                grown_tree,
+                grown_trees,
                 specs,
+                parallel=parallel,
+                par_kw=par_kw,
                 noun=("%s leaf tree" % n),
                 start=work_done[n - 1] / total_work,
                 end=work_done[n] / total_work,
             )
 
-            best = ismallest(candidates, k)
+            best = ismallest(itertools.chain.from_iterable(candidates), k)
 
             trees = [
-                (err, lengths, ancestry)
-                for (err, parent_ordinal, split_edge, lengths, ancestry) in best
+                (err, lengths, grown(trees[parent_ordinal][-1], split_edge))
+                for (err, parent_ordinal, split_edge, lengths) in best
             ]
 
             checkpointer.record((n, names[:n], trees))
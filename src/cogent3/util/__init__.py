@@ -11,6 +11,7 @@ __all__ = [
     "unit_test",
     "warning",
     "recode_alignment",
+    "serialise",
 ]
 
 __author__ = ""
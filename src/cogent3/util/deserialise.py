@@ -10,6 +10,7 @@ from cogent3.core.alignment import Aligned
 from cogent3.core.genetic_code import get_code
 from cogent3.core.moltype import _CodonAlphabet, get_moltype
 from cogent3.util.misc import open_, path_exists
+from cogent3.util.serialise import from_binary, is_binary
 
 
 __author__ = ["Gavin Huttley"]
@@ -282,7 +283,8 @@ def deserialise_object(data):
     Parameters
     ----------
     data
-        path to json file, json string or a dict
+        path to json file, json string, a dict or bytes produced by
+        cogent3.util.serialise.to_binary
 
     Returns
     -------
@@ -293,6 +295,9 @@ def deserialise_object(data):
         with open_(data) as infile:
             data = json.load(infile)
 
+    if is_binary(data):
+        data = from_binary(data)
+
     if type(data) is str:
         data = json.loads(data)
 
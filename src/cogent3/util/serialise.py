@@ -0,0 +1,189 @@
+#!/usr/bin/env python
+"""compact, compressed binary encoding of rich dicts
+
+A rich dict (the result of an objects to_rich_dict() method) is encoded as a
+JSON skeleton in which numeric arrays, and lists of numbers, are replaced by
+references to raw buffers. The skeleton and buffers are compressed using zlib.
+Decoding restores the original rich dict, with arrays returned as (nested)
+lists, so the result can be passed to deserialise_object().
+"""
+import json
+import struct
+import warnings
+import zlib
+
+import numpy
+
+
+__author__ = "Gavin Huttley"
+__copyright__ = "Copyright 2007-2020, The Cogent Project"
+__credits__ = ["Gavin Huttley"]
+__license__ = "BSD-3"
+__version__ = "2020.2.7a"
+__maintainer__ = "Gavin Huttley"
+__email__ = "Gavin.Huttley@anu.edu.au"
+__status__ = "Alpha"
+
+BINARY_MAGIC = b"C3RD\x01"
+_ARRAY_KEY = "__c3_array__"
+_HEADER_SIZE = struct.Struct("<Q")
+# lists with fewer numbers than this remain in the JSON skeleton
+_MIN_ARRAY_SIZE = 8
+
+
+def _numeric_leaves(value, leaf_type, depth=0):
+    """returns number of leaves if all leaves of nested lists are leaf_type,
+    otherwise None"""
+    num = 0
+    for element in value:
+        if type(element) is list:
+            sub = _numeric_leaves(element, leaf_type, depth + 1)
+            if sub is None:
+                return None
+            num += sub
+        elif type(element) is leaf_type:
+            num += 1
+        else:
+            return None
+    return num
+
+
+def _as_array(value):
+    """returns value as a numeric array if it can be exactly restored from
+    one, otherwise None"""
+    if isinstance(value, numpy.ndarray):
+        return value if value.dtype.kind in "biuf" else None
+
+    if not value:
+        return None
+
+    first = value[0]
+    while type(first) is list and first:
+        first = first[0]
+
+    leaf_type = type(first)
+    if leaf_type not in (int, float):
+        return None
+
+    num = _numeric_leaves(value, leaf_type)
+    if num is None or num < _MIN_ARRAY_SIZE:
+        return None
+
+    with warnings.catch_warnings():
+        # ragged lists produce object arrays with a deprecation warning
+        warnings.simplefilter("ignore")
+        try:
+            array = numpy.array(value)
+        except (ValueError, OverflowError):
+            return None
+
+    if array.dtype.kind not in "if" or array.size != num:
+        return None
+    return array
+
+
+def _extract_arrays(data, arrays):
+    """returns copy of data with numeric arrays replaced by references"""
+    if isinstance(data, dict):
+        return {k: _extract_arrays(v, arrays) for k, v in data.items()}
+
+    if isinstance(data, (list, numpy.ndarray)):
+        array = _as_array(data)
+        if array is None:
+            return [_extract_arrays(v, arrays) for v in data]
+        arrays.append(numpy.ascontiguousarray(array))
+        return {_ARRAY_KEY: len(arrays) - 1}
+
+    if isinstance(data, tuple):
+        return [_extract_arrays(v, arrays) for v in data]
+
+    if isinstance(data, numpy.generic):
+        return data.item()
+
+    return data
+
+
+def _restore_arrays(data, arrays):
+    """returns copy of data with array references replaced by lists"""
+    if isinstance(data, dict):
+        if len(data) == 1 and _ARRAY_KEY in data:
+            return arrays[data[_ARRAY_KEY]]
+        return {k: _restore_arrays(v, arrays) for k, v in data.items()}
+
+    if isinstance(data, list):
+        return [_restore_arrays(v, arrays) for v in data]
+
+    return data
+
+
+def is_binary(data):
+    """whether data is a binary encoded rich dict"""
+    return isinstance(data, (bytes, bytearray)) and data.startswith(BINARY_MAGIC)
+
+
+def to_binary(data, level=6):
+    """returns compressed binary encoding of a rich dict
+
+    Parameters
+    ----------
+    data
+        a rich dict, or an object with a to_rich_dict() method
+    level : int
+        zlib compression level
+
+    Returns
+    -------
+    bytes
+    """
+    if hasattr(data, "to_rich_dict"):
+        data = data.to_rich_dict()
+
+    arrays = []
+    skeleton = _extract_arrays(data, arrays)
+    buffers = []
+    array_info = []
+    offset = 0
+    for array in arrays:
+        buffer = array.tobytes()
+        array_info.append([array.dtype.str, list(array.shape), offset])
+        offset += len(buffer)
+        buffers.append(buffer)
+
+    header = json.dumps(
+        dict(data=skeleton, arrays=array_info), separators=(",", ":")
+    ).encode("utf-8")
+    payload = b"".join([_HEADER_SIZE.pack(len(header)), header] + buffers)
+    return BINARY_MAGIC + zlib.compress(payload, level)
+
+
+def from_binary(data):
+    """returns the rich dict from a compressed binary encoding
+
+    Parameters
+    ----------
+    data : bytes
+        result of to_binary()
+
+    Returns
+    -------
+    The rich dict, with arrays returned as (nested) lists.
+    """
+    if not is_binary(data):
+        raise ValueError("data is not a binary encoded rich dict")
+
+    payload = zlib.decompress(data[len(BINARY_MAGIC) :])
+    (header_size,) = _HEADER_SIZE.unpack_from(payload)
+    start = _HEADER_SIZE.size
+    header = json.loads(payload[start : start + header_size].decode("utf-8"))
+    start += header_size
+
+    arrays = []
+    for dtype, shape, offset in header["arrays"]:
+        dtype = numpy.dtype(dtype)
+        count = int(numpy.prod(shape, dtype=int))
+        array = numpy.frombuffer(
+            payload, dtype=dtype, count=count, offset=start + offset
+        )
+        arrays.append(array.reshape(shape).tolist())
+
+    return _restore_arrays(header["data"], arrays)
@@ -10,6 +10,7 @@ simple text format.
 Table can read pickled and delimited formats.
 """
 
+import ast
 import csv
 import json
 import pickle
@@ -273,6 +274,470 @@ def cast_to_1d_dict(data, row_order=None):
     return result
 
 
+def _logical_and(*values):
+    return numpy.logical_and.reduce(numpy.broadcast_arrays(*values))
+
+
+def _logical_or(*values):
+    return numpy.logical_or.reduce(numpy.broadcast_arrays(*values))
+
+
+def _isin(value, collection):
+    return numpy.isin(value, list(collection))
+
+
+_array_ops = {
+    "_logical_and": _logical_and,
+    "_logical_or": _logical_or,
+    "_logical_not": numpy.logical_not,
+    "_isin": _isin,
+}
+
+
+class _ArrayExpression(ast.NodeTransformer):
+    """rewrites python boolean operators so an expression can be evaluated
+    with column arrays"""
+
+    def _call(self, name, args):
+        return ast.Call(func=ast.Name(id=name, ctx=ast.Load()), args=args, keywords=[])
+
+    def visit_BoolOp(self, node):
+        self.generic_visit(node)
+        name = "_logical_and" if isinstance(node.op, ast.And) else "_logical_or"
+        return self._call(name, node.values)
+
+    def visit_UnaryOp(self, node):
+        self.generic_visit(node)
+        if isinstance(node.op, ast.Not):
+            return self._call("_logical_not", [node.operand])
+        return node
+
+    def visit_Compare(self, node):
+        self.generic_visit(node)
+        comparisons = []
+        left = node.left
+        for op, right in zip(node.ops, node.comparators):
+            if isinstance(op, (ast.In, ast.NotIn)):
+                comparison = self._call("_isin", [left, right])
+                if isinstance(op, ast.NotIn):
+                    comparison = self._call("_logical_not", [comparison])
+            else:
+                comparison = ast.Compare(left=left, ops=[op], comparators=[right])
+            comparisons.append(comparison)
+            left = right
+
+        if len(comparisons) == 1:
+            return comparisons[0]
+        return self._call("_logical_and", comparisons)
+
+
+# node types whose meaning is the same for column arrays and row values,
+# anything else (calls, subscripts, attributes) is evaluated per row
+_array_node_types = (
+    ast.Expression,
+    ast.Name,
+    ast.Constant,
+    ast.Compare,
+    ast.BoolOp,
+    ast.BinOp,
+    ast.UnaryOp,
+    ast.expr_context,
+    ast.boolop,
+    ast.operator,
+    ast.unaryop,
+    ast.cmpop,
+)
+
+
+def _is_array_expression(tree, names):
+    """whether all nodes of tree are valid for column arrays and all
+    variables are column names"""
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.Tuple, ast.List, ast.Set)):
+            # literal collections, as used with 'in'
+            if not all(isinstance(e, ast.Constant) for e in node.elts):
+                return False
+        elif not isinstance(node, _array_node_types):
+            return False
+        if isinstance(node, ast.Name) and node.id not in names:
+            return False
+    return True
+
+
+def _eval_on_columns(expression, columns, num_rows):
+    """returns result of evaluating expression with column arrays, or None
+    if it cannot be evaluated that way
+
+    Parameters
+    ----------
+    expression : str
+        valid python expression, names are column labels
+    columns : dict
+        column label to numpy array
+    num_rows : int
+        expected length of the result
+    """
+    try:
+        tree = ast.parse(expression.strip(), mode="eval")
+        if not _is_array_expression(tree, columns):
+            return None
+        tree = ast.fix_missing_locations(_ArrayExpression().visit(tree))
+        code = compile(tree, "<expression>", "eval")
+        with numpy.errstate(all="raise"), warnings.catch_warnings():
+            warnings.simplefilter("error")
+            result = eval(code, dict(_array_ops), dict(columns))
+    except Exception:
+        return None
+
+    if not isinstance(result, numpy.ndarray) or result.shape != (num_rows,):
+        return None
+
+    return result
+
+
+def _sort_keys(values, reverse=False):
+    """returns integer or float array that sorts as values"""
+    kind = values.dtype.kind
+    if kind in "biuf":
+        # unsigned values can't be negated
+        key = values.astype(float) if kind in "bu" else values
+    else:
+        # rank of values, fails for unorderable objects
+        _, key = numpy.unique(values, return_inverse=True)
+
+    return -key if reverse else key
+
+
+def _group_codes(columns):
+    """returns group index for each row, and the row index of the first
+    member of each group, groups are ordered by the column values"""
+    codes = []
+    dims = []
+    for values in columns:
+        unique, inverse = numpy.unique(values, return_inverse=True)
+        codes.append(inverse)
+        dims.append(len(unique))
+
+    if len(codes) == 1:
+        combined = codes[0]
+    elif numpy.prod(dims, dtype=float) < 2 ** 62:
+        combined = numpy.ravel_multi_index(codes, dims)
+    else:
+        combined = numpy.unique(numpy.array(codes).T, axis=0, return_inverse=True)[1]
+
+    _, first, group = numpy.unique(combined, return_index=True, return_inverse=True)
+    return group, first
+
+
+def _factorise(keys_self, keys_other):
+    """returns dense integer codes for the key columns of two tables, equal
+    codes correspond to equal values, and the number of codes"""
+    num_self = len(keys_self[0])
+    codes = []
+    dims = []
+    for values_self, values_other in zip(keys_self, keys_other):
+        values = numpy.concatenate((values_self, values_other))
+        unique, inverse = numpy.unique(values, return_inverse=True)
+        codes.append(inverse)
+        dims.append(len(unique))
+
+    if len(codes) == 1:
+        combined = codes[0]
+    elif numpy.prod(dims, dtype=float) < 2 ** 62:
+        combined = numpy.ravel_multi_index(codes, dims)
+    else:
+        combined = numpy.unique(numpy.array(codes).T, axis=0, return_inverse=True)[1]
+
+    unique, combined = numpy.unique(combined, return_inverse=True)
+    return combined[:num_self], combined[num_self:], len(unique)
+
+
+_HASH_MULTIPLIER = numpy.uint64(1000003)
+
+
+def _hash_keys(keys):
+    """returns uint64 hash of the key column values of each row"""
+    hashed = numpy.zeros(len(keys[0]), dtype=numpy.uint64)
+    for values in keys:
+        kind = values.dtype.kind
+        if kind in "biu":
+            values = values.astype(numpy.int64).view(numpy.uint64)[:, None]
+        elif kind == "f":
+            # so that -0.0 and 0.0 hash the same
+            values = (values.astype(numpy.float64) + 0.0).view(numpy.uint64)[:, None]
+        elif kind == "U":
+            values = values.view(numpy.uint32).reshape((len(values), -1))
+        else:
+            raise TypeError(f"cannot hash values of type {values.dtype}")
+
+        for column in values.T:
+            hashed = hashed * _HASH_MULTIPLIER + column
+    return hashed
+
+
+def _comparable_keys(keys_self, keys_other):
+    """returns key columns cast to comparable types, or None if values
+    in a pair of columns cannot be equal"""
+    numeric = set("biuf")
+    new_self, new_other = [], []
+    for values_self, values_other in zip(keys_self, keys_other):
+        kinds = {values_self.dtype.kind, values_other.dtype.kind}
+        if "O" in kinds:
+            raise TypeError("object columns")
+        if len(kinds) > 1:
+            if not kinds <= numeric:
+                return None
+            values_self = values_self.astype(float)
+            values_other = values_other.astype(float)
+        elif kinds == {"U"} and values_self.dtype != values_other.dtype:
+            # hashing includes the padding, so strings need a common width
+            dtype = max(values_self.dtype, values_other.dtype, key=lambda d: d.itemsize)
+            values_self = values_self.astype(dtype)
+            values_other = values_other.astype(dtype)
+        new_self.append(values_self)
+        new_other.append(values_other)
+    return new_self, new_other
+
+
+def _non_nan_rows(keys):
+    """returns indices of rows without nan key values, None if that is all
+    rows"""
+    nan = numpy.zeros(len(keys[0]), dtype=bool)
+    for values in keys:
+        if values.dtype.kind == "f":
+            nan |= numpy.isnan(values)
+    return numpy.flatnonzero(~nan) if nan.any() else None
+
+
+def _join_indices(keys_self, keys_other, method="hash"):
+    """returns row indices of matching rows in self and other
+
+    Parameters
+    ----------
+    keys_self, keys_other
+        series of key column arrays
+    method : str
+        'hash' matches hashes of the key values, then discards pairs whose
+        values differ. 'sort' factorises the key values by sorting them.
+
+    Notes
+    -----
+    Matches are ordered by the row of self, then the row of other. Rows
+    with nan key values do not match any row.
+    """
+    if method not in ("hash", "sort"):
+        raise ValueError(f"unknown join method {method!r}")
+
+    empty = numpy.array([], dtype=int)
+    if not keys_self or not len(keys_self[0]) or not len(keys_other[0]):
+        return empty, empty
+
+    comparable = _comparable_keys(keys_self, keys_other)
+    if comparable is None:
+        return empty, empty
+
+    keys_self, keys_other = comparable
+    rows_self = _non_nan_rows(keys_self)
+    rows_other = _non_nan_rows(keys_other)
+    if rows_self is not None or rows_other is not None:
+        # nan is not equal to itself, so these rows are excluded
+        if rows_self is None:
+            rows_self = numpy.arange(len(keys_self[0]))
+        if rows_other is None:
+            rows_other = numpy.arange(len(keys_other[0]))
+        self_selected, other_selected = _join_indices(
+            [values[rows_self] for values in keys_self],
+            [values[rows_other] for values in keys_other],
+            method=method,
+        )
+        return rows_self[self_selected], rows_other[other_selected]
+
+    if method == "hash":
+        codes_self = _hash_keys(keys_self)
+        codes_other = _hash_keys(keys_other)
+    else:
+        codes_self, codes_other, _ = _factorise(keys_self, keys_other)
+
+    # runs of equal codes in the sorted codes of other
+    order = numpy.argsort(codes_other, kind="stable")
+    sorted_codes = codes_other[order]
+    run_starts = numpy.flatnonzero(sorted_codes[1:] != sorted_codes[:-1]) + 1
+    run_starts = numpy.concatenate(([0], run_starts))
+    run_lengths = numpy.diff(numpy.append(run_starts, len(sorted_codes)))
+    run_codes = sorted_codes[run_starts]
+
+    # binary search is faster with sorted queries
+    self_order = numpy.argsort(codes_self)
+    index = numpy.searchsorted(run_codes, codes_self[self_order])
+    index = numpy.minimum(index, len(run_codes) - 1)
+    found = run_codes[index] == codes_self[self_order]
+    num_matches = numpy.empty(len(codes_self), dtype=int)
+    num_matches[self_order] = numpy.where(found, run_lengths[index], 0)
+    match_starts = numpy.empty(len(codes_self), dtype=int)
+    match_starts[self_order] = run_starts[index]
+
+    self_selected = numpy.repeat(numpy.arange(len(codes_self)), num_matches)
+    # position of each match within the block of rows of other
+    offsets = numpy.arange(num_matches.sum()) - numpy.repeat(
+        numpy.cumsum(num_matches) - num_matches, num_matches
+    )
+    other_selected = order[numpy.repeat(match_starts, num_matches) + offsets]
+    if method == "hash":
+        # exclude hash collisions
+        equal = numpy.ones(len(self_selected), dtype=bool)
+        for values_self, values_other in zip(keys_self, keys_other):
+            equal &= values_self[self_selected] == values_other[other_selected]
+        self_selected = self_selected[equal]
+        other_selected = other_selected[equal]
+
+    return self_selected, other_selected
+
+
+def _join_indices_python(keys_self, keys_other):
+    """returns row indices of matching rows in self and other, using a dict
+    of key tuples"""
+    other_row_index = defaultdict(list)
+    for row_index, row in enumerate(zip(*keys_other)):
+        other_row_index[row].append(row_index)
+
+    self_selected = []
+    other_selected = []
+    for row_index, row in enumerate(zip(*keys_self)):
+        if row not in other_row_index:
+            continue
+
+        self_selected.extend([row_index] * len(other_row_index[row]))
+        other_selected.extend(other_row_index[row])
+
+    return (
+        numpy.array(self_selected, dtype=int),
+        numpy.array(other_selected, dtype=int),
+    )
+
+
+def _with_missing(values, missing):
+    """returns values with missing elements set to nan for numeric values,
+    None otherwise"""
+    if values.dtype.kind in "biuf":
+        values = values.astype(float)
+        values[missing] = numpy.nan
+    else:
+        values = values.astype(object)
+        values[missing] = None
+    return values
+
+
+# name of the npz member holding the header and Table attributes
+NPZ_METADATA = "__table__"
+
+
+def _jsonable_attrs(attrs):
+    """returns the attributes that can be stored as json"""
+    result = {}
+    for key, value in attrs.items():
+        try:
+            json.dumps(value)
+        except (TypeError, ValueError):
+            continue
+        result[key] = value
+    return result
+
+
+class TableGroupBy:
+    """rows of a Table grouped by the values of key columns"""
+
+    # reductions computed from the sorted values of each group
+    _reduceat = {"sum": numpy.add, "min": numpy.minimum, "max": numpy.maximum}
+
+    def __init__(self, table, columns):
+        """
+        Parameters
+        ----------
+        table : Table
+            the table to be grouped
+        columns
+            name(s) of the key columns
+        """
+        if isinstance(columns, (str, int)):
+            columns = [columns]
+
+        self.table = table
+        self.columns = [table.columns._get_key_(c) for c in columns]
+        group, first = _group_codes([table.columns[c] for c in self.columns])
+        self._group = group
+        self._first = first
+        # row indices ordered by group, and the start of each group
+        self._order = numpy.argsort(group, kind="stable")
+        self._counts = numpy.bincount(group, minlength=len(first))
+        self._starts = numpy.cumsum(self._counts) - self._counts
+
+    def __len__(self):
+        return len(self._first)
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self.columns}, num_groups={len(self)})"
+
+    def _aggregate(self, values, func):
+        """returns func applied to values in each group"""
+        if func == "count":
+            return self._counts
+
+        if func in ("first", "last"):
+            index = self._starts if func == "first" else self._starts + self._counts - 1
+            return values[self._order][index]
+
+        if func in ("min", "max") and values.dtype.kind not in "biuf":
+            # no ufunc for str, so use the ends of values sorted within groups
+            order = numpy.lexsort((values, self._group))
+            index = self._starts if func == "min" else self._starts + self._counts - 1
+            return values[order][index]
+
+        if func in self._reduceat:
+            return self._reduceat[func].reduceat(values[self._order], self._starts)
+
+        if func in ("mean", "var", "std"):
+            values = values.astype(float)
+            total = numpy.bincount(self._group, weights=values)
+            mean = total / self._counts
+            if func == "mean":
+                return mean
+            deviation = values - mean[self._group]
+            var = numpy.bincount(self._group, weights=deviation ** 2) / self._counts
+            return var if func == "var" else numpy.sqrt(var)
+
+        if callable(func):
+            ordered = values[self._order]
+            ends = self._starts + self._counts
+            return numpy.array([func(ordered[s:e]) for s, e in zip(self._starts, ends)])
+
+        raise ValueError(f"unknown aggregation {func!r}")
+
+    def agg(self, **aggregations):
+        """returns a Table of the key columns and the aggregated values, with
+        a row per group
+
+        Parameters
+        ----------
+        aggregations
+            new column name=(column, func). func is either a function applied
+            to the array of values of each group, or the name of a vectorised
+            aggregation, one of 'count', 'sum', 'mean', 'min', 'max', 'var',
+            'std', 'first', 'last'. var and std are the population
+            statistics. min and max also apply to str values.
+        """
+        attr = self.table._get_persistent_attrs()
+        attr.pop("index", None)
+        result = self.table.__class__(**attr)
+        for c in self.columns:
+            result.columns[c] = self.table.columns[c][self._first]
+
+        for name, (column, func) in aggregations.items():
+            values = self.table.columns[column]
+            result.columns[name] = self._aggregate(values, func)
+
+        return result
+
+
 class _MixedFormatter:
     """handles formatting of mixed data types"""
 
@@ -983,43 +1448,14 @@ class Table:
             joined.columns[c] = joined_data[c]
         return joined
 
-    def inner_join(
-        self, other, columns_self=None, columns_other=None, use_index=True, **kwargs,
-    ):
-        """inner join of self with other
-
-        Parameters
-        ----------
-        other
-            A table object which will be joined with this
-            table. other must have a title.
-        columns_self, columns_other
-            indices of key columns that will be compared in the join operation.
-            Can be either column index, or a string matching the column header.
-            The order matters, and the dimensions of columns_self and
-            columns_other have to match. A row will be included in the output iff
-            self[row, columns_self]==other[row, columns_other] for all i
-        use_index
-            if no columns specified and both self and other have a nominated
-            index, this will be used.
-
-        Notes
-        -----
-        The column headers of the output are made unique by prepending
-        other column headers with _, e.g. 'Name' becomes _Name'.
-        """
-        col_prefix = "right" if not other.title else other.title
-
+    def _join_columns(self, other, columns_self, columns_other, use_index):
+        """returns the key columns of self and other for a join"""
         if columns_self:
             columns_self = self.columns._get_keys_(columns_self)
 
         if columns_other:
             columns_other = other.columns._get_keys_(columns_other)
 
-        columns_self = [columns_self] if isinstance(columns_self, str) else columns_self
-        columns_other = (
-            [columns_other] if isinstance(columns_other, str) else columns_other
-        )
         columns_self = [columns_self] if isinstance(columns_self, str) else columns_self
         columns_other = (
             [columns_other] if isinstance(columns_other, str) else columns_other
@@ -1046,35 +1482,57 @@ class Table:
             raise RuntimeError(
                 "Error during table join: key columns have different dimensions!"
             )
+        return columns_self, columns_other
 
-        output_mask = [c for c in other.columns if c not in columns_other]
+    def _join(self, other, columns_self, columns_other, left, method, **kwargs):
+        """returns joined table
 
-        # key is a tuple made from specified columns; data is the row index
-        other_row_index = defaultdict(list)
-        # subtable = other.columns.take_columns(columns_other)
-        subtable = other[:, columns_other]
-        for row_index, row in enumerate(subtable.columns.array):
-            # insert new entry for each row
-            other_row_index[tuple(row)].append(row_index)
-
-        other_selected = []
-        self_selected = []
-        subtable = self[:, columns_self]
-        for row_index, row in enumerate(subtable.columns.array):
-            # assemble key for query of other
-            key = tuple(row)
-            if key not in other_row_index:
-                continue
-
-            self_selected.extend([row_index] * len(other_row_index[key]))
-            other_selected.extend(other_row_index[key])
+        Parameters
+        ----------
+        left : bool
+            rows of self without a match in other are included
+        method : str
+            'hash' or 'sort', how matching rows are found
+        """
+        col_prefix = "right" if not other.title else other.title
+        output_mask = [c for c in other.columns if c not in columns_other]
+        keys_self = [self.columns[c] for c in columns_self]
+        keys_other = [other.columns[c] for c in columns_other]
+        try:
+            self_selected, other_selected = _join_indices(
+                keys_self, keys_other, method=method
+            )
+        except TypeError:
+            # values cannot be ordered
+            self_selected, other_selected = _join_indices_python(keys_self, keys_other)
+
+        missing = None
+        if left:
+            unmatched = numpy.ones(self.shape[0], dtype=bool)
+            unmatched[self_selected] = False
+            unmatched = numpy.flatnonzero(unmatched)
+            # restore self row order
+            order = numpy.argsort(
+                numpy.concatenate((self_selected, unmatched)), kind="stable"
+            )
+            self_selected = numpy.concatenate((self_selected, unmatched))[order]
+            missing = numpy.concatenate(
+                (
+                    numpy.zeros(len(other_selected), dtype=bool),
+                    numpy.ones(len(unmatched), dtype=bool),
+                )
+            )[order]
+            other_selected = numpy.concatenate(
+                (other_selected, numpy.zeros(len(unmatched), dtype=int))
+            )[order]
 
         joined_data = {c: self.columns[c][self_selected] for c in self.columns}
-        other_data = {
-            f"{col_prefix}_{c}": other.columns[c][other_selected] for c in output_mask
-        }
+        for c in output_mask:
+            values = other.columns[c][other_selected]
+            if missing is not None and missing.any():
+                values = _with_missing(values, missing)
+            joined_data[f"{col_prefix}_{c}"] = values
 
-        joined_data.update(other_data)
         new_header = list(self.columns.order) + [
             f"{col_prefix}_{c}" for c in output_mask
         ]
@@ -1086,11 +1544,97 @@ class Table:
             joined.columns[c] = joined_data[c]
         return joined
 
+    def inner_join(
+        self,
+        other,
+        columns_self=None,
+        columns_other=None,
+        use_index=True,
+        method="hash",
+        **kwargs,
+    ):
+        """inner join of self with other
+
+        Parameters
+        ----------
+        other
+            A table object which will be joined with this
+            table. other must have a title.
+        columns_self, columns_other
+            indices of key columns that will be compared in the join operation.
+            Can be either column index, or a string matching the column header.
+            The order matters, and the dimensions of columns_self and
+            columns_other have to match. A row will be included in the output iff
+            self[row, columns_self]==other[row, columns_other] for all i
+        use_index
+            if no columns specified and both self and other have a nominated
+            index, this will be used.
+        method
+            'hash' matches rows using hashes of key values, 'sort' matches
+            rows using key values ranked by sorting. Both produce the same
+            result. 'hash' is faster for str keys.
+
+        Notes
+        -----
+        The column headers of the output are made unique by prepending
+        other column headers with _, e.g. 'Name' becomes _Name'.
+        """
+        columns_self, columns_other = self._join_columns(
+            other, columns_self, columns_other, use_index
+        )
+        return self._join(
+            other, columns_self, columns_other, left=False, method=method, **kwargs
+        )
+
+    def left_join(
+        self,
+        other,
+        columns_self=None,
+        columns_other=None,
+        use_index=True,
+        method="hash",
+        **kwargs,
+    ):
+        """left join of self with other, rows of self without a match in
+        other are retained
+
+        Parameters
+        ----------
+        other
+            A table object which will be joined with this table.
+        columns_self, columns_other
+            indices of key columns that will be compared in the join
+            operation. See inner_join().
+        use_index
+            if no columns specified and both self and other have a nominated
+            index, this will be used.
+        method
+            'hash' or 'sort', see inner_join().
+
+        Notes
+        -----
+        Values from other for unmatched rows are nan for numeric columns,
+        None otherwise.
+        """
+        columns_self, columns_other = self._join_columns(
+            other, columns_self, columns_other, use_index
+        )
+        return self._join(
+            other, columns_self, columns_other, left=True, method=method, **kwargs
+        )
+
     def joined(
-        self, other, columns_self=None, columns_other=None, inner_join=True, **kwargs,
+        self,
+        other,
+        columns_self=None,
+        columns_other=None,
+        inner_join=True,
+        left=False,
+        method="hash",
+        **kwargs,
     ):
         """returns a new table containing the join of this table and
-        other. See docstring for inner_join, or cross_join
+        other. See docstring for inner_join, left_join or cross_join
         """
         if not inner_join:
             assert (
@@ -1098,11 +1642,13 @@ class Table:
             ), "Cannot specify column indices for a cross join"
             return self.cross_join(other, **kwargs)
 
-        return self.inner_join(
+        func = self.left_join if left else self.inner_join
+        return func(
             other=other,
             columns_self=columns_self,
             columns_other=columns_other,
             use_index=False,
+            method=method,
             **kwargs,
         )
 
@@ -1112,13 +1658,18 @@ class Table:
     def get_row_indices(self, callback, columns, negate=False):
         """returns boolean array of callback values given columns"""
         subset = self[:, columns]
+        match = not negate
         if not isinstance(callback, Callable):
+            # try evaluating with column arrays
+            values = {c: subset.columns[c] for c in subset.columns}
+            result = _eval_on_columns(callback, values, len(self))
+            if result is not None:
+                return numpy.asarray(result == match, dtype=bool)
             data = subset
         else:
             data = subset.array
 
         num_columns = len(columns)
-        match = not negate
         indices = numpy.array(
             [
                 True
@@ -1218,6 +1769,11 @@ class Table:
         if columns is None:
             columns = self.columns.order
 
+        distinct = self._distinct_rows(columns)
+        if distinct is not None:
+            keys, counts = distinct
+            return CategoryCounter(data=dict(zip(keys, counts.tolist())))
+
         subset = self.columns.take_columns(columns)
         if len(subset) == 1:
             data = subset[0].tolist()
@@ -1227,8 +1783,31 @@ class Table:
 
         return CategoryCounter(data=data)
 
+    def _distinct_rows(self, columns):
+        """returns the distinct values of columns and their counts, or None
+        if the values cannot be ordered
+
+        Values are tuples if more than one column.
+        """
+        if isinstance(columns, (str, int)):
+            columns = [columns]
+        columns = [self.columns._get_key_(c) for c in columns]
+        try:
+            group, first = _group_codes([self.columns[c] for c in columns])
+        except TypeError:
+            return None
+
+        values = [self.columns[c][first].tolist() for c in columns]
+        keys = values[0] if len(values) == 1 else list(zip(*values))
+        counts = numpy.bincount(group, minlength=len(first))
+        return keys, counts
+
     def distinct_values(self, columns):
         """returns the set of distinct values for the named column(s)"""
+        distinct = self._distinct_rows(columns)
+        if distinct is not None:
+            return set(distinct[0])
+
         data = [tuple(r) for r in self[:, columns].array.tolist()]
         result = set(data)
         result = {d[0] if len(d) == 1 else d for d in result}
@@ -1322,15 +1901,20 @@ class Table:
             columns = (columns,)
 
         subset = self[:, columns]
+        values = None
         if not isinstance(callback, Callable):
+            # try evaluating with column arrays
+            data = {c: subset.columns[c] for c in subset.columns}
+            values = _eval_on_columns(callback, data, len(self))
             data = subset
         else:
             data = subset.array
 
-        num_columns = len(columns)
-        values = numpy.array(
-            [_callback(callback, row=row, num_columns=num_columns) for row in data]
-        )
+        if values is None:
+            num_columns = len(columns)
+            values = numpy.array(
+                [_callback(callback, row=row, num_columns=num_columns) for row in data]
+            )
 
         if dtype:
             values = numpy.array(values, dtype=dtype)
@@ -1507,6 +2091,23 @@ class Table:
 
                 columns.append(c)
 
+        try:
+            # lexsort uses the last key as the primary key
+            keys = [_sort_keys(self.columns[c], reverse=c in reverse) for c in columns]
+            indices = numpy.lexsort(keys[::-1])
+        except TypeError:
+            indices = self._sorted_indices(columns, reverse)
+
+        attr = self._get_persistent_attrs()
+        attr |= kwargs
+        result = Table(**attr)
+        for c in self.columns:
+            result.columns[c] = self.columns[c][indices]
+
+        return result
+
+    def _sorted_indices(self, columns, reverse):
+        """returns row order from sorting rows of Python objects"""
         dtypes = [(c, self.columns[c].dtype) for c in columns]
         data = numpy.array(self.columns[columns], dtype="O").T
         for c in reverse:
@@ -1520,15 +2121,24 @@ class Table:
             data[:, index] = func(data[:, index])
 
         data = numpy.rec.fromarrays(data.copy().T, dtype=dtypes)
-        indices = data.argsort()
+        return data.argsort()
 
-        attr = self._get_persistent_attrs()
-        attr |= kwargs
-        result = Table(**attr)
-        for c in self.columns:
-            result.columns[c] = self.columns[c][indices]
+    def group_by(self, columns):
+        """returns rows grouped by the values of columns
 
-        return result
+        Parameters
+        ----------
+        columns
+            name(s) of the key columns
+
+        Returns
+        -------
+        TableGroupBy, whose agg() method returns a Table of aggregated values,
+        for example
+
+        >>> table.group_by("chrom").agg(total=("length", "sum"))
+        """
+        return TableGroupBy(self, columns)
 
     def _formatted(self, missing_data="", stripped=False):
         """returns self as formatted strings
@@ -2017,6 +2627,20 @@ class Table:
             result.columns[c] = row
         return result
 
+    def _write_npz(self, filename, compress=False):
+        """writes columns as numpy arrays in a npz file"""
+        attrs = self._get_persistent_attrs()
+        attrs["index"] = self.index_name
+        metadata = dict(
+            header=list(self.header), attrs=_jsonable_attrs(attrs), version=__version__
+        )
+        arrays = {f"column_{i}": self.columns[c] for i, c in enumerate(self.header)}
+        arrays[NPZ_METADATA] = numpy.array(json.dumps(metadata))
+        save = numpy.savez_compressed if compress else numpy.savez
+        # numpy appends a .npz suffix to file names, so we pass a file
+        with open(filename, "wb") as outfile:
+            save(outfile, **arrays)
+
     def write(
         self,
         filename,
@@ -2042,18 +2666,29 @@ class Table:
             a character delimiter for fields.
         compress
             if True, gzips the file and appends .gz to the filename (if not
-            already added).
+            already added). For the npz format, columns are compressed
+            within the file and the filename is unchanged.
 
         Notes
         -----
         If a format is not specified, it attempts to use a filename suffix.
         Unformatted numerical values are written to file in order to preserve
         numerical accuracy.
+
+        The npz format is a binary columnar format, each column is saved as a
+        numpy array. Uncompressed npz files can be loaded as memory mapped
+        arrays and individual columns can be loaded (see load_table()).
+        Table attributes that cannot be stored as json, such as functions in
+        column_templates, are not saved.
         """
         file_suffix, compress_suffix = get_format_suffixes(filename)
         format = format or file_suffix
         compress = compress or compress_suffix is not None
 
+        if format == "npz":
+            self._write_npz(filename, compress=compress)
+            return
+
         mode = mode or {"pickle": "wb"}.get(format, "w")
 
         if compress:
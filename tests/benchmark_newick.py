@@ -0,0 +1,53 @@
+#!/usr/bin/env python
+
+import random
+import time
+
+from cogent3.core.tree import TreeBuilder
+from cogent3.parse.newick import parse_array_tree, parse_string, parse_tree
+
+
+__author__ = "Gavin Huttley"
+__copyright__ = "Copyright 2007-2020, The Cogent Project"
+__credits__ = ["Gavin Huttley"]
+__license__ = "BSD-3"
+__version__ = "2020.2.7a"
+__maintainer__ = "Gavin Huttley"
+__email__ = "gavin.huttley@anu.edu.au"
+__status__ = "Production"
+
+
+def make_newick(num_tips, seed=0):
+    """returns a Newick string for a random bifurcating tree"""
+    rng = random.Random(seed)
+    clades = [f"t{i}:{rng.random():.5f}" for i in range(num_tips)]
+    while len(clades) > 2:
+        i = rng.randrange(len(clades) - 1)
+        clades[i : i + 2] = [f"({clades[i]},{clades[i + 1]}):{rng.random():.5f}"]
+    return f"({','.join(clades)});"
+
+
+def test(num_tips):
+    text = make_newick(num_tips)
+    times = []
+    for func, args in (
+        (parse_string, (TreeBuilder().create_edge,)),
+        (parse_tree, ()),
+        (parse_array_tree, ()),
+    ):
+        if func is parse_string and num_tips > 100000:
+            # too slow
+            times.append("-")
+            continue
+        t0 = time.perf_counter()
+        func(text, *args)
+        times.append(f"{time.perf_counter() - t0:.3f}")
+    return times
+
+
+if __name__ == "__main__":
+    template = "%10s " * 4
+    print("       seconds to parse a Newick tree")
+    print(template % ("tips", "builder", "tree", "array"))
+    for num_tips in [1000, 10000, 100000, 1000000]:
+        print(template % tuple([num_tips] + test(num_tips)))
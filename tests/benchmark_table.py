@@ -0,0 +1,66 @@
+#!/usr/bin/env python
+
+import time
+
+import numpy
+
+from cogent3 import make_table
+from cogent3.util.table import _join_indices, _join_indices_python
+
+
+__author__ = "Gavin Huttley"
+__copyright__ = "Copyright 2007-2020, The Cogent Project"
+__credits__ = ["Gavin Huttley"]
+__license__ = "BSD-3"
+__version__ = "2020.2.7a"
+__maintainer__ = "Gavin Huttley"
+__email__ = "gavin.huttley@anu.edu.au"
+__status__ = "Production"
+
+
+def make_tables(num_rows, seed=0):
+    """returns two tables of per-gene statistics sharing some gene ids"""
+    rng = numpy.random.default_rng(seed)
+    ids = numpy.array([f"ENSG{i:011d}" for i in range(2 * num_rows)])
+    left = make_table(
+        data={
+            "gene": rng.choice(ids, size=num_rows, replace=False),
+            "length": rng.integers(100, 10000, size=num_rows),
+        }
+    )
+    right = make_table(
+        data={
+            "gene": rng.choice(ids, size=num_rows, replace=False),
+            "gc": rng.random(size=num_rows),
+        },
+        title="stats",
+    )
+    return left, right
+
+
+def test(num_rows):
+    left, right = make_tables(num_rows)
+    keys_left = [left.columns["gene"]]
+    keys_right = [right.columns["gene"]]
+    times = []
+    for func, kwargs in (
+        (_join_indices_python, {}),
+        (_join_indices, dict(method="hash")),
+        (_join_indices, dict(method="sort")),
+    ):
+        t0 = time.perf_counter()
+        func(keys_left, keys_right, **kwargs)
+        times.append(f"{time.perf_counter() - t0:.3f}")
+
+    t0 = time.perf_counter()
+    left.joined(right, "gene")
+    times.append(f"{time.perf_counter() - t0:.3f}")
+    return times
+
+
+if __name__ == "__main__":
+    template = "%10s " * 5
+    print("       seconds to join two tables on a str key")
+    print(template % ("rows", "python", "hash", "sort", "joined"))
+    for num_rows in [10000, 100000, 1000000]:
+        print(template % tuple([num_rows] + test(num_rows)))
@@ -0,0 +1,52 @@
+#!/usr/bin/env python
+
+import time
+
+import numpy
+
+from benchmark_newick import make_newick
+
+from cogent3 import make_tree
+from cogent3.core.tree import TreeNode
+
+
+__author__ = "Gavin Huttley"
+__copyright__ = "Copyright 2007-2020, The Cogent Project"
+__credits__ = ["Gavin Huttley"]
+__license__ = "BSD-3"
+__version__ = "2020.2.7a"
+__maintainer__ = "Gavin Huttley"
+__email__ = "gavin.huttley@anu.edu.au"
+__status__ = "Production"
+
+
+def test(num_tips, num_pairs=1000000):
+    tree = make_tree(make_newick(num_tips))
+    times = []
+    if num_tips > 5000:
+        # too slow
+        times.append("-")
+    else:
+        t0 = time.perf_counter()
+        TreeNode.tip_to_tip_distances(tree)
+        times.append(f"{time.perf_counter() - t0:.3f}")
+
+    t0 = time.perf_counter()
+    tree.tip_to_tip_distances()
+    times.append(f"{time.perf_counter() - t0:.3f}")
+
+    names = tree.get_tip_names()
+    rng = numpy.random.default_rng(0)
+    pairs = zip(rng.choice(names, num_pairs), rng.choice(names, num_pairs))
+    t0 = time.perf_counter()
+    tree.get_pairwise_distances(pairs)
+    times.append(f"{time.perf_counter() - t0:.3f}")
+    return times
+
+
+if __name__ == "__main__":
+    template = "%10s " * 4
+    print("       seconds for tip-to-tip distances")
+    print(template % ("tips", "loops", "matrix", "1e6 pairs"))
+    for num_tips in [1000, 5000, 20000]:
+        print(template % tuple([num_tips] + test(num_tips)))
@@ -0,0 +1,42 @@
+#!/usr/bin/env python
+
+import time
+
+from benchmark_newick import make_newick
+
+from cogent3 import make_tree
+from cogent3.phylo.least_squares import WLS
+from cogent3.phylo.tree_space import TreeEvaluator, tree2ancestry
+
+
+__author__ = "Gavin Huttley"
+__copyright__ = "Copyright 2007-2020, The Cogent Project"
+__credits__ = ["Gavin Huttley"]
+__license__ = "BSD-3"
+__version__ = "2020.2.7a"
+__maintainer__ = "Gavin Huttley"
+__email__ = "gavin.huttley@anu.edu.au"
+__status__ = "Production"
+
+
+def test(num_tips):
+    tree = make_tree(make_newick(num_tips))
+    names = tree.get_tip_names()
+    evaluator = WLS(tree.get_distances())
+    sub_tree = tree.get_sub_tree(names[:-1])
+    ancestry, order, _ = tree2ancestry(sub_tree, order=names[:-1])
+    names = order + names[-1:]
+    times = []
+    for func in (TreeEvaluator.make_grown_tree_scorer, WLS.make_grown_tree_scorer):
+        t0 = time.perf_counter()
+        func(evaluator, names)(ancestry)
+        times.append(f"{time.perf_counter() - t0:.3f}")
+    return times
+
+
+if __name__ == "__main__":
+    template = "%10s " * 3
+    print("       seconds to score all trees grown by one tip")
+    print(template % ("tips", "each", "batched"))
+    for num_tips in [25, 50, 100, 200]:
+        print(template % tuple([num_tips] + test(num_tips)))
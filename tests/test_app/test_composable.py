@@ -1,4 +1,5 @@
 import os
+import tracemalloc
 
 from tempfile import TemporaryDirectory
 from unittest import TestCase, main
@@ -6,7 +7,12 @@ from unittest.mock import Mock
 
 from cogent3.app import io as io_app
 from cogent3.app import sample as sample_app
-from cogent3.app.composable import ComposableSeq, NotCompleted, user_function
+from cogent3.app.composable import (
+    ComposableSeq,
+    NotCompleted,
+    _profiled_call,
+    user_function,
+)
 from cogent3.app.sample import min_length, omit_degenerates
 from cogent3.app.translate import select_translatable
 from cogent3.app.tree import quick_tree
@@ -122,6 +128,60 @@ class TestComposableBase(TestCase):
         with self.assertRaises(ValueError):
             proc.apply_to(["", ""])
 
+    def test_apply_to_prefetch(self):
+        """prefetching member content does not change results"""
+        dstore = io_app.get_data_store("data", suffix="fasta", limit=3)
+        reader = io_app.load_unaligned(format="fasta", moltype="dna")
+        min_length = sample_app.min_length(10)
+        proc = reader + min_length
+        expect = proc.apply_to(dstore, show_progress=False)
+        got = proc.apply_to(dstore, show_progress=False, prefetch=2)
+        self.assertEqual([s.to_dict() for s in got], [s.to_dict() for s in expect])
+        # strings are handled
+        got = proc.apply_to([str(m) for m in dstore], show_progress=False, prefetch=2)
+        self.assertEqual(len(got), len(dstore))
+
+    def test_apply_to_profile(self):
+        """profiling records resource usage of each step"""
+        dstore = io_app.get_data_store("data", suffix="fasta", limit=3)
+        reader = io_app.load_unaligned(format="fasta", moltype="dna")
+        min_length = sample_app.min_length(10)
+        proc = reader + min_length
+        expect = proc.apply_to(dstore, show_progress=False)
+        got = proc.apply_to(dstore, show_progress=False, profile=True)
+        self.assertEqual([s.to_dict() for s in got], [s.to_dict() for s in expect])
+        summary = proc.summary_profile
+        self.assertEqual(
+            summary.columns["step"].tolist(), ["load_unaligned", "min_length"]
+        )
+        self.assertEqual(summary.columns["calls"].tolist(), [3, 3])
+        self.assertTrue(all(v is None for v in summary.columns["peak_memory"]))
+        # file size is the input size for the loader
+        table = proc._get_profile_table()
+        self.assertEqual(table.shape[0], 6)
+        self.assertEqual(table[0, "size"], os.path.getsize(dstore[0]))
+
+        proc.apply_to(dstore, show_progress=False, profile="memory")
+        summary = proc.summary_profile
+        self.assertTrue(all(v > 0 for v in summary.columns["peak_memory"]))
+        self.assertFalse(tracemalloc.is_tracing())
+        # as in a worker process, tracing stops after the call
+        _, records = _profiled_call(proc, trace_memory=True)(dstore[0])
+        self.assertTrue(all(r[-1] > 0 for r in records))
+        self.assertFalse(tracemalloc.is_tracing())
+
+        with TemporaryDirectory(dir=".") as dirname:
+            outpath = os.path.join(os.getcwd(), dirname, "delme.tinydb")
+            writer = io_app.write_db(outpath)
+            proc.disconnect()
+            proc = reader + min_length + writer
+            proc.apply_to(dstore, show_progress=False, profile=True)
+            summary = proc.summary_profile
+            self.assertEqual(summary.columns["calls"].tolist(), [3, 3, 3])
+            log = proc.data_store.logs[0].read()
+            self.assertIn("PROFILE", log)
+            proc.data_store.close()
+
     def test_apply_to_strings(self):
         """apply_to handles strings as paths"""
         dstore = io_app.get_data_store("data", suffix="fasta", limit=3)
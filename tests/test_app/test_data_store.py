@@ -9,6 +9,7 @@ from unittest import TestCase, main, skipIf
 from cogent3.app.data_store import (
     OVERWRITE,
     DataStoreMember,
+    PrefetchedMembers,
     ReadOnlyDirectoryDataStore,
     ReadOnlyTinyDbDataStore,
     ReadOnlyZippedDataStore,
@@ -208,6 +209,35 @@ class DataStoreBaseTests:
             self.assertEqual(got_b, expect_b)
             dstore.close()
 
+    def test_batched_write(self):
+        """buffered writes are committed on reaching batch_size or close"""
+        expect = {m.name: m.read() for m in self.ReadClass("data", suffix="fasta")}
+
+        with TemporaryDirectory(dir=".") as dirname:
+            path = os.path.join(dirname, self.basedir)
+            dstore = self.WriteClass(path, suffix=".fa", create=True, batch_size=4)
+            ids = {}
+            for i, (name, data) in enumerate(expect.items()):
+                ids[name] = dstore.write(dstore.make_absolute_identifier(name), data)
+                # committed in groups of batch_size
+                self.assertEqual(len(dstore._pending), (i + 1) % 4)
+
+            # buffered members are already listed by the data store
+            self.assertEqual(len(dstore), len(expect))
+            # and reading forces a commit
+            name = list(expect)[-1]
+            self.assertEqual(dstore.read(ids[name]), expect[name])
+            self.assertEqual(dstore._pending, [])
+            dstore.write(dstore.make_absolute_identifier("extra.fasta"), "")
+            dstore.close()
+            self.assertEqual(dstore._pending, [])
+
+            dstore = self.ReadClass(path, suffix=".fa")
+            self.assertEqual(len(dstore), len(expect) + 1)
+            for name in expect:
+                member = dstore.get_member(name.replace("fasta", "fa"))
+                self.assertEqual(member.read(), expect[name])
+
     def test_filter(self):
         """filter method should return correctly matching members"""
         dstore = self.ReadClass(self.basedir, suffix="*")
@@ -240,6 +270,33 @@ class DataStoreBaseTests:
         data = re_member.read()
         self.assertTrue(len(data) > 0)
 
+    def test_prefetch(self):
+        """prefetched member content is returned by the next read"""
+        dstore = self.ReadClass(self.basedir, suffix=".fasta")
+        member = dstore[0]
+        expect = member.read()
+        self.assertIs(member.prefetch(), member)
+        self.assertEqual(member._prefetched, expect)
+        self.assertEqual(member.read(), expect)
+        self.assertIsNone(member._prefetched)
+
+    def test_prefetched_members(self):
+        """iterating PrefetchedMembers preserves order and content"""
+        dstore = self.ReadClass(self.basedir, suffix=".fasta")
+        expect = [m.read() for m in dstore]
+        for depth in (1, 2, len(dstore) + 1):
+            prefetched = PrefetchedMembers(list(dstore), depth)
+            self.assertEqual(len(prefetched), len(dstore))
+            got = [m.read() for m in prefetched]
+            self.assertEqual(got, expect)
+        # content not consumed is discarded
+        for m in PrefetchedMembers(list(dstore), 2):
+            pass
+        self.assertTrue(all(m._prefetched is None for m in dstore))
+        # strings are passed through
+        paths = [str(m) for m in dstore]
+        self.assertEqual(list(PrefetchedMembers(paths, 2)), paths)
+
     def test_add_file(self):
         """correctly add an arbitrarily named file"""
         with open("data" + os.sep + "brca1.fasta") as infile:
@@ -449,6 +506,37 @@ class TinyDBDataStoreTests(TestCase):
             self.assertTrue(len(dstore), len(self.data))
             dstore.close()
 
+    def test_batched_write(self):
+        """buffered records inserted together on batch_size, query or close"""
+        with TemporaryDirectory(dir=".") as dirname:
+            path = os.path.join(dirname, self.basedir)
+            dstore = self.WriteClass(path, if_exists="overwrite", batch_size=4)
+            identifiers = []
+            for i, (id_, data) in enumerate(self.data.items()):
+                identifier = dstore.make_relative_identifier(id_)
+                identifiers.append(identifier)
+                member = dstore.write(identifier, data)
+                self.assertEqual(len(dstore._pending), (i + 1) % 4)
+
+            self.assertIsNone(member.id)
+            # membership includes pending records without committing them
+            self.assertTrue(identifiers[-1] in dstore)
+            self.assertEqual(dstore.filtered(identifiers[-1]), [identifiers[-1]])
+            self.assertIsNone(member.id)
+            # reading commits pending records
+            self.assertEqual(member.read(), self.data[id_])
+            self.assertIsNotNone(member.id)
+            dstore.write_incomplete("incomplete.json", dict(a=1))
+            self.assertEqual(len(dstore._pending), 1)
+            dstore.close()
+
+            dstore = self.ReadClass(path)
+            self.assertEqual(len(dstore), len(self.data))
+            self.assertEqual(len(dstore.incomplete), 1)
+            got = {m: m.read() for m in dstore}
+            self.assertEqual(got, dict(zip(identifiers, self.data.values())))
+            dstore.close()
+
     def test_tiny_contains(self):
         """contains operation works for tinydb data store"""
         with TemporaryDirectory(dir=".") as dirname:
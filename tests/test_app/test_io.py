@@ -203,6 +203,91 @@ class TestIo(TestCase):
             self.assertIsInstance(got, DNA.__class__)
             self.assertEqual(got, DNA)
 
+    def test_write_db_batched(self):
+        """write_db with batch_size commits all results"""
+        dstore = io_app.get_data_store("data", suffix="fasta", limit=3)
+        with TemporaryDirectory(dir=".") as dirname:
+            outpath = join(dirname, "delme.tinydb")
+            reader = io_app.load_unaligned(format="fasta", moltype="dna")
+            writer = write_db(outpath, create=True, if_exists="ignore", batch_size=2)
+            process = reader + writer
+            got = process.apply_to(dstore, show_progress=False, logger=False)
+            self.assertEqual(len(got), 3)
+            writer.data_store.close()
+            dstore_out = io_app.get_data_store(outpath, suffix="json")
+            self.assertEqual(len(dstore_out), 3)
+            loader = io_app.load_db()
+            for member in dstore_out:
+                self.assertIsInstance(loader(member), SequenceCollection)
+            dstore_out.close()
+
+    def test_write_db_batched_commits(self):
+        """write_db under apply_to commits records in batches"""
+        dstore = io_app.get_data_store("data", suffix="fasta", limit=6)
+        with TemporaryDirectory(dir=".") as dirname:
+            outpath = join(dirname, "delme.tinydb")
+            reader = io_app.load_unaligned(format="fasta", moltype="dna")
+            writer = write_db(outpath, create=True, if_exists="ignore", batch_size=4)
+            commit = writer.data_store._commit
+            sizes = []
+
+            def counted_commit(records):
+                sizes.append(len(records))
+                commit(records)
+
+            writer.data_store._commit = counted_commit
+            process = reader + writer
+            got = process.apply_to(dstore, show_progress=False, logger=False)
+            self.assertEqual(len(got), 6)
+            self.assertEqual(sizes, [4, 2])
+            dstore_out = io_app.get_data_store(outpath, suffix="json")
+            self.assertEqual(len(dstore_out), 6)
+            dstore_out.close()
+
+    def test_write_seqs_batched(self):
+        """write_seqs with batch_size into a zip archive"""
+        dstore = io_app.get_data_store("data", suffix="fasta", limit=3)
+        with TemporaryDirectory(dir=".") as dirname:
+            outpath = join(dirname, "delme.zip")
+            reader = io_app.load_aligned(format="fasta", moltype="dna")
+            writer = io_app.write_seqs(outpath, create=True, batch_size=2)
+            process = reader + writer
+            got = process.apply_to(dstore, show_progress=False, logger=False)
+            self.assertEqual(len(got), 3)
+            dstore_out = io_app.get_data_store(outpath, suffix="fa")
+            self.assertEqual(len(dstore_out), 3)
+            loader = io_app.load_aligned(format="fasta", moltype="dna")
+            self.assertIsInstance(loader(dstore_out[0]), ArrayAlignment)
+
+    def test_write_binary(self):
+        """write_db and write_json with binary encoding roundtrip"""
+        dstore = io_app.get_data_store("data", suffix="fasta", limit=2)
+        reader = io_app.load_aligned(format="fasta", moltype="dna")
+        expect = {m.name.split(".")[0]: reader(m) for m in dstore}
+        with TemporaryDirectory(dir=".") as dirname:
+            outpath = join(dirname, "delme.tinydb")
+            writer = write_db(outpath, create=True, if_exists="ignore", binary=True)
+            for aln in expect.values():
+                writer(aln)
+            writer.data_store.close()
+            dstore_out = io_app.get_data_store(outpath, suffix="json")
+            loader = io_app.load_db()
+            for member in dstore_out:
+                got = loader(member)
+                self.assertEqual(got.to_dict(), expect[member.split(".")[0]].to_dict())
+            dstore_out.close()
+
+            outpath = join(dirname, "delme.zip")
+            writer = io_app.write_json(outpath, create=True, binary=True)
+            for aln in expect.values():
+                writer(aln)
+            loader = io_app.load_json()
+            for member in writer.data_store:
+                got = loader(member)
+                self.assertEqual(
+                    got.to_dict(), expect[member.name.split(".")[0]].to_dict()
+                )
+
     def test_write_db_load_db2(self):
         """correctly write/load built-in python from tinydb"""
         with TemporaryDirectory(dir=".") as dirname:
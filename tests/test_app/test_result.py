@@ -177,6 +177,62 @@ class TestModelResult(TestCase):
             got.children[0].params["length"], got.children[0].params["paralinear"]
         )
 
+    def test_lazy_stats(self):
+        """stats and param values from json without creating the lf"""
+        _data = {
+            "Human": "ATGCGGCTCGCGGAGGCCGCGCTCGCGGAG",
+            "Mouse": "ATGCCCGGCGCCAAGGCAGCGCTGGCGGAG",
+            "Opossum": "ATGCCAGTGAAAGTGGCGGCGGTGGCTGAG",
+        }
+        # long enough for second order AIC with a codon model
+        _data = {k: s * 4 for k, s in _data.items()}
+        aln = make_aligned_seqs(data=_data, moltype="dna")
+        for name, kw in [
+            ("HKY85", {}),
+            ("CNFGTR", {}),
+            ("F81", {"split_codons": True}),
+        ]:
+            mod = evo_app.model(
+                name,
+                show_progress=False,
+                opt_args=dict(max_evaluations=25, limit_action="ignore"),
+                **kw,
+            )
+            result = mod(aln)
+            got = deserialise_object(result.to_json())
+            self.assertEqual(got.get_aic(), result.get_aic())
+            self.assertAlmostEqual(
+                got.get_aic(second_order=True), result.get_aic(second_order=True)
+            )
+            self.assertAlmostEqual(got.get_bic(), result.get_bic())
+            _ = repr(got)
+            if len(result) == 1:
+                self.assertAlmostEqual(
+                    got.get_aic(second_order=True),
+                    result.lf.get_aic(second_order=True),
+                )
+                for edge in _data:
+                    self.assertEqual(
+                        got.get_param_value("length", edge=edge),
+                        result.lf.get_param_value("length", edge=edge),
+                    )
+            # none of which required construction of the likelihood function
+            self.assertTrue(all(isinstance(v, dict) for v in got.values()))
+
+        # split codon results require selecting the likelihood function
+        with self.assertRaises(ValueError):
+            got.get_param_value("length", edge="Human")
+
+        # parameter not stored as a scalar requires the lf
+        mod = evo_app.model(
+            "HKY85",
+            show_progress=False,
+            opt_args=dict(max_evaluations=5, limit_action="ignore"),
+        )
+        got = deserialise_object(mod(aln).to_json())
+        self.assertEqual(got.get_param_value("mprobs").shape, (4,))
+        self.assertNotIsInstance(list(got.values())[0], dict)
+
     def test_model_result_setitem(self):
         """TypeError if value a likelihood function, or a dict with correct type"""
         v = dict(type="arbitrary")
@@ -7,6 +7,7 @@ import unittest
 
 from os import remove
 from tempfile import mktemp
+from unittest.mock import patch
 
 import numpy
 
@@ -26,6 +27,7 @@ from cogent3.core.alignment import (
     DataError,
     SequenceCollection,
     _SequenceCollectionBase,
+    _masked_equal,
     aln_from_array,
     aln_from_array_aln,
     aln_from_array_seqs,
@@ -33,7 +35,9 @@ from cogent3.core.alignment import (
     aln_from_empty,
     aln_from_fasta,
     aln_from_generic,
+    codon_position_mask,
     coerce_to_string,
+    gap_frac_mask,
     make_gap_filter,
     seqs_from_aln,
     seqs_from_array,
@@ -43,6 +47,7 @@ from cogent3.core.alignment import (
     seqs_from_fasta,
     seqs_from_generic,
     seqs_from_kv_pairs,
+    variable_mask,
 )
 from cogent3.core.alphabet import AlphabetError
 from cogent3.core.annotation import Feature, _Annotatable
@@ -627,6 +632,60 @@ class SequenceCollectionBaseTests(object):
         got = frozenset(frozenset(s) for s in got)
         self.assertEqual(got, expect)
 
+    def test_get_identical_sets_many(self):
+        """masked duplicates found when compared with all pairs"""
+        rng = numpy.random.RandomState(13)
+        bases = ["".join(rng.choice(list("ACGT"), size=30)) for _ in range(5)]
+        data = {}
+        for i in range(60):
+            seq = list(bases[rng.randint(5)])
+            for pos in rng.randint(30, size=rng.randint(4)):
+                seq[pos] = rng.choice(list("N-RY"))
+            data[f"s{i}"] = "".join(seq)
+
+        # sequential comparison of all pairs
+        names = list(data)
+        expect = []
+        seen = set()
+        for i, n1 in enumerate(names):
+            if n1 in seen:
+                continue
+            group = set()
+            for n2 in names[i + 1 :]:
+                if n2 in seen:
+                    continue
+                pairs = zip(data[n1], data[n2])
+                if all(a == b for a, b in pairs if a in "ACGT" and b in "ACGT"):
+                    seen.add(n2)
+                    group.update([n1, n2])
+            if group:
+                expect.append(frozenset(group))
+
+        seqs = self.Class(data=data, moltype=DNA)
+        got = seqs.get_identical_sets(mask_degen=True)
+        self.assertEqual(set(frozenset(s) for s in got), set(expect))
+
+    def test_get_identical_sets_masked_blocks(self):
+        """sequences masked somewhere in every block are not compared with
+        all others"""
+        rng = numpy.random.RandomState(7)
+        data = {}
+        for i in range(50):
+            seq = rng.choice(list("ACGT"), size=80)
+            seq[numpy.arange(0, 80, 10) + rng.randint(10, size=8)] = "N"
+            data[f"s{i}"] = "".join(seq)
+        for i in range(5):
+            data[f"d{i}"] = data[f"s{i}"].replace("N", "A")
+
+        seqs = self.Class(data=data, moltype=DNA)
+        with patch(
+            "cogent3.core.alignment._masked_equal", side_effect=_masked_equal
+        ) as compare:
+            got = seqs.get_identical_sets(mask_degen=True)
+        expect = {frozenset([f"s{i}", f"d{i}"]) for i in range(5)}
+        self.assertEqual(set(frozenset(s) for s in got), expect)
+        self.assertLess(compare.call_count, 20)
+
     def test_get_similar(self):
         """SequenceCollection get_similar should get all sequences close to target seq"""
         aln = self.many
@@ -1434,6 +1493,16 @@ class SequenceCollectionTests(SequenceCollectionBaseTests, TestCase):
         self.ragged = SequenceCollection({"a": "AAAAAA", "b": "AAA", "c": "AAAA"})
         super(SequenceCollectionTests, self).setUp()
 
+    def test_get_identical_sets_ragged(self):
+        """sequences differing in length are identical if the extra positions
+        are degenerate"""
+        data = {"a": "ACGTNN", "b": "ACGT", "c": "ACGAA", "d": "ACNT-"}
+        seqs = self.Class(data=data, moltype=DNA)
+        got = seqs.get_identical_sets(mask_degen=True)
+        self.assertEqual(got, [{"a", "b", "d"}])
+        got = seqs.get_identical_sets(mask_degen=False)
+        self.assertEqual(got, [])
+
     def test_seq_len_get_ragged(self):
         """SequenceCollection seq_len get should work for ragged seqs"""
         self.assertEqual(self.ragged.seq_len, 6)
@@ -1842,6 +1911,27 @@ class AlignmentBaseTests(SequenceCollectionBaseTests):
         self.assertEqual(len(got3), len(got1))
         self.assertEqual(got3.to_dict(), got1.to_dict())
 
+    def test_filtered_by_mask(self):
+        """filtered_by_mask selects motifs using bool masks"""
+        data = {"a": "ACG-TTAGN", "b": "ACGGTTTGA", "c": "ACGCTTAGA"}
+        aln = self.Class(data, moltype=DNA)
+        mask = numpy.zeros(9, dtype=bool)
+        mask[[0, 2, 5]] = True
+        got = aln.filtered_by_mask(mask)
+        self.assertEqual(got.to_dict(), {"a": "AGT", "b": "AGT", "c": "AGT"})
+        got = aln.filtered_by_mask(variable_mask())
+        self.assertEqual(got.to_dict(), {"a": "-AN", "b": "GTA", "c": "CAA"})
+        got = aln.filtered_by_mask(codon_position_mask(1, 3))
+        self.assertEqual(got.to_dict(), {"a": "AG-TAN", "b": "AGGTTA", "c": "AGCTAA"})
+        gaps = [aln._get_array_alignment().alphabet.index("-")]
+        got = aln.filtered_by_mask(gap_frac_mask(gaps), motif_length=3)
+        self.assertEqual(got.to_dict(), {"a": "ACGAGN", "b": "ACGTGA", "c": "ACGAGA"})
+        # all excluded returns None
+        self.assertIsNone(aln.filtered_by_mask(numpy.zeros(9, dtype=bool)))
+        # incorrect shape raises ValueError
+        with self.assertRaises(ValueError):
+            aln.filtered_by_mask([True, False])
+
     def test_omit_bad_seqs(self):
         """omit_bad_seqs should return alignment w/o seqs causing most gaps"""
         data = {
@@ -2379,6 +2469,31 @@ class AlignmentBaseTests(SequenceCollectionBaseTests):
         self.assertTrue("-" not in found_motifs)
         self.assertEqual(lengths, {2})
 
+    def test_counts_match_columns(self):
+        """array counting matches counts from column strings"""
+        from collections import Counter
+
+        data = {"a": "ACGT-NAAT?", "b": "ACGTRYAT-G", "c": "TCGAAYA-TG"}
+        aln = self.Class(data=data, moltype="dna")
+        got = aln.counts_per_pos(include_ambiguity=True, allow_gap=True)
+        for i, column in enumerate(zip(*data.values())):
+            expect = Counter(column)
+            for motif in got.motifs:
+                self.assertEqual(got[i, motif], expect[motif])
+
+        # each motif occurs once for longer motifs
+        got = aln.counts_per_pos(motif_length=2, include_ambiguity=True, allow_gap=True)
+        self.assertEqual(len(got.motifs), len(set(got.motifs)))
+        self.assertEqual(got[2, "-N"], 1)
+        self.assertEqual(got[1, "GT"], 2)
+        self.assertEqual(got[2, "TT"], 0)
+
+        got = aln.counts_per_seq(motif_length=2)
+        self.assertEqual(got["b", "AT"], 1)
+        self.assertEqual(got["c", "TC"], 1)
+        self.assertEqual(got["c", "TG"], 1)
+        self.assertNotIn("RY", got.motifs)
+
     def test_get_seq_entropy(self):
         """ArrayAlignment get_seq_entropy should get entropy of each seq"""
         seqs = [AB.make_seq(s, preserve_case=True) for s in ["abab", "bbbb", "abbb"]]
@@ -2594,6 +2709,18 @@ class ArrayAlignmentTests(AlignmentBaseTests, TestCase):
 class AlignmentTests(AlignmentBaseTests, TestCase):
     Class = Alignment
 
+    def test_filtering_converts_once(self):
+        """filtering positions converts to an ArrayAlignment at most once"""
+        aln = self.Class(data={"a": "ACGNTA-CG", "b": "ACG-TACCG"}, moltype=DNA)
+        with patch.object(Alignment, "to_type", wraps=aln.to_type) as to_type:
+            got = aln.no_degenerates()
+        self.assertEqual(got.to_dict(), {"a": "ACGTACG", "b": "ACGTACG"})
+        self.assertEqual(to_type.call_count, 1)
+        with patch.object(Alignment, "to_type", wraps=aln.to_type) as to_type:
+            got = aln.omit_gap_pos(allowed_gap_frac=0)
+        self.assertEqual(got.to_dict(), {"a": "ACGTACG", "b": "ACGTACG"})
+        self.assertEqual(to_type.call_count, 1)
+
     def test_sliced_deepcopy(self):
         """correctly deep copy aligned objects in an alignment"""
 
@@ -3223,6 +3350,89 @@ class ArrayAlignmentSpecificTests(TestCase):
         coevo = aln.coevolution(segments=[(4, 6), (11, 13)], show_progress=False)
         self.assertEqual(coevo.template.names[0], [4, 5, 11, 12])
 
+    def test_window_view(self):
+        """window statistics match those of sliding window alignments"""
+        data = {"a": "ACGT-NACGTTTA", "b": "ACGTRYA--TTAA", "c": "ACGAAAAAAAAAA"}
+        aln = ArrayAlignment(data=data, moltype="dna")
+        windows = aln.window_view(4, 3)
+        self.assertEqual(windows.starts.tolist(), [0, 3, 6, 9])
+        expect = list(aln.sliding_windows(4, 3))
+        self.assertEqual(len(windows), len(expect))
+        self.assertEqual(windows.array.shape, (4, 3, 4))
+        # a view, not a copy
+        self.assertTrue(numpy.shares_memory(windows.array, aln.array_seqs))
+        counts = windows.counts()
+        gaps = windows.gap_fraction()
+        entropy = windows.entropy()
+        for i, (start, window) in enumerate(zip(windows.starts, expect)):
+            self.assertEqual(windows.array[i], window.array_seqs)
+            self.assertEqual(windows[i].to_dict(), window.to_dict())
+            self.assertEqual(
+                counts[start].array, window.counts_per_pos().col_sum().array
+            )
+            self.assertFloatEqual(
+                gaps[start], window.count_gaps_per_pos().array.sum() / 12
+            )
+            self.assertFloatEqual(
+                entropy[start], numpy.nanmean(window.entropy_per_pos())
+            )
+
+        # no windows
+        windows = aln.window_view(20, 1)
+        self.assertEqual(len(windows), 0)
+        self.assertEqual(windows.array.shape, (0, 3, 20))
+
+    def test_to_packed(self):
+        """packed alignments match the unpacked alignment"""
+        data = {
+            "a": "ACGT-NACGTTTA",
+            "b": "ACGTRYA--TTAA",
+            "c": "ACGAAAAAAAAAA",
+            "d": "ACGT-NACGTTTA",
+        }
+        aln = ArrayAlignment(data=data, moltype="dna")
+        counts = aln.counts_per_seq(include_ambiguity=True, allow_gap=True)
+        for bits in (2, 4):
+            packed = aln.to_packed(bits=bits)
+            self.assertEqual(packed.array_seqs, aln.array_seqs)
+            self.assertEqual(packed.to_array_alignment().to_dict(), data)
+            self.assertEqual(packed[3:9].to_dict(), aln[3:9].to_dict())
+            self.assertEqual(packed[1::2].to_dict(), aln[1::2].to_dict())
+            got = packed.counts_per_seq(include_ambiguity=True, allow_gap=True)
+            self.assertEqual(got.motifs, counts.motifs)
+            self.assertEqual(got.array, counts.array)
+            got = packed.counts_per_seq()
+            self.assertEqual(got.motifs, ("A", "C", "G", "T"))
+            self.assertEqual(got.array, aln.counts_per_seq().array)
+            # zero length alignment
+            got = aln[:0].to_packed(bits=bits).counts_per_seq()
+            self.assertEqual(got.array, aln[:0].counts_per_seq().array)
+            dists = packed.distance_matrix()
+            self.assertEqual(dists["a", "b"], 5)
+            self.assertEqual(dists["a", "d"], 0)
+            self.assertTrue(packed.seqs_equal("a", "d"))
+            self.assertFalse(packed.seqs_equal("a", "b"))
+            self.assertEqual(packed.get_identical_sets(), [{"a", "d"}])
+
+        # packed data uses less memory
+        long_aln = ArrayAlignment(
+            data={n: s * 10 for n, s in data.items()}, moltype="dna"
+        )
+        for bits in (2, 4):
+            packed = long_aln.to_packed(bits=bits)
+            self.assertLessThan(packed.nbytes, long_aln.array_seqs.nbytes)
+
+        # invalid moltype or number of bits
+        with self.assertRaises(ValueError):
+            aln.to_packed(bits=3)
+        with self.assertRaises(ValueError):
+            ArrayAlignment(data=data, moltype="protein").to_packed()
+        # "?" can't be stored in 4 bits
+        aln = ArrayAlignment(data={"a": "AC?", "b": "ACG"}, moltype="dna")
+        with self.assertRaises(ValueError):
+            aln.to_packed(bits=4)
+        self.assertEqual(aln.to_packed(bits=2).array_seqs, aln.array_seqs)
+
 
 class IntegrationTests(TestCase):
     """Test for integration between regular and model seqs and alns"""
@@ -0,0 +1,147 @@
+#!/usr/bin/env python
+"""Tests of the array backed tree.
+"""
+from unittest import TestCase, main
+
+import numpy
+
+from numpy.testing import assert_allclose, assert_equal
+
+from cogent3 import make_tree
+from cogent3.core.array_tree import ArrayTree
+from cogent3.core.tree import TreeError
+
+
+__author__ = "Gavin Huttley"
+__copyright__ = "Copyright 2007-2020, The Cogent Project"
+__credits__ = ["Gavin Huttley"]
+__license__ = "BSD-3"
+__version__ = "2020.2.7a"
+__maintainer__ = "Gavin Huttley"
+__email__ = "gavin.huttley@anu.edu.au"
+__status__ = "Alpha"
+
+
+class ArrayTreeTests(TestCase):
+    def setUp(self):
+        self.tree = make_tree("((a:1,b:2)ab:3,(c:4,(d:5,e:6)de:7)cde:8,f:9)root;")
+        self.array_tree = ArrayTree.from_tree(self.tree)
+
+    def test_conversion(self):
+        """round trip from PhyloNode preserves the tree"""
+        at = self.array_tree
+        self.assertEqual(len(at), 10)
+        self.assertEqual(at.num_tips, 6)
+        self.assertEqual(at.get_tip_names(), self.tree.get_tip_names())
+        self.assertEqual(str(at.to_tree()), str(self.tree))
+        # missing lengths and unloaded names are retained
+        tree = make_tree("((a,b),c);")
+        got = ArrayTree.from_tree(tree).to_tree()
+        self.assertEqual(str(got), str(tree))
+        self.assertEqual(got.get_node_names(), tree.get_node_names())
+
+    def test_init_order(self):
+        """nodes are put into preorder"""
+        at = ArrayTree([2, 2, -1], ["a", "b", "root"], [1, 2, None])
+        assert_equal(at.parents, [-1, 0, 0])
+        self.assertEqual(at.names.tolist(), ["root", "a", "b"])
+        assert_equal(at.lengths, [numpy.nan, 1, 2])
+        with self.assertRaises(ValueError):
+            ArrayTree([-1, -1], ["a", "b"])
+        with self.assertRaises(ValueError):
+            ArrayTree([-1, 2, 1], ["a", "b", "c"])
+
+    def test_traversal(self):
+        """array traversals match those of PhyloNode"""
+        at = self.array_tree
+        for attr, expect in (
+            ("preorder", self.tree.preorder()),
+            ("postorder", self.tree.postorder()),
+            ("levelorder", self.tree.levelorder()),
+        ):
+            got = at.names[getattr(at, attr)].tolist()
+            self.assertEqual(got, [n.name for n in expect])
+
+        self.assertEqual(at.names[at.tips("cde")].tolist(), ["c", "d", "e"])
+        self.assertEqual(at.names[at.children("root")].tolist(), ["ab", "cde", "f"])
+        self.assertEqual(at.names[at.ancestors("d")].tolist(), ["de", "cde", "root"])
+        assert_equal(at.depths, [0, 1, 2, 2, 1, 2, 2, 3, 3, 1])
+        assert_equal(
+            at.is_ancestor(["cde", "cde", "d"], ["e", "ab", "d"]), [True, False, True]
+        )
+
+    def test_lca(self):
+        """lowest common ancestors of pairs and of sets of nodes"""
+        at = self.array_tree
+        got = at.lca(["a", "a", "c", "d", "ab", "f"], ["b", "e", "e", "e", "a", "f"])
+        self.assertEqual(at.names[got].tolist(), ["ab", "root", "cde", "de", "ab", "f"])
+        got = at.lowest_common_ancestor(["e", "c", "d"])
+        self.assertEqual(at.names[got], "cde")
+        with self.assertRaises(TreeError):
+            at.lca("a", "missing")
+
+    def test_distance(self):
+        """distances match those from PhyloNode"""
+        at = self.array_tree
+        expect = self.tree.get_distances()
+        pairs = list(expect)
+        got = at.distance(*zip(*pairs))
+        assert_allclose(got, [expect[p] for p in pairs])
+        self.assertEqual(at.distance("a", "a"), 0)
+        self.assertEqual(at.distance("de", "d"), 5)
+
+    def test_tip_to_tip_distances(self):
+        """distance matrices match those from PhyloNode"""
+        tree = make_tree("((a:1,b:2)ab:3,(c:4,(d,e:6)de:7)cde:8,f)root;")
+        at = ArrayTree.from_tree(tree)
+        expect, tips = tree.tip_to_tip_distances()
+        got, indices = at.tip_to_tip_distances(default_length=1)
+        assert_allclose(got, expect)
+        self.assertEqual(at.names[indices].tolist(), [n.name for n in tips])
+        expect, _ = tree.tip_to_tip_distances(endpoints=["f", "a", "de"])
+        got, indices = at.tip_to_tip_distances(["f", "a", "de"], default_length=1)
+        assert_allclose(got, expect)
+        self.assertEqual(at.names[indices].tolist(), ["f", "a", "de"])
+        # missing lengths are 0 by default
+        got, _ = at.tip_to_tip_distances(["d", "e"])
+        assert_allclose(got, [[0, 6], [6, 0]])
+
+    def test_get_sub_tree(self):
+        """sub trees match those from PhyloNode"""
+        for treestring in (
+            "((a:1,b:2)ab:3,(c:4,(d:5,e:6)de:7)cde:8,f:9)root;",
+            "((a:1,b:2)ab:3,(c:4,(d:5,e:6)de:7)cde:8)root;",
+            # lengths that are not exact sums of root distances
+            "((a:0.1,b:0.2)ab:0.3,(c:0.4,(d:0.5,e:0.6)de:0.7)cde:0.8)root:0.9;",
+            # missing lengths
+            "((a:0.1,b:0.2)ab,(c:0.4,(d:0.5,e:0.6)de)cde:0.8,f:0.9)root;",
+            "(((a:0.1,b:0.2)ab,c:0.3)abc:0.7,d:0.1,e:0.2)root;",
+        ):
+            tree = make_tree(treestring)
+            at = ArrayTree.from_tree(tree)
+            for names, kwargs in (
+                (["a", "c", "e"], {}),
+                (["c", "e"], dict(keep_root=True)),
+                (["ab", "e"], {}),
+                (["d", "e", "c"], {}),
+                (["a", "b", "d"], {}),
+                (["a", "b", "x"], dict(ignore_missing=True)),
+                (["e"], dict(keep_root=True)),
+            ):
+                got = at.get_sub_tree(names, **kwargs).to_tree()
+                expect = tree.get_sub_tree(names, **kwargs)
+                self.assertEqual(
+                    got.get_newick(with_distances=True),
+                    expect.get_newick(with_distances=True),
+                )
+
+        with self.assertRaises(ValueError):
+            at.get_sub_tree(["a", "x"])
+        with self.assertRaises(ValueError):
+            at.get_sub_tree(["ab", "e"], tipsonly=True)
+        with self.assertRaises(TreeError):
+            at.get_sub_tree(["a"])
+
+
+if __name__ == "__main__":
+    main()
@@ -2,7 +2,15 @@
 
 """Unit tests for Range, Span and Point classes.
 """
-from cogent3.core.location import Map, Point, Range, RangeFromString, Span
+from cogent3 import make_seq
+from cogent3.core.location import (
+    IndelMap,
+    Map,
+    Point,
+    Range,
+    RangeFromString,
+    Span,
+)
 from cogent3.util.unit_test import TestCase, main
 
 
@@ -528,6 +536,82 @@ class MapTests(TestCase):
         self.assertEqual(coords, spans)
 
 
+class IndelMapTests(TestCase):
+    """tests of the IndelMap class"""
+
+    gapped = ["--AC-GT---TT-", "ACGT", "----", "AC--T-"]
+
+    def _get_maps(self, gapped):
+        map, _ = make_seq(gapped, moltype="dna").parse_out_gaps()
+        return IndelMap.from_gapped_seq(gapped), map
+
+    def test_matches_map(self):
+        """IndelMap attributes match Map"""
+        for gapped in self.gapped:
+            indel_map, map = self._get_maps(gapped)
+            self.assertEqual(len(indel_map), len(map))
+            self.assertEqual(str(indel_map.spans), str(map.spans))
+            self.assertEqual(indel_map.offsets, map.offsets)
+            self.assertEqual(indel_map.get_coordinates(), map.get_coordinates())
+            self.assertEqual(str(indel_map.inverse()), str(map.inverse()))
+            self.assertEqual(str(IndelMap.from_map(map).spans), str(map.spans))
+
+    def test_slice(self):
+        """slicing IndelMap matches slicing Map"""
+        for gapped in self.gapped:
+            indel_map, map = self._get_maps(gapped)
+            for start in range(len(gapped)):
+                for end in range(start + 1, len(gapped) + 1):
+                    got = indel_map[start:end]
+                    expect = map[start:end]
+                    self.assertIsInstance(got, IndelMap)
+                    self.assertEqual(str(got.spans), str(expect.spans))
+                    self.assertEqual(str(got.inverse()), str(expect.inverse()))
+                    if not expect.useful:
+                        continue
+                    self.assertEqual(
+                        got.get_covering_span().get_coordinates(),
+                        expect.get_covering_span().get_coordinates(),
+                    )
+                    self.assertEqual(str(got.zeroed()), str(expect.zeroed()))
+
+    def test_coordinate_conversion(self):
+        """converts between sequence and alignment coordinates"""
+        gapped = "--AC-GT---TT-"
+        indel_map = IndelMap.from_gapped_seq(gapped)
+        expect = []
+        seq_index = 0
+        for char in gapped:
+            expect.append(-1 if char == "-" else seq_index)
+            seq_index += char != "-"
+        got = indel_map.get_seq_index(range(len(gapped)))
+        self.assertEqual(got.tolist(), expect)
+        got = indel_map.get_align_index(range(indel_map.parent_length))
+        self.assertEqual(got.tolist(), [i for i, c in enumerate(gapped) if c != "-"])
+
+    def test_from_map_fails(self):
+        """from_map raises ValueError for maps that are not contiguous"""
+        map = Map([(0, 4), (6, 10)], parent_length=10)
+        with self.assertRaises(ValueError):
+            IndelMap.from_map(map)
+
+    def test_aligned(self):
+        """Aligned with an IndelMap behaves as with a Map"""
+        from cogent3 import make_aligned_seqs
+
+        aln = make_aligned_seqs(
+            {"a": "--AC-GT---TT-", "b": "ACGTACGTACGTA"},
+            moltype="dna",
+            array_align=False,
+        )
+        aligned = aln.seq_data[0]
+        indel = aligned.with_indel_map()
+        self.assertIsInstance(indel.map, IndelMap)
+        self.assertEqual(str(indel), str(aligned))
+        self.assertEqual(str(indel[3:9]), str(aligned[3:9]))
+        self.assertEqual(str(indel.rc()), str(aligned.rc()))
+
+
 # run the following if invoked from command-line
 if __name__ == "__main__":
     main()
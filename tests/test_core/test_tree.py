@@ -2,6 +2,7 @@
 """Tests of classes for dealing with trees and phylogeny.
 """
 import json
+import pickle
 import sys
 import unittest
 
@@ -1190,6 +1191,59 @@ class TreeNodeTests(TestCase):
         root = self.TreeRoot
         assert root.get_node_matching_name("g") is nodes["g"]
 
+    def test_index_updated(self):
+        """name and ancestor lookups reflect changes to the tree"""
+        tree = DndParser("((a,b)ab,(c,d)cd)root;")
+        ab = tree.get_node_matching_name("ab")
+        self.assertIs(tree.get_connecting_node("a", "b"), ab)
+        # changing the topology
+        c = tree.get_node_matching_name("c")
+        ab.append(c)
+        self.assertIs(tree.get_connecting_node("a", "c"), ab)
+        self.assertIs(tree.lowest_common_ancestor(["c", "b"]), ab)
+        self.assertIs(c.last_common_ancestor(tree.get_node_matching_name("d")), tree)
+        ab.remove("a")
+        self.assertIsNone(tree._get_node_matching_name("a"))
+        # renaming
+        c.name = "x"
+        self.assertIs(tree.get_node_matching_name("x"), c)
+        self.assertIsNone(tree._get_node_matching_name("c"))
+        # the first node in preorder is returned for duplicated names
+        tree.name = "b"
+        self.assertIs(tree.get_node_matching_name("b"), tree)
+        # changes to another tree do not invalidate a built index
+        tree.get_node_matching_name("b")
+        index = tree._get_index()
+        other = DndParser("(a,b);")
+        other.remove("a")
+        self.assertIs(tree._get_index(), index)
+        # pickling preserves names
+        self.assertEqual(pickle.loads(pickle.dumps(tree)).name, "b")
+        # nodes in different trees have no common ancestor
+        self.assertIsNone(c.last_common_ancestor(DndParser("(a,b);")))
+        # the index is not copied
+        tree = tree.deepcopy()
+        self.assertIsNot(tree.get_node_matching_name("x"), c)
+
+    def test_index_deep_tree(self):
+        """changes mark ancestors as changed only once"""
+        num_tips = 3000
+        treestring = "(" * (num_tips - 1) + "t0"
+        treestring += "".join(f",t{i})" for i in range(1, num_tips)) + ";"
+        tree = DndParser(treestring)
+        self.assertEqual(tree.get_connecting_node("t0", "t1").children[1].name, "t1")
+        self.assertFalse(any(node._stale for node in tree.preorder()))
+        deepest = tree.get_node_matching_name("t0")
+        deepest.name = "x"
+        self.assertTrue(all(node._stale for node in deepest.ancestors()))
+        # the walk stops at the first node already marked
+        deepest.parent._stale = False
+        deepest.name = "t0"
+        self.assertFalse(deepest.parent._stale)
+        deepest.parent._stale = True
+        self.assertIs(tree.get_node_matching_name("t0"), deepest)
+        self.assertIs(tree.get_connecting_node("t0", "t2"), deepest.parent.parent)
+
     def test_subset(self):
         """subset should return set of leaves that descends from node"""
         t = self.t
@@ -1204,6 +1258,22 @@ class TreeNodeTests(TestCase):
         t = self.t
         self.assertEqual(t.subsets(), frozenset([frozenset("HG"), frozenset("RM")]))
 
+    def test_iter_clade_bits(self):
+        """clades are encoded as the bitwise or of their tips"""
+        tree = DndParser("((a,b)ab,(c,d)cd)root;")
+        tip_bits = dict(a=1, b=2, c=4, d=8)
+        got = [(node.name, bits) for node, bits in tree.iter_clade_bits(tip_bits)]
+        expect = [
+            ("a", 1),
+            ("b", 2),
+            ("ab", 3),
+            ("c", 4),
+            ("d", 8),
+            ("cd", 12),
+            ("root", 15),
+        ]
+        self.assertEqual(got, expect)
+
     def test_compare_by_subsets(self):
         """compare_by_subsets should return the fraction of shared subsets"""
         result = self.t.compare_by_subsets(self.t)
@@ -1429,6 +1499,23 @@ class PhyloNodeTests(TestCase):
         t3 = DndParser(self.s3, PhyloNode)
         obs = t.compare_by_tip_distances(t3, sample=3, shuffle_f=sorted)
 
+    def test_get_pairwise_distances(self):
+        """batched distances match those from distance"""
+        nodes, tree = self.TreeNode, self.TreeRoot
+        pairs = [("a", "g"), ("d", "h"), ("e", "g"), ("c", "c")]
+        got = tree.get_pairwise_distances(pairs)
+        self.assertEqual(got, [nodes[a].distance(nodes[b]) for a, b in pairs])
+        got = tree.get_pairwise_distances([(nodes["d"], nodes["e"])])
+        self.assertEqual(got, [5])
+        # missing lengths use default_length
+        tree = make_tree("((a,b:2),c:3);")
+        self.assertEqual(tree.get_pairwise_distances([("a", "c")]), [5])
+        got = tree.get_pairwise_distances([("a", "c")], default_length=0)
+        self.assertEqual(got, [3])
+        self.assertEqual(len(tree.get_pairwise_distances([])), 0)
+        with self.assertRaises(TreeError):
+            tree.get_pairwise_distances([("a", "x")])
+
     def test_tip_to_tip_distances_endpoints(self):
         """Test getting specifc tip distances  with tip_to_tip_distances"""
         nodes = [
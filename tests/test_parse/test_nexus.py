@@ -9,6 +9,7 @@ from cogent3.parse.nexus import (
     find_fields,
     get_BL_table,
     get_tree_info,
+    iter_nexus_tree_strings,
     parse_dnd,
     parse_nexus_tree,
     parse_PAUP_log,
@@ -16,6 +17,7 @@ from cogent3.parse.nexus import (
     parse_trans_table,
     split_tree_info,
 )
+from cogent3.parse.record import RecordError
 
 
 __author__ = "Catherine Lozupone"
@@ -267,6 +269,19 @@ class NexusParserTests(TestCase):
         self.assertEqual(Trans_table["20"], "AF078179af")
         self.assertEqual(Trans_table["19"], "AF078251af")
 
+    def test_iter_nexus_tree_strings(self):
+        """yields the same trees and translation table as parse_nexus_tree"""
+        for lines in (Nexus_tree, Nexus_tree_2, Nexus_tree_3):
+            trans_table, dnds = parse_nexus_tree(lines)
+            got = list(iter_nexus_tree_strings(lines))
+            self.assertEqual(["tree " + n for n, _, _ in got], list(dnds))
+            self.assertEqual([d for _, d, _ in got], list(dnds.values()))
+            for _, _, table in got:
+                self.assertEqual(table, trans_table)
+
+        with self.assertRaises(RecordError):
+            list(iter_nexus_tree_strings(["#NEXUS", "begin data;", "end;"]))
+
     def test_get_tree_info(self):
         """get_tree_info returns the Nexus file section that describes the tree"""
         result = get_tree_info(Nexus_tree)
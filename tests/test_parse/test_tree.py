@@ -3,7 +3,13 @@
 """
 from unittest import TestCase, main
 
-from cogent3.core.tree import PhyloNode
+from cogent3.core.tree import PhyloNode, TreeBuilder
+from cogent3.parse.newick import (
+    TreeParseError,
+    parse_array_tree,
+    parse_string,
+    parse_tree,
+)
 from cogent3.parse.tree import DndParser, DndTokenizer, RecordError
 
 
@@ -292,5 +298,54 @@ class PhyloNodeTests(TestCase):
         self.assertEqual(str(p), "((xyz):2)abc:3;")
 
 
+class NewickParseTreeTests(TestCase):
+    """parse_tree matches parse_string with a TreeBuilder"""
+
+    def _builder_tree(self, text, **kwargs):
+        tree = parse_string(text, TreeBuilder().create_edge, **kwargs)
+        if not tree.name_loaded:
+            tree.name = "root"
+        return tree
+
+    def test_parse_tree(self):
+        """names, lengths and topology match the builder"""
+        for text in (
+            sample,
+            node_data_sample,
+            "((a:1,b:2)ab:3,(c:4,(d:5,e:6)de:7)cde:8,f:9)root;",
+            "(a,(b,c)x:0.5, (d,e)x)y:3;",
+            "(a_b c, ,());",
+            "(a,a,a.2,a);",
+            "( (A :1.0,'B (b)': 2) [com\nment]pair:3,'longer name''s':4)dash_ed;",
+        ):
+            for unmunge in (False, True):
+                got = parse_tree(text, underscore_unmunge=unmunge)
+                expect = self._builder_tree(text, underscore_unmunge=unmunge)
+                self.assertEqual(str(got), str(expect))
+                for g, e in zip(got.preorder(), expect.preorder()):
+                    self.assertEqual(g.name, e.name)
+                    self.assertEqual(g.name_loaded, e.name_loaded)
+                    self.assertEqual(g.params, e.params)
+
+                array_tree = parse_array_tree(text, underscore_unmunge=unmunge)
+                self.assertEqual(str(array_tree.to_tree()), str(expect))
+
+    def test_parse_tree_errors(self):
+        """invalid trees raise TreeParseError"""
+        for text in ("((a,b)(c,d));", "(a:1:2,b);", "(a,b", "(a (b,c));", "(a:x,b);"):
+            with self.assertRaises(TreeParseError):
+                parse_tree(text)
+
+    def test_parse_deep_tree(self):
+        """no recursion limits for deeply nested trees"""
+        text = "a"
+        for i in range(5000):
+            text = f"({text},t{i})"
+        tree = parse_tree(text + ";")
+        self.assertEqual(len(tree.get_tip_names()), 5001)
+        array_tree = parse_array_tree(text + ";")
+        self.assertEqual(array_tree.depths.max(), 5000)
+
+
 if __name__ == "__main__":
     main()
@@ -6,16 +6,31 @@ import warnings
 from numpy import exp, log
 
 from cogent3 import get_model, load_aligned_seqs, load_tree, make_tree
-from cogent3.phylo.consensus import get_splits, get_tree, majority_rule
-from cogent3.phylo.least_squares import wls
+from cogent3.phylo.consensus import (
+    get_informative_bits,
+    get_split_bits,
+    get_splits,
+    get_tip_bits,
+    get_tree,
+    majority_rule,
+    robinson_foulds,
+)
+from cogent3.phylo.least_squares import WLS, wls
 from cogent3.phylo.maximum_likelihood import ML
 from cogent3.phylo.nj import gnj, nj
 from cogent3.phylo.tree_collection import (
     LogLikelihoodScoredTreeCollection,
     ScoredTreeCollection,
     WeightedTreeCollection,
+    iter_trees,
     make_trees,
 )
+from cogent3.phylo.tree_space import (
+    _GrownTreeScorer,
+    ancestry_key,
+    grown,
+    tree2ancestry,
+)
 from cogent3.util.misc import remove_files
 
 
@@ -408,6 +423,39 @@ class ConsensusTests(unittest.TestCase):
         tree = load_tree(os.path.join(data_path, "murphy.tree"))
         self.assertTrue(tree.same_topology(get_tree(get_splits(tree))))
 
+    def test_get_split_bits(self):
+        """splits encoded as bits exclude the first tip"""
+        tree = Tree("((a:0.3,c:0.4):0.5,b:0.2,d:0.1);")
+        tip_bits = get_tip_bits("abcd")
+        self.assertEqual(tip_bits, dict(a=1, b=2, c=4, d=8))
+        got = get_split_bits(tree, tip_bits)
+        self.assertEqual(
+            got,
+            {
+                1 ^ 15: {"length": 0.3},
+                4: {"length": 0.4},
+                2 | 8: {"length": 0.5},
+                2: {"length": 0.2},
+                8: {"length": 0.1},
+            },
+        )
+        self.assertEqual(get_informative_bits(tree, tip_bits), {10})
+        self.assertEqual(get_informative_bits(tree, tip_bits, rooted=True), {5})
+
+    def test_robinson_foulds(self):
+        """Robinson-Foulds distances count splits in only one tree"""
+        t1 = Tree("(((a,b),c),(d,e),f);")
+        t2 = Tree("(((a,c),b),(d,e),f);")
+        self.assertEqual(robinson_foulds(t1, t1), 0)
+        self.assertEqual(robinson_foulds(t1, t2), 2)
+        self.assertEqual(robinson_foulds(t1, t2, normalise=True), 2 / 6)
+        # rooting does not affect splits, but does affect clades
+        t3 = Tree("((a,b),(c,((d,e),f)));")
+        self.assertEqual(robinson_foulds(t1, t3), 0)
+        self.assertEqual(robinson_foulds(t1, t3, rooted=True), 3)
+        with self.assertRaises(ValueError):
+            robinson_foulds(t1, Tree("((a,b),c,d);"))
+
     def test_consensus_tree_branch_lengths(self):
         """consensus trees should average branch lengths properly"""
 
@@ -477,6 +525,34 @@ class ConsensusTests(unittest.TestCase):
         ct = cts.get_consensus_tree()
         self.assertTrue(ct.same_topology(Tree("((a,b),c,d);")))
 
+    def test_tree_collection_distance_matrix(self):
+        """pairwise distances between trees in a collection"""
+        trees = [
+            Tree("(((a:1,b:2):1,c:1):1,(d:1,e:1):1,f:1);"),
+            Tree("(((a:1,c:1):1,b:2):1,(d:1,e:1):1,f:1);"),
+            Tree("((a:1,b:2):0.5,(c:1,((d:1,e:1):1,f:1):1):0.5);"),
+        ]
+        sct = ScoredTreeCollection(list(zip([1] * 3, trees)))
+        dists = sct.distance_matrix()
+        self.assertEqual(dists.names, ["0", "1", "2"])
+        for i, j in [(0, 1), (0, 2), (1, 2)]:
+            self.assertEqual(dists[i, j], robinson_foulds(trees[i], trees[j]))
+        self.assertEqual(dists[2, 0], 0)
+        dists = sct.distance_matrix(rooted=True, names="xyz")
+        self.assertEqual(dists["x", "z"], 3)
+        dists = sct.distance_matrix(normalise=True)
+        self.assertEqual(dists[0, 1], 2 / 6)
+        # splits differing in length, a's edge and (a, b) vs (a, c)
+        dists = sct.distance_matrix(method="wrf")
+        self.assertEqual(dists[0, 1], 2)
+        # the root edges form one split, so tree 2 matches tree 0
+        self.assertEqual(dists[0, 2], 0)
+        with self.assertRaises(ValueError):
+            sct.distance_matrix(method="other")
+        sct.append((1, Tree("((a,b),c,d);")))
+        with self.assertRaises(ValueError):
+            sct.distance_matrix()
+
     def test_tree_collection_read_write_file(self):
         """should correctly read / write a collection from a file"""
 
@@ -491,6 +567,37 @@ class ConsensusTests(unittest.TestCase):
         eval_klass(WeightedTreeCollection([(exp(s), t) for s, t in self.scored_trees]))
         remove_files(["sample.trees"], error_on_missing=False)
 
+    def test_iter_trees(self):
+        """should stream trees from Newick and Nexus files"""
+        coll = LogLikelihoodScoredTreeCollection(self.scored_trees)
+        for klass in (LogLikelihoodScoredTreeCollection, ScoredTreeCollection):
+            klass(self.scored_trees).write("sample.trees")
+            got = list(iter_trees("sample.trees"))
+            self.assertEqual([s for s, _ in got], [s for s, _ in coll])
+            self.assertEqual([str(t) for _, t in got], [str(t) for _, t in coll])
+            got = [s for s, _ in iter_trees("sample.trees", burnin=1, thin=2)]
+            self.assertEqual(got, [coll[1][0], coll[3][0]])
+
+        # multi-line Newick without scores
+        with open("sample.trees", "w") as outfile:
+            outfile.write("((a,b),\n(c,d));\n((a,c),(b,d));((a,d),(b,c));\n")
+        got = list(iter_trees("sample.trees", burnin=1))
+        self.assertEqual([s for s, _ in got], [None, None])
+        self.assertEqual([str(t) for _, t in got], ["((a,c),(b,d));", "((a,d),(b,c));"])
+        with self.assertRaises(ValueError):
+            make_trees("sample.trees")
+
+        with open("sample.trees", "w") as outfile:
+            outfile.write(
+                "#NEXUS\nbegin trees;\n  translate\n    1 a,\n    2 b,\n    3 c;\n"
+                "  tree one = [&U] ((1,2),3);\n  tree two = [&U] ((1,3),\n2);\nend;\n"
+            )
+        got = [str(t) for _, t in iter_trees("sample.trees")]
+        self.assertEqual(got, ["((a,b),c);", "((a,c),b);"])
+        with self.assertRaises(ValueError):
+            list(iter_trees("sample.trees", burnin=-1))
+        remove_files(["sample.trees"], error_on_missing=False)
+
 
 class TreeReconstructionTests(unittest.TestCase):
     def setUp(self):
@@ -570,6 +677,75 @@ class TreeReconstructionTests(unittest.TestCase):
             start=[make_tree(treestring="((a,c),b,(d,(e,f)))")],
         )
 
+    def test_ancestry_key(self):
+        """ancestry keys are equal only for the same unrooted topology"""
+        order = list("abcdef")
+        tree = make_tree(treestring="((a,b),(c,d),(e,f))")
+        key = ancestry_key(tree2ancestry(tree, order=order)[0])
+        for treestring, expect in (
+            ("((f,e),(a,b),(d,c))", True),
+            ("(a,b,((c,d),(e,f)))", True),
+            ("((a,c),(b,d),(e,f))", False),
+        ):
+            other = make_tree(treestring=treestring)
+            got = ancestry_key(tree2ancestry(other, order=order)[0]) == key
+            self.assertEqual(got, expect)
+
+    def test_trex_duplicate_start(self):
+        """duplicated starting trees are only evaluated once"""
+        init = make_tree(treestring="((a,c),b,d)")
+        init2 = make_tree(treestring="(a,c,(b,d))")
+        results = WLS(self.dists).trex(
+            start=[init, init2], k=100, return_all=True, show_progress=False
+        )
+        # 5 trees of 5 tips from 1 start tree, each giving 7 of 6 tips
+        self.assertEqual(len(results), 35)
+
+    def test_grown_tree_scorer_pickle(self):
+        """grown tree scorers can be sent to worker processes"""
+        import pickle
+
+        ancestry = tree2ancestry(make_tree(treestring="((a,c),b,d)"))[0]
+        scorer = _GrownTreeScorer(WLS(self.dists), list("acbde"), [ancestry])
+        expect = scorer((0, None))
+        scorer = pickle.loads(pickle.dumps(scorer))
+        self.assertIs(scorer._evaluate, None)
+        got = scorer((0, None))
+        self.assertEqual([r[:3] for r in got], [r[:3] for r in expect])
+        self.assertEqual([r[2] for r in got], list(range(5)))
+        # a single split edge, as used for evaluators scoring each tree
+        got = scorer((0, [3]))
+        self.assertEqual([r[:3] for r in got], [expect[3][:3]])
+        self.assertTrue(WLS.scores_grown_together)
+        self.assertFalse(ML.scores_grown_together)
+
+        aln = load_aligned_seqs(os.path.join(data_path, "brca1.fasta"), moltype="dna")
+        ml = ML(get_model("JC69"), aln.take_seqs(["Human", "Mouse", "Rat", "Dog"]))
+        self.assertIsInstance(pickle.loads(pickle.dumps(ml)), ML)
+
+    def test_wls_grown_tree_scorer(self):
+        """batched scores of grown trees match scoring each tree"""
+        from numpy.testing import assert_allclose
+
+        dists = {
+            k: v * (1 + ord(k[0]) * ord(k[1]) % 7 / 20) for k, v in self.dists.items()
+        }
+        names = list("acbdef")
+        ancestry = tree2ancestry(make_tree(treestring="((a,c),b,(d,e))"), names)[0]
+        evaluator = WLS(dists)
+        evaluate = evaluator.make_tree_scorer(names)
+        for max_size in (2 ** 21, 100, 1):
+            got = evaluator.make_grown_tree_scorer(names, max_size=max_size)(ancestry)
+            self.assertEqual([edge for _, edge, _ in got], list(range(7)))
+            subset = evaluator.make_grown_tree_scorer(names, max_size=max_size)(
+                ancestry, [5, 1]
+            )
+            self.assertEqual([r[:2] for r in subset], [got[5][:2], got[1][:2]])
+            for (err, edge, lengths) in got:
+                (expect_err, expect_lengths) = evaluate(grown(ancestry, edge))
+                assert_allclose(err, expect_err)
+                assert_allclose(lengths, expect_lengths, atol=1e-12)
+
     def test_ml(self):
         """exercise the ML tree estimation"""
         from numpy.testing import assert_allclose
@@ -582,6 +758,58 @@ class TreeReconstructionTests(unittest.TestCase):
         assert_allclose(lnL, -8882.217502905267)
         self.assertTrue(tree.same_topology(make_tree("(Mouse,Rat,(Human,Dog));")))
 
+    def test_ml_nni(self):
+        """NNI search from a wrong topology finds the ML tree"""
+        from numpy.testing import assert_allclose
+
+        aln = load_aligned_seqs(os.path.join(data_path, "brca1.fasta"), moltype="dna")
+        aln = aln.take_seqs(["Human", "Mouse", "Rat", "Dog"])
+        aln = aln.omit_gap_pos(allowed_gap_frac=0)
+        ml = ML(get_model("JC69"), aln)
+        start = make_tree("((Human,Mouse),Rat,Dog);")
+        lnL, tree = ml.nni(start, show_progress=False)
+        assert_allclose(lnL, -8882.217502905267)
+        self.assertTrue(tree.same_topology(make_tree("(Mouse,Rat,(Human,Dog));")))
+        # no passes leaves the topology unchanged
+        lnL, tree = ml.nni(start, max_passes=0, show_progress=False)
+        self.assertTrue(tree.same_topology(start))
+        self.assertLess(lnL, -8882.217502905267)
+
+    def test_ml_nni_global_params(self):
+        """NNI search with a free global parameter needs several passes"""
+        from numpy.testing import assert_allclose
+
+        aln = load_aligned_seqs(os.path.join(data_path, "brca1.fasta"), moltype="dna")
+        names = ["Human", "Mouse", "Rat", "Dog", "HowlerMon", "Horse"]
+        aln = aln.take_seqs(names).omit_gap_pos(allowed_gap_frac=0)[:1500]
+        ml = ML(get_model("HKY85"), aln)
+        start = make_tree("((Human,Mouse),(Rat,Horse),(Dog,HowlerMon));")
+        expect_tree = make_tree("((Horse,Dog),(HowlerMon,Human),(Rat,Mouse));")
+        expect = ml._fitted_lf(expect_tree, aln)
+        lnL, tree = ml.nni(start, show_progress=False)
+        self.assertTrue(tree.same_topology(expect_tree))
+        assert_allclose(lnL, expect.get_log_likelihood())
+        kappa = expect.get_param_value("kappa")
+        for edge in tree.get_edge_vector(include_root=False):
+            assert_allclose(edge.params["kappa"], kappa, rtol=1e-4)
+        # a single pass does not reach the optimum
+        lnL, tree = ml.nni(start, max_passes=1, show_progress=False)
+        self.assertLess(lnL, expect.get_log_likelihood() - 1)
+
+        # scoring a candidate holds all but the free edge lengths constant
+        tree = expect.get_annotated_tree()
+        human = tree.get_node_matching_name("Human")
+        expect_length = human.length
+        human.params["length"] = 0.1
+        lf = ml._fitted_lf(tree, aln, free_edges={"Human"})
+        self.assertEqual(lf.get_param_value("kappa"), kappa)
+        for edge in tree.get_edge_vector(include_root=False):
+            length = lf.get_param_value("length", edge=edge.name)
+            if edge is human:
+                assert_allclose(length, expect_length, rtol=1e-3)
+            else:
+                self.assertEqual(length, edge.length)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,82 @@
+import json
+
+import numpy
+
+from cogent3 import make_aligned_seqs, make_tree
+from cogent3.evolve.models import get_model
+from cogent3.util.deserialise import deserialise_object
+from cogent3.util.dict_array import DictArrayTemplate
+from cogent3.util.serialise import from_binary, is_binary, to_binary
+from cogent3.util.unit_test import TestCase, main
+
+
+__author__ = "Gavin Huttley"
+__copyright__ = "Copyright 2007-2020, The Cogent Project"
+__credits__ = ["Gavin Huttley"]
+__license__ = "BSD-3"
+__version__ = "2020.2.7a"
+__maintainer__ = "Gavin Huttley"
+__email__ = "Gavin.Huttley@anu.edu.au"
+__status__ = "Alpha"
+
+
+def _json_roundtrip(data):
+    return json.loads(json.dumps(data))
+
+
+class TestBinaryEncoding(TestCase):
+    def test_roundtrip_builtins(self):
+        """decoded value matches a json roundtrip"""
+        data = dict(
+            a=list(range(20)),
+            b=[[0.1 * i, 0.2 * i] for i in range(10)],
+            c=[1, 2.5] * 10,  # mixed types are not converted
+            d=[True, False] * 10,
+            e=[[1, 2], [3]] * 5,  # ragged
+            f="text",
+            g=(1.0, 2.0) * 5,
+            h=None,
+            i=[2 ** 70] * 10,
+        )
+        got = from_binary(to_binary(data))
+        self.assertEqual(got, _json_roundtrip(data))
+        self.assertEqual(type(got["c"][0]), int)
+
+    def test_numpy_values(self):
+        """numpy arrays and scalars are encoded"""
+        data = dict(a=numpy.arange(12).reshape(3, 4), b=numpy.float64(2.5))
+        got = from_binary(to_binary(data))
+        self.assertEqual(got, dict(a=data["a"].tolist(), b=2.5))
+
+    def test_is_binary(self):
+        """correctly identifies binary encoded data"""
+        self.assertTrue(is_binary(to_binary({})))
+        self.assertFalse(is_binary(json.dumps({})))
+        self.assertFalse(is_binary(b"abc"))
+        with self.assertRaises(ValueError):
+            from_binary(b"abc")
+
+    def test_deserialise_object(self):
+        """deserialise_object handles binary encoded objects"""
+        darr = DictArrayTemplate(["a", "b"], ["c", "d", "e"]).wrap(
+            numpy.arange(6).reshape(2, 3)
+        )
+        got = deserialise_object(to_binary(darr))
+        self.assertEqual(got.to_dict(), darr.to_dict())
+
+        _data = {
+            "Human": "ATGCGGCTCGCGGAGGCCGCGCTCGCGGAG",
+            "Mouse": "ATGCCCGGCGCCAAGGCAGCGCTGGCGGAG",
+            "Opossum": "ATGCCAGTGAAAGTGGCGGCGGTGGCTGAG",
+        }
+        aln = make_aligned_seqs(data=_data, moltype="dna")
+        lf = get_model("HKY85").make_likelihood_function(make_tree(tip_names=aln.names))
+        lf.set_alignment(aln)
+        data = to_binary(lf)
+        self.assertLess(len(data), len(lf.to_json()))
+        got = deserialise_object(data)
+        self.assertFloatEqual(got.lnL, lf.lnL)
+
+
+if __name__ == "__main__":
+    main()
@@ -14,7 +14,7 @@ import numpy
 
 from numpy.testing import assert_equal
 
-from cogent3 import load_table, make_table
+from cogent3 import load_table, load_table_chunks, make_table
 from cogent3.util.table import (
     Table,
     cast_str_to_array,
@@ -562,6 +562,94 @@ class TableTests(TestCase):
         self.assertEqual(t2.filtered("bar % 2 == 0").shape[0], 2)
         self.assertEqual(t2.filtered("id == 0").shape[0], 0)
 
+    def test_filtered_vectorised(self):
+        """string expressions evaluated on columns match row evaluation"""
+        t1 = Table(header=self.t1_header, data=self.t1_rows)
+        expressions = {
+            'chrom == "X"': lambda r: r[0] == "X",
+            "1500 < length <= 2000": lambda r: 1500 < r[2] <= 2000,
+            'not (length > 1500 and chrom == "A")': lambda r: not (
+                r[2] > 1500 and r[0] == "A"
+            ),
+            'chrom in ("A", "Y") or length * 2 > 4000': lambda r: r[0] in ("A", "Y")
+            or r[2] * 2 > 4000,
+            "length % 2": lambda r: r[2] % 2,
+        }
+        for expression, func in expressions.items():
+            got = t1.filtered(expression)
+            expect = t1.filtered(func)
+            self.assertEqual(got.tolist(), expect.tolist())
+
+        got = t1.with_new_column("double", "length * 2")
+        self.assertEqual(got.tolist("double"), [2 * v for v in t1.tolist("length")])
+
+        # calls, subscripts and attributes are evaluated per row
+        table = make_table(
+            data={
+                "name": ["a", "b", "cde", "abd"],
+                "x": [1, 3, 5, 4],
+                "y": [2, 4, 3, 1],
+            }
+        )
+        expressions = {
+            "len(name) > 1 and x > 2": lambda r: len(r[0]) > 1 and r[1] > 2,
+            "name[0] == 'a' and x > 2": lambda r: r[0][0] == "a" and r[1] > 2,
+            "str(x) == '5' or y > 3": lambda r: str(r[1]) == "5" or r[2] > 3,
+            "name.startswith('a')": lambda r: r[0].startswith("a"),
+            "x in (y, 5)": lambda r: r[1] in (r[2], 5),
+        }
+        for expression, func in expressions.items():
+            expect = [func(r) for r in table.tolist()]
+            got = table.filtered(expression).tolist("name")
+            self.assertEqual(got, [r[0] for r, e in zip(table.tolist(), expect) if e])
+            self.assertEqual(table.count(expression), sum(expect))
+            got = table.get_row_indices(expression, table.header)
+            self.assertEqual(got.tolist(), expect)
+
+        got = table.with_new_column("z", "len(name) + x")
+        self.assertEqual(got.tolist("z"), [2, 4, 8, 7])
+
+    def test_group_by(self):
+        """group_by aggregates values of each group"""
+        t1 = Table(header=self.t1_header, data=self.t1_rows)
+        got = t1.group_by("chrom").agg(
+            num=("length", "count"),
+            total=("length", "sum"),
+            mean=("length", "mean"),
+            shortest=("length", "min"),
+            longest=("length", max),
+        )
+        self.assertEqual(
+            got.header, ("chrom", "num", "total", "mean", "shortest", "longest")
+        )
+        self.assertEqual(got.tolist("chrom"), ["A", "X"])
+        for chrom in ("A", "X"):
+            lengths = t1.filtered(lambda x: x == chrom, columns="chrom").tolist(
+                "length"
+            )
+            row = got.filtered(lambda x: x == chrom, columns="chrom")
+            self.assertEqual(row.tolist("num"), [len(lengths)])
+            self.assertEqual(row.tolist("total"), [sum(lengths)])
+            self.assertEqual(row.tolist("shortest"), [min(lengths)])
+            self.assertEqual(row.tolist("longest"), [max(lengths)])
+            assert_equal(row.tolist("mean"), [numpy.mean(lengths)])
+
+        # multiple key columns
+        table = make_table(
+            data={"a": [1, 1, 2, 2, 1], "b": ["x", "y", "x", "x", "x"], "c": range(5)}
+        )
+        got = table.group_by(["a", "b"]).agg(c=("c", "sum"), first=("c", "first"))
+        self.assertEqual(got.tolist(), [[1, "x", 4, 0], [1, "y", 1, 1], [2, "x", 5, 2]])
+        with self.assertRaises(ValueError):
+            table.group_by("a").agg(c=("c", "mode"))
+
+        # min and max of str values
+        table = table.with_new_column("s", lambda x: "pqrst"[x], columns="c")
+        got = table.group_by("a").agg(low=("s", "min"), high=("s", "max"))
+        self.assertEqual(got.tolist(), [[1, "p", "t"], [2, "r", "s"]])
+        got = table.group_by("b").agg(low=("b", "min"), high=("s", "max"))
+        self.assertEqual(got.tolist(), [["x", "x", "t"], ["y", "y", "q"]])
+
     def test_filtered_by_column(self):
         """test the table filtered_by_column method"""
         t1 = Table(header=self.t1_header, data=self.t1_rows)
@@ -619,6 +707,83 @@ class TableTests(TestCase):
             t2.joined(t3, inner_join=False).shape[1], t2.shape[1] + t3.shape[1]
         )
 
+    def test_joined_methods(self):
+        """hash and sort joins match joining by key tuples"""
+        from cogent3.util.table import _join_indices, _join_indices_python
+
+        rng = numpy.random.default_rng(13)
+        left = {
+            "a": rng.integers(0, 20, size=200),
+            "b": rng.choice(["x", "y", "z"], size=200),
+        }
+        right = {
+            "a": rng.integers(0, 20, size=150),
+            "b": rng.choice(["x", "y", "w"], size=150),
+        }
+        for columns in (["a"], ["a", "b"]):
+            keys_left = [left[c] for c in columns]
+            keys_right = [right[c] for c in columns]
+            expect = _join_indices_python(keys_left, keys_right)
+            for method in ("hash", "sort"):
+                got = _join_indices(keys_left, keys_right, method=method)
+                assert_equal(got, expect)
+
+        with self.assertRaises(ValueError):
+            _join_indices(keys_left, keys_right, method="nested")
+
+    def test_left_join(self):
+        """left join retains unmatched rows"""
+        a = make_table(data={"id": [1, 2, 3], "x": ["a", "b", "c"]})
+        b = make_table(
+            data={"id": [3, 1, 3], "y": [0.1, 0.2, 0.3], "z": ["p", "q", "r"]},
+            title="B",
+        )
+        got = a.left_join(b, columns_self="id", columns_other="id")
+        self.assertEqual(got.header, ("id", "x", "B_y", "B_z"))
+        self.assertEqual(got.tolist("id"), [1, 2, 3, 3])
+        self.assertEqual(got.tolist("B_y")[0], 0.2)
+        self.assertTrue(numpy.isnan(got.tolist("B_y")[1]))
+        self.assertEqual(got.tolist("B_z"), ["q", None, "p", "r"])
+        got = a.joined(b, columns_self="id", left=True, method="sort")
+        self.assertEqual(got.tolist("id"), [1, 2, 3, 3])
+        # inner join drops the unmatched row
+        got = a.joined(b, columns_self="id")
+        self.assertEqual(got.tolist("id"), [1, 3, 3])
+
+    def test_joined_str_widths(self):
+        """joins match str keys stored with different widths"""
+        a = make_table(data={"k": ["ab", "c", "dd"], "x": [1, 2, 3]})
+        b = make_table(data={"k": ["ab", "c", "longer"], "y": [4, 5, 6]}, title="B")
+        for method in ("hash", "sort"):
+            got = a.inner_join(b, columns_self="k", method=method)
+            self.assertEqual(got.tolist("k"), ["ab", "c"])
+            got = a.left_join(b, columns_self="k", method=method)
+            self.assertEqual(got.tolist("B_y")[:2], [4, 5])
+
+    def test_joined_nan_keys(self):
+        """nan keys do not match, whatever the join method"""
+        from cogent3.util.table import _join_indices, _join_indices_python
+
+        nan = numpy.nan
+        a = make_table(data={"k": [1.0, nan, 2.0, nan], "s": list("abab")})
+        b = make_table(
+            data={"k": [nan, 2.0, 1.0], "s": list("baa"), "y": [4, 5, 6]}, title="B"
+        )
+        keys_a = [a.columns["k"], a.columns["s"]]
+        keys_b = [b.columns["k"], b.columns["s"]]
+        expect = _join_indices_python(keys_a, keys_b)
+        self.assertEqual(expect[0].tolist(), [0, 2])
+        self.assertEqual(expect[1].tolist(), [2, 1])
+        for method in ("hash", "sort"):
+            got = _join_indices(keys_a, keys_b, method=method)
+            self.assertEqual(got[0].tolist(), expect[0].tolist())
+            self.assertEqual(got[1].tolist(), expect[1].tolist())
+            got = a.inner_join(b, columns_self="k", method=method)
+            self.assertEqual(got.tolist("k"), [1.0, 2.0])
+            got = a.left_join(b, columns_self=["k", "s"], method=method)
+            self.assertEqual(got.tolist("B_y")[::2], [6, 5])
+            self.assertTrue(numpy.isnan(got.tolist("B_y")[1::2]).all())
+
     def test_joined_diff_indexing(self):
         """join handles different indexing"""
         a = Table(
@@ -700,6 +865,13 @@ class TableTests(TestCase):
         self.assertEqual(table[0, "stableid"], "ENSG00000019102")
         self.assertEqual(table[last_index, "stableid"], "ENSG00000019144")
 
+        # multiple keys with mixed directions
+        table = make_table(
+            data={"a": [2, 1, 2, 1, 2], "b": ["x", "y", "z", "x", "y"], "c": range(5)}
+        )
+        got = table.sorted(columns=["a", "b"], reverse="b")
+        self.assertEqual(got.tolist("c"), [1, 3, 2, 4, 0])
+
     def test_summed(self):
         """test the table summed method"""
         t5 = Table(header=self.t5_header, data=self.t5_rows)
@@ -997,6 +1169,95 @@ class TableTests(TestCase):
             with self.assertRaises(ValueError):
                 r = load_table(path, skip_inconsistent=False)
 
+    def test_load_chunked(self):
+        """chunked loading gives same result as a single chunk"""
+        t = make_table(
+            header=["id", "count", "score", "label"],
+            data=[[f"s{i}", i, i / 3, "x" if i < 7 else 5.0] for i in range(10)],
+        )
+        with TemporaryDirectory(".") as dirname:
+            path = pathlib.Path(dirname) / "table.tsv"
+            t.write(str(path))
+            expect = load_table(path)
+            got = load_table(path, chunk_size=3)
+            for c in expect.header:
+                self.assertEqual(got.columns[c].dtype, expect.columns[c].dtype)
+                assert_equal(got.columns[c], expect.columns[c])
+
+            # title and legend lines, with limit less than number of rows
+            path = pathlib.Path(dirname) / "table.txt"
+            t.title = "a title"
+            t.legend = "a legend"
+            t.write(str(path), sep=",", with_title=True)
+            got = load_table(
+                path, sep=",", with_title=True, with_legend=True, chunk_size=3
+            )
+            self.assertEqual(got.title, "a title")
+            self.assertEqual(got.legend, "a legend")
+            self.assertEqual(got.shape, (10, 4))
+            got = load_table(path, sep=",", with_title=True, with_legend=True, limit=4)
+            self.assertEqual(got.shape, (4, 4))
+            self.assertEqual(got.legend, "")
+
+    def test_load_columns_dtype(self):
+        """load_table selects columns and applies explicit types"""
+        t = make_table(
+            header=["id", "count", "score"],
+            data=[["a", 1, 2.5], ["b", 2, 3.5], ["c", 3, 4.5]],
+        )
+        with TemporaryDirectory(".") as dirname:
+            path = pathlib.Path(dirname) / "table.csv"
+            t.write(str(path))
+            got = load_table(path, columns=["score", "id"])
+            self.assertEqual(got.header, ("score", "id"))
+            assert_equal(got.columns["score"], [2.5, 3.5, 4.5])
+            got = load_table(path, dtype={"count": float, "id": "U"})
+            self.assertEqual(got.columns["count"].dtype, numpy.float64)
+            assert_equal(got.columns["count"], [1.0, 2.0, 3.0])
+            with self.assertRaises(ValueError):
+                load_table(path, columns=["missing"])
+
+    def test_load_table_chunks(self):
+        """load_table_chunks yields Tables of chunk_size rows"""
+        t = make_table(header=["id", "count"], data=[[f"s{i}", i] for i in range(10)])
+        with TemporaryDirectory(".") as dirname:
+            path = pathlib.Path(dirname) / "table.tsv"
+            t.write(str(path))
+            chunks = list(load_table_chunks(path, chunk_size=4, columns=["count"]))
+            self.assertEqual([c.shape for c in chunks], [(4, 1), (4, 1), (2, 1)])
+            got = numpy.concatenate([c.columns["count"] for c in chunks])
+            assert_equal(got, numpy.arange(10))
+            chunks = list(load_table_chunks(path, chunk_size=4, limit=6))
+            self.assertEqual(sum(c.shape[0] for c in chunks), 6)
+
+    def test_write_load_npz(self):
+        """round trip of npz format, with column selection and memory maps"""
+        t = make_table(
+            header=["id", "count", "mixed"],
+            data=[["a", 1, (1, 2)], ["b", 2, "x"], ["c", 3, 3.5]],
+            title="a title",
+            legend="a legend",
+            index="id",
+            digits=2,
+        )
+        with TemporaryDirectory(".") as dirname:
+            for compress in (False, True):
+                path = str(pathlib.Path(dirname) / "table.npz")
+                t.write(path, compress=compress)
+                got = load_table(path)
+                self.assertEqual(str(got), str(t))
+                self.assertEqual(got.index_name, "id")
+                self.assertEqual(got["b", "count"], 2)
+                self.assertEqual(got.columns["mixed"].tolist(), [(1, 2), "x", 3.5])
+                got = load_table(path, columns=["count"], limit=2, memory_map=True)
+                self.assertEqual(got.header, ("count",))
+                self.assertEqual(got.columns["count"].tolist(), [1, 2])
+                self.assertEqual(
+                    isinstance(got.columns["count"], numpy.memmap), not compress
+                )
+                with self.assertRaises(ValueError):
+                    load_table(path, columns=["missing"])
+
     def test_load_table_returns_static_columns(self):
         """for static data, load_table gives same dtypes for static_columns_type=True/False"""
         t = load_table("data/sample.tsv", sep="\t", static_column_types=False)